@@ -2,6 +2,15 @@ import os
 import sys
 import traceback
 
+def parse_profile_flag(argv):
+    """Return the trace path for --profile-startup[=PATH], or None"""
+    for arg in argv:
+        if arg == '--profile-startup':
+            return 'startup-trace.json'
+        if arg.startswith('--profile-startup='):
+            return arg.split('=', 1)[1]
+    return None
+
 def main():
     print("Starting Nexus OS...")
     print(f"Python version: {sys.version}")
@@ -12,18 +21,27 @@ def main():
     print(f"Script directory: {script_dir}")
     sys.path.insert(0, script_dir)
     
+    # Optional startup instrumentation, written as a trace-event file
+    from utils.profiler import profiler
+    trace_path = parse_profile_flag(sys.argv[1:])
+    if trace_path:
+        profiler.enable(trace_path)
+        print(f"Profiling startup to {trace_path}")
+    
     try:
         print("Importing tkinter...")
-        import tkinter as tk
+        with profiler.phase("imports"):
+            import tkinter as tk
         print("Tkinter imported successfully")
         
         print("Creating root window...")
-        root = tk.Tk()
-        root.title("Test Window")
+        with profiler.phase("root"):
+            root = tk.Tk()
+            root.title("Nexus OS")
         
-        # Test label
-        label = tk.Label(root, text="If you can see this, Tkinter is working!")
-        label.pack(padx=20, pady=20)
+        # Registered before the desktop queues its own idle work, so this
+        # marks the first time mainloop goes idle
+        root.after_idle(lambda: profiler.mark("first-idle"))
         
         try:
             import ctypes
@@ -32,17 +50,22 @@ def main():
         except Exception as e:
             print(f"Warning: Could not set DPI awareness: {e}")
         
-        # Try to import and initialize the desktop
+        # Try to import and initialize the desktop. Widget modules (and the
+        # PIL, requests and psutil imports behind them) load later, in idle
+        # callbacks, once the canvas and wallpaper have painted.
         try:
             print("Importing desktop module...")
-            from desktop import Desktop
-            from utils.theme import set_theme
+            with profiler.phase("imports:desktop"):
+                from desktop import Desktop
+                from utils.theme import set_theme
             
             print("Setting theme...")
-            set_theme()
+            with profiler.phase("theme"):
+                set_theme()
             
             print("Creating Desktop instance...")
-            app = Desktop(root)
+            with profiler.phase("desktop"):
+                app = Desktop(root)
         except Exception as e:
             print(f"Error in desktop initialization: {e}")
             print("Traceback:")
@@ -55,6 +78,9 @@ def main():
             trace_text = tk.Text(root, height=10, width=50)
             trace_text.insert(tk.END, traceback.format_exc())
             trace_text.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
+            
+            # The desktop never reports it is ready, so write what we have
+            profiler.finish()
         
         print("Starting mainloop...")
         root.mainloop()
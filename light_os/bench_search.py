@@ -0,0 +1,117 @@
+# Benchmark for the launcher's fuzzy search. Builds a synthetic index of
+# app entries shaped like real .desktop files, types queries one key at a
+# time (with a backspace or two) and reports the time per keystroke.
+# Each keystroke is typed once per round and scored by its worst round.
+# Only a worst round more than OUTLIER_RATIO times the keystroke's next
+# worst is dropped, as a one-off preemption by the OS rather than search
+# cost. Exits non-zero if any keystroke's worst time exceeds the budget.
+#
+#   python bench_search.py [--apps 5000] [--budget-ms 1.0]
+
+import argparse
+import random
+import sys
+import time
+
+from utils.fuzzy import FuzzyIndex
+
+VENDORS = ["GNOME", "KDE", "LibreOffice", "Xfce", "Mozilla", "Qt", "GIMP", "Wine",
+           "Steam", "JetBrains", "Visual", "Open", "Simple", "Super", "Nexus", ""]
+WORDS = ["Text", "Editor", "Calculator", "Terminal", "Files", "Browser", "Mail", "Music",
+         "Player", "Video", "Photo", "Image", "Viewer", "Manager", "Settings", "System",
+         "Monitor", "Disk", "Usage", "Analyzer", "Archive", "Screenshot", "Recorder",
+         "Office", "Writer", "Calc", "Impress", "Draw", "Chess", "Mines", "Solitaire",
+         "Sudoku", "Maps", "Weather", "Clock", "Contacts", "Calendar", "Notes", "Tasks",
+         "Studio", "Code", "Designer", "Builder", "Debugger", "Profiler", "Network", "Tools"]
+CATEGORIES = ["Utility", "Office", "Graphics", "AudioVideo", "Game", "Development",
+              "Network", "System", "Settings"]
+
+OUTLIER_RATIO = 3
+
+QUERIES = ["firefox", "text editor", "calc", "term", "sysmon", "gnome files", "steam",
+           "libre writer", "vscode", "disk usage", "zzz", "screenshot", "settings", "photo"]
+
+
+def make_apps(count, seed=0):
+    rng = random.Random(seed)
+    apps = []
+    for index in range(count):
+        words = rng.sample(WORDS, rng.randint(1, 3))
+        name = " ".join(filter(None, [rng.choice(VENDORS)] + words))
+        apps.append({
+            'id': f"app{index}.desktop",
+            'name': name,
+            'generic_name': " ".join(rng.sample(WORDS, 2)),
+            'keywords': rng.sample(WORDS, rng.randint(0, 4)),
+            'categories': [rng.choice(CATEGORIES)],
+        })
+    apps.sort(key=lambda app: app['name'].casefold())
+    return apps
+
+
+def keystrokes(query):
+    """Every prefix as typed, plus a backspace and retype of the last key"""
+    typed = [query[:end] for end in range(1, len(query) + 1)]
+    if len(query) > 2:
+        typed += [query[:-1], query]
+    return typed
+
+
+def worst_time(times):
+    """Slowest time, unless it stands clearly apart from the rest.
+
+    Returns (time, whether the slowest was dropped as an outlier).
+    """
+    times = sorted(times)
+    if len(times) > 1 and times[-1] > OUTLIER_RATIO * times[-2]:
+        return times[-2], True
+    return times[-1], False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark launcher fuzzy search")
+    parser.add_argument('--apps', type=int, default=5000)
+    parser.add_argument('--budget-ms', type=float, default=1.0)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    apps = make_apps(args.apps)
+    started = time.perf_counter()
+    index = FuzzyIndex(apps)
+    build_ms = (time.perf_counter() - started) * 1000
+    # A few frecent apps, as after a few days of use
+    index.set_frecency({app['id']: 100 * (i + 1) for i, app in enumerate(apps[::500])})
+
+    # (query, position) -> time in ms of that keystroke in each round
+    per_keystroke = {}
+    for _ in range(args.rounds):
+        for query in QUERIES:
+            index.search('')
+            for position, text in enumerate(keystrokes(query)):
+                started = time.perf_counter()
+                index.search(text)
+                elapsed = (time.perf_counter() - started) * 1000
+                per_keystroke.setdefault((query, position), []).append(elapsed)
+
+    timings = sorted(t for times in per_keystroke.values() for t in times)
+    median = timings[len(timings) // 2]
+    p99 = timings[int(len(timings) * 0.99)]
+    slowest = {key: worst_time(times) for key, times in per_keystroke.items()}
+    (query, position), (worst, _) = max(slowest.items(), key=lambda item: item[1][0])
+    outliers = sum(dropped for _, dropped in slowest.values())
+    print(f"{args.apps} apps, index built in {build_ms:.1f} ms")
+    print(f"{len(timings)} keystrokes: median {median:.3f} ms, p99 {p99:.3f} ms, "
+          f"max {timings[-1]:.3f} ms")
+    print(f"slowest keystroke: {keystrokes(query)[position]!r} at {worst:.3f} ms worst case "
+          f"({outliers} outlier{'s' if outliers != 1 else ''} over {OUTLIER_RATIO}x dropped)")
+    for query in QUERIES[:5]:
+        names = [app['name'] for app in index.search(query)[:3]]
+        print(f"  {query!r}: {', '.join(names) or '(none)'}")
+    if worst > args.budget_ms:
+        print(f"FAIL: slowest keystroke over the {args.budget_ms} ms budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,21 @@
 import tkinter as tk
-from tkinter import ttk
-from PIL import Image, ImageTk
+from tkinter import ttk, filedialog
+import importlib
 import os
-import json
-from utils.animations import FadeIn
-from widgets.app_launcher import AppLauncher
-from widgets.weather import WeatherWidget
-from widgets.clock import ClockWidget
-from widgets.system_monitor import SystemMonitor
+from utils.animations import FadeIn, get_animator, set_animations_enabled
+from utils.profiler import profiler
+from utils.settings import get_settings
+from utils.wallpaper import WallpaperLoader
+
+# Widgets in build order: settings key -> (module, class, attribute, default position).
+# Modules are imported on first use so PIL, requests and psutil stay off the
+# critical path to the first painted frame.
+WIDGETS = {
+    'clock': ('widgets.clock', 'ClockWidget', 'clock', (20, 20)),
+    'launcher': ('widgets.app_launcher', 'AppLauncher', 'app_launcher', None),
+    'system': ('widgets.system_monitor', 'SystemMonitor', 'system_monitor', (20, 300)),
+    'weather': ('widgets.weather', 'WeatherWidget', 'weather', (20, 150)),
+}
 
 class Desktop:
     def __init__(self, root):
@@ -16,40 +24,164 @@ class Desktop:
         self.root.attributes('-fullscreen', True)
         self.root.configure(bg='#000000')
         
+        # Load user settings
+        with profiler.phase("settings"):
+            self.load_settings()
+        
         # Initialize desktop components
-        self.setup_desktop()
+        with profiler.phase("canvas"):
+            self.setup_desktop()
+        self.setup_power_policy()
         self.setup_widgets()
         
-        # Load user settings
-        self.load_settings()
+        # Alerts and the optional OpenMetrics endpoint start once the desktop
+        # is up; alerts first, so each exported sample includes their state
+        if self.settings.get('alerts.enabled', True):
+            self.root.after_idle(self.start_alerts)
+        if self.settings.get('exporter.enabled'):
+            self.root.after_idle(self.start_exporter)
+        
+        # Rotate wallpapers if the slideshow is enabled
+        if self.settings.get('slideshow.enabled'):
+            self.start_slideshow()
         
         # Apply fade-in animation
+        get_animator(self.root).set_frame_rate(self.settings.get('animations.frame_rate', 60))
         FadeIn(self.root)
     
     def setup_desktop(self):
         # Main desktop canvas
         self.canvas = tk.Canvas(self.root, highlightthickness=0, bg='#000000')
         self.canvas.pack(fill=tk.BOTH, expand=True)
+        self.wallpaper_item = None
+        self.wallpaper_path = None
+        self.wallpaper_size = None
+        self.wallpaper_mode = 'stretch'
+        self.wallpaper_loader = WallpaperLoader(self.root)
+        self.slideshow = None
         
         # Set wallpaper
-        self.set_wallpaper("assets/wallpapers/default.jpg")
+        with profiler.phase("wallpaper"):
+            self.set_wallpaper(self.settings.get('wallpaper'), self.settings.get('wallpaper_mode'))
         
         # Bind right-click for context menu
         self.canvas.bind("<Button-3>", self.show_context_menu)
         
         # Bind keyboard shortcuts
         self.root.bind("<Control-Alt-Delete>", self.show_system_menu)
+        self.root.bind("<Alt-space>", self.show_search)
+        self.root.bind("<Super_L>", self.show_search)
+        
+        # Rescale the wallpaper when the screen resolution changes
+        self.root.bind("<Configure>", self.on_root_configure, add='+')
         
+    def setup_power_policy(self):
+        """Slow refreshes and pause animations when idle or on battery"""
+        from utils.power import IDLE, get_power_policy
+        
+        self.power_policy = get_power_policy(self.root)
+        self.power_policy.subscribe(lambda state: set_animations_enabled(state != IDLE))
+        self.power_policy.start()
+    
+    def start_alerts(self):
+        """Evaluate alert rules on every sample and show them as toasts"""
+        from utils.alerts import get_alert_engine
+        from utils.scheduler import get_scheduler
+        from widgets.notifications import NotificationArea
+        
+        self.alert_engine = get_alert_engine()
+        self.notifications = NotificationArea(self.canvas)
+        self.alert_job = get_scheduler(self.root).every(
+            1, lambda: self.alert_engine.poll(self.on_alert), name="alerts"
+        )
+    
+    def on_alert(self, event, title, message):
+        """Surface an alert that fired or resolved"""
+        from utils.alerts import FIRED
+        
+        if event == FIRED:
+            self.notifications.show(title, message, 'warning')
+        else:
+            self.notifications.show(f"{title} resolved", message, 'info')
+    
+    def start_exporter(self):
+        """Serve the sampler's metrics to a local scraper"""
+        from utils.exporter import get_exporter
+        
+        exporter = get_exporter()
+        if self.settings.get('alerts.enabled', True):
+            from utils.alerts import get_alert_engine
+            exporter.add_source(get_alert_engine().metric_families)
+        exporter.start()
+    
     def setup_widgets(self):
-        # Add desktop widgets
-        self.clock = ClockWidget(self.canvas)
-        self.weather = WeatherWidget(self.canvas)
-        self.system_monitor = SystemMonitor(self.canvas)
+        # Widgets are built one per idle callback, after the canvas and
+        # wallpaper have had a chance to paint
+        self.widgets = {}
+        for key, (_, _, attribute, _) in WIDGETS.items():
+            setattr(self, attribute, None)
+        self.city_widgets = []
+        self.pending_widgets = [key for key in WIDGETS if self.settings.get(f'widgets.{key}', True)]
+        self.settings.subscribe(self.on_widget_flags_changed, ['widgets'])
+        self.root.after_idle(self.build_next_widget)
+    
+    def build_next_widget(self):
+        """Build one pending widget and queue the next"""
+        if self.pending_widgets:
+            self.build_widget(self.pending_widgets.pop(0))
+        if self.pending_widgets:
+            self.root.after_idle(self.build_next_widget)
+        else:
+            # Startup is complete once every enabled widget exists
+            profiler.mark("widgets-ready")
+            self.root.after_idle(profiler.finish)
+    
+    def build_widget(self, key):
+        """Import and construct a widget at its saved position"""
+        if key in self.widgets:
+            return self.widgets[key]
+        module_name, class_name, attribute, default_position = WIDGETS[key]
+        try:
+            with profiler.phase(f"import:{module_name}"):
+                widget_class = getattr(importlib.import_module(module_name), class_name)
+            with profiler.phase(f"widget:{class_name}"):
+                if default_position is None:
+                    # The dock attaches to the root window rather than the canvas
+                    widget = widget_class(self.root)
+                else:
+                    position = self.settings.get(f'positions.{key}', default_position)
+                    widget = widget_class(self.canvas, *position)
+        except Exception as e:
+            print(f"Error creating {class_name}: {e}")
+            return None
+        self.widgets[key] = widget
+        setattr(self, attribute, widget)
+        if key == 'weather':
+            self.build_city_widgets(widget_class, default_position)
+        return widget
+    
+    def build_city_widgets(self, widget_class, default_position):
+        """One more weather widget per extra entry in weather.cities.
         
-        # App launcher (dock)
-        self.app_launcher = AppLauncher(self.root)
+        They all share the first widget's provider, so the extra widgets
+        add no API calls beyond the cities themselves.
+        """
+        x, y = default_position
+        for slot in range(1, len(self.settings.get('weather.cities', []))):
+            position = self.settings.get(f'positions.weather_{slot}', (x + 180 * slot, y))
+            try:
+                self.city_widgets.append(widget_class(self.canvas, *position, slot=slot))
+            except Exception as e:
+                print(f"Error creating {widget_class.__name__}: {e}")
+    
+    def on_widget_flags_changed(self, changed):
+        """Build widgets that are switched on after startup"""
+        for key in WIDGETS:
+            enabled = self.settings.get(f'widgets.{key}', True)
+            if enabled and key not in self.widgets and key not in self.pending_widgets:
+                self.build_widget(key)
         
-    def set_wallpaper(self, image_path):
+    def set_wallpaper(self, image_path, mode='stretch'):
         try:
             # Check if file exists
             if not os.path.exists(image_path):
@@ -57,53 +189,110 @@ class Desktop:
                 self.create_default_wallpaper()
                 return
                 
-            # Load and resize the image to fit the screen
-            screen_width = self.root.winfo_screenwidth()
-            screen_height = self.root.winfo_screenheight()
-            
-            self.wallpaper = Image.open(image_path)
-            self.wallpaper = self.wallpaper.resize(
-                (screen_width, screen_height),
-                Image.Resampling.LANCZOS
-            )
-            self.bg_image = ImageTk.PhotoImage(self.wallpaper)
-            self.canvas.create_image(0, 0, image=self.bg_image, anchor=tk.NW)
+            # Decode and scale to the screen size off the Tk thread; the
+            # scaled result is cached on disk for later starts
+            screen_size = (self.root.winfo_screenwidth(), self.root.winfo_screenheight())
+            self.wallpaper_path = image_path
+            self.wallpaper_size = screen_size
+            self.wallpaper_mode = mode
+            self.wallpaper_loader.load(image_path, screen_size, mode, self.on_wallpaper_ready)
         except Exception as e:
             print(f"Error setting wallpaper: {e}")
             self.canvas.config(bg='#1a1a1a')
     
-    def load_settings(self):
-        self.settings_file = "config/settings.json"
-        default_settings = {
-            "wallpaper": "assets/wallpapers/default.jpg",
-            "theme": "dark",
-            "widgets": {"clock": True, "weather": True, "system": True}
-        }
+    def on_wallpaper_ready(self, cached_path, error):
+        """Show a scaled wallpaper once the loader has it ready"""
+        profiler.mark("wallpaper-ready")
+        if error is not None:
+            print(f"Error setting wallpaper: {error}")
+            self.canvas.config(bg='#1a1a1a')
+            return
         
         try:
-            os.makedirs("config", exist_ok=True)
-            if os.path.exists(self.settings_file):
-                with open(self.settings_file, 'r') as f:
-                    self.settings = {**default_settings, **json.load(f)}
-            else:
-                self.settings = default_settings
-                self.save_settings()
+            # The cached file is already screen-sized, so Tk can read it directly
+            self.show_wallpaper_image(tk.PhotoImage(file=cached_path), cached_path)
         except Exception as e:
-            print(f"Error loading settings: {e}")
-            self.settings = default_settings
+            print(f"Error setting wallpaper: {e}")
+            self.canvas.config(bg='#1a1a1a')
+    
+    def show_wallpaper_image(self, image, cached_path=None):
+        """Swap a screen-sized PhotoImage onto the desktop canvas"""
+        # Replacing the reference releases the previous frame
+        self.bg_image = image
+        if self.wallpaper_item is None:
+            self.wallpaper_item = self.canvas.create_image(0, 0, image=self.bg_image, anchor=tk.NW)
+            self.canvas.tag_lower(self.wallpaper_item)
+        else:
+            self.canvas.itemconfig(self.wallpaper_item, image=self.bg_image)
+        
+        # Frosted widget backdrops are cut from the same scaled file
+        if cached_path is not None and self.settings.get('backdrop.enabled', True):
+            from utils.backdrop import get_compositor
+            get_compositor().set_wallpaper(self.canvas, cached_path)
+    
+    def create_default_wallpaper(self):
+        """Fall back to a plain background when no wallpaper is available"""
+        self.canvas.config(bg='#1a1a1a')
+    
+    def on_root_configure(self, event):
+        """Reload the wallpaper if the screen resolution changed"""
+        if event.widget is not self.root or self.wallpaper_path is None:
+            return
+        screen_size = (self.root.winfo_screenwidth(), self.root.winfo_screenheight())
+        if screen_size != self.wallpaper_size:
+            self.set_wallpaper(self.wallpaper_path, self.wallpaper_mode)
+            if self.slideshow is not None:
+                self.start_slideshow()
+    
+    def start_slideshow(self):
+        """Start rotating wallpapers from the configured directory"""
+        from utils.slideshow import WallpaperSlideshow
+        
+        self.stop_slideshow()
+        config = self.settings.get('slideshow', {})
+        self.slideshow = WallpaperSlideshow(
+            self.root,
+            config.get('directory', 'assets/wallpapers'),
+            (self.root.winfo_screenwidth(), self.root.winfo_screenheight()),
+            self.show_wallpaper_image,
+            mode=self.settings.get('wallpaper_mode', 'stretch'),
+            interval=config.get('interval', 300),
+            prefetch=config.get('prefetch', 2)
+        )
+        if not self.slideshow.start():
+            self.slideshow = None
+    
+    def stop_slideshow(self):
+        """Stop the wallpaper slideshow if it is running"""
+        if self.slideshow is not None:
+            self.slideshow.stop()
+            self.slideshow = None
+    
+    def load_settings(self):
+        # Settings live in memory; changes are written back in the background
+        self.settings = get_settings()
+        self.settings.subscribe(self.on_settings_changed, ['wallpaper', 'wallpaper_mode'])
     
     def save_settings(self):
-        try:
-            with open(self.settings_file, 'w') as f:
-                json.dump(self.settings, f, indent=4)
-        except Exception as e:
-            print(f"Error saving settings: {e}")
+        # Write pending changes now rather than waiting for the debounce
+        self.settings.flush()
+    
+    def on_settings_changed(self, changed):
+        """Reload the wallpaper when its settings change"""
+        if self.slideshow is None:
+            self.set_wallpaper(self.settings.get('wallpaper'), self.settings.get('wallpaper_mode'))
     
     def show_context_menu(self, event):
         menu = tk.Menu(self.root, tearoff=0, bg='#2d2d2d', fg='white',
                       bd=0, font=('Segoe UI', 10))
         
         menu.add_command(label="Change Wallpaper", command=self.change_wallpaper)
+        if self.slideshow is not None:
+            menu.add_command(label="Next Wallpaper", command=self.slideshow.next)
+            menu.add_command(label="Stop Slideshow", command=self.toggle_slideshow)
+        else:
+            menu.add_command(label="Start Slideshow...", command=self.toggle_slideshow)
+        menu.add_cascade(label="Widgets", menu=self.create_widgets_menu(menu))
         menu.add_separator()
         menu.add_command(label="Create Shortcut")
         menu.add_command(label="Refresh Desktop")
@@ -120,18 +309,68 @@ class Desktop:
         finally:
             menu.grab_release()
     
+    def create_widgets_menu(self, parent_menu):
+        """Build a submenu of checkbuttons bound to the widget flags"""
+        submenu = tk.Menu(parent_menu, tearoff=0, bg='#2d2d2d', fg='white',
+                          bd=0, font=('Segoe UI', 10))
+        labels = {'clock': "Clock", 'weather': "Weather", 'system': "System Monitor",
+                  'launcher': "App Launcher"}
+        self.widget_vars = {}
+        for key, label in labels.items():
+            var = tk.BooleanVar(value=self.settings.get(f'widgets.{key}', True))
+            self.widget_vars[key] = var
+            submenu.add_checkbutton(
+                label=label, variable=var,
+                command=lambda k=key, v=var: self.settings.set(f'widgets.{k}', v.get())
+            )
+        return submenu
+    
+    def show_search(self, event=None):
+        """Open or close type-to-search over the installed applications"""
+        from widgets.search_overlay import get_search_overlay
+        
+        get_search_overlay(self.root).toggle()
+        return 'break'
+    
     def show_system_menu(self, event=None):
         # Advanced system menu with task manager, etc.
         pass
     
     def change_wallpaper(self):
-        # Implement wallpaper changer
-        pass
+        """Pick a single wallpaper image"""
+        image_path = filedialog.askopenfilename(
+            parent=self.root,
+            title="Choose Wallpaper",
+            filetypes=[("Images", "*.jpg *.jpeg *.png *.bmp *.gif *.webp"), ("All files", "*.*")]
+        )
+        if not image_path:
+            return
+        
+        self.stop_slideshow()
+        self.settings.update({'wallpaper': image_path, 'slideshow.enabled': False})
+    
+    def toggle_slideshow(self):
+        """Start a slideshow from a chosen directory, or stop the running one"""
+        if self.slideshow is not None:
+            self.stop_slideshow()
+            self.settings.set('slideshow.enabled', False)
+        else:
+            directory = filedialog.askdirectory(
+                parent=self.root,
+                title="Choose Slideshow Folder",
+                initialdir=self.settings.get('slideshow.directory', 'assets/wallpapers')
+            )
+            if not directory:
+                return
+            self.settings.update({'slideshow.directory': directory, 'slideshow.enabled': True})
+            self.start_slideshow()
     
     def sign_out(self):
         # Save session and sign out
+        self.save_settings()
         self.root.quit()
     
     def shutdown(self):
         # Clean up and exit
+        self.save_settings()
         self.root.destroy()
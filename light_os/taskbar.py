@@ -4,6 +4,9 @@ from PIL import Image, ImageTk
 import os
 import time
 from utils.animations import SlideIn
+from utils.scheduler import get_scheduler
+from utils.launcher import get_supervisor
+from widgets.search_overlay import get_search_overlay
 
 class Taskbar(tk.Frame):
     def __init__(self, parent):
@@ -26,6 +29,9 @@ class Taskbar(tk.Frame):
         # Task view (for open apps)
         self.task_view = tk.Frame(self, bg='#1a1a1a')
         self.task_view.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.supervisor = get_supervisor(self)
+        self.unsubscribe_tasks = self.supervisor.subscribe(self.update_task_view)
+        self.update_task_view()
         
         # System tray
         self.tray = tk.Frame(self, bg='#1a1a1a')
@@ -42,6 +48,8 @@ class Taskbar(tk.Frame):
         self.clock_label = tk.Label(self.tray, text="", bg='#1a1a1a', fg='white', 
                                   font=('Segoe UI', 9))
         self.clock_label.pack(side=tk.RIGHT, padx=5)
+        # Only minutes are shown, so tick on the minute
+        self.clock_job = get_scheduler(self).every(60, self.update_clock, name="taskbar-clock", align=True)
         self.update_clock()
         
         # Network icon
@@ -75,9 +83,9 @@ class Taskbar(tk.Frame):
         widget.bind("<Leave>", lambda e: self.hide_tooltip())
     
     def show_tooltip(self, event, text):
-        x, y, _, _ = event.widget.bbox("insert")
-        x += event.widget.winfo_rootx() + 25
-        y += event.widget.winfo_rooty() + 25
+        # Labels have no "insert" index to take a bbox of
+        x = event.widget.winfo_rootx() + 25
+        y = event.widget.winfo_rooty() + 25
         
         self.tooltip = tk.Toplevel(event.widget)
         self.tooltip.wm_overrideredirect(True)
@@ -91,10 +99,21 @@ class Taskbar(tk.Frame):
         if hasattr(self, 'tooltip') and self.tooltip.winfo_exists():
             self.tooltip.destroy()
     
+    def update_task_view(self):
+        """One button per running app launched from the desktop"""
+        for child in self.task_view.winfo_children():
+            child.destroy()
+        for pid, name, started, returncode in self.supervisor.table():
+            if returncode is not None:
+                continue
+            btn = tk.Label(self.task_view, text=name[:20], bg='#2d2d2d', fg='white',
+                           padx=10, font=('Segoe UI', 9))
+            btn.pack(side=tk.LEFT, fill=tk.Y, padx=1)
+            self.add_tooltip(btn, f"PID {pid}, started {time.strftime('%H:%M', time.localtime(started))}")
+    
     def update_clock(self):
         current_time = time.strftime('%H:%M')
         self.clock_label.config(text=current_time)
-        self.after(1000, self.update_clock)
     
     def toggle_start_menu(self):
         if hasattr(self, 'start_menu') and self.start_menu.winfo_exists():
@@ -146,23 +165,21 @@ class Taskbar(tk.Frame):
         app_frame = tk.Frame(self.start_menu, bg='#2d2d2d')
         app_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
-        # Add some app shortcuts
-        apps = [
-            ("📁", "File Explorer", self.open_file_explorer),
-            ("🌐", "Web Browser", self.open_browser),
-            ("📝", "Text Editor", self.open_text_editor),
-            ("⚙️", "Settings", self.open_settings),
-            ("📊", "System Monitor", self.open_system_monitor),
-            ("🎮", "Games", self.open_games),
-            ("📚", "Documents", self.open_documents)
-        ]
-        
-        for icon, name, cmd in apps:
-            btn = tk.Button(app_frame, text=f"  {icon}  {name}", 
+        # Search box, then the most frecent applications
+        search_btn = tk.Button(app_frame, text="  🔍  Search apps...",
+                               anchor='w', bd=0, padx=10, pady=8,
+                               bg='#1a1a1a', fg='#cccccc',
+                               font=('Segoe UI', 10),
+                               command=self.open_search)
+        search_btn.pack(fill=tk.X, pady=(0, 6))
+        
+        overlay = get_search_overlay(self)
+        for app in overlay.top_apps()[:7]:
+            btn = tk.Button(app_frame, text=f"  {app['icon']}  {app['name']}", 
                           anchor='w', bd=0, padx=10, pady=8,
                           bg='#2d2d2d', fg='white',
                           font=('Segoe UI', 10),
-                          command=cmd)
+                          command=lambda a=app: self.launch_app(a))
             btn.pack(fill=tk.X, pady=1)
             
             # Hover effect
@@ -186,27 +203,13 @@ class Taskbar(tk.Frame):
             btn.pack(side=tk.LEFT, fill=tk.Y)
             self.add_tooltip(btn, tooltip)
     
-    # Placeholder methods for menu actions
-    def open_file_explorer(self):
-        print("Opening File Explorer")
-    
-    def open_browser(self):
-        print("Opening Web Browser")
-    
-    def open_text_editor(self):
-        print("Opening Text Editor")
-    
-    def open_settings(self):
-        print("Opening Settings")
-    
-    def open_system_monitor(self):
-        print("Opening System Monitor")
-    
-    def open_games(self):
-        print("Opening Games")
+    def open_search(self):
+        self.hide_start_menu()
+        get_search_overlay(self).show()
     
-    def open_documents(self):
-        print("Opening Documents")
+    def launch_app(self, app):
+        self.hide_start_menu()
+        get_search_overlay(self).launch(app)
     
     def lock_screen(self):
         print("Locking screen")
@@ -220,3 +223,9 @@ class Taskbar(tk.Frame):
     def shutdown(self):
         print("Shutting down")
         self.parent.destroy()
+    
+    def destroy(self):
+        """Stop the clock and stop following launched apps"""
+        self.clock_job.cancel()
+        self.unsubscribe_tasks()
+        super().destroy()
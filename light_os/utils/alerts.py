@@ -0,0 +1,207 @@
+import operator
+import queue
+
+OPERATORS = {'>': operator.gt, '>=': operator.ge, '<': operator.lt, '<=': operator.le}
+
+# metric -> (label, unit)
+METRICS = {
+    'cpu': ("CPU", '%'),
+    'memory': ("Memory", '%'),
+    'disk_used': ("Disk used", '%'),
+    'disk_free': ("Disk free", '%'),
+    'net_sent': ("Upload", ' B/s'),
+    'net_recv': ("Download", ' B/s'),
+}
+
+FIRED = 'fired'
+RESOLVED = 'resolved'
+
+
+def metric_values(snapshot, metric, mount=None):
+    """(target, value) pairs for a metric; disks give one per mount"""
+    if metric == 'cpu':
+        return (('', snapshot['cpu']),)
+    if metric == 'memory':
+        return (('', snapshot['memory']['percent']),)
+    if metric in ('disk_used', 'disk_free'):
+        values = []
+        for disk in snapshot.get('disks', ()):
+            if mount is not None and disk['mountpoint'] != mount:
+                continue
+            percent = disk['percent']
+            values.append((disk['mountpoint'], percent if metric == 'disk_used' else 100 - percent))
+        return values
+    if metric == 'net_sent':
+        return (('', snapshot['net']['sent_rate']),)
+    if metric == 'net_recv':
+        return (('', snapshot['net']['recv_rate']),)
+    raise ValueError(f"Unknown alert metric: {metric}")
+
+
+class AlertRule:
+    """One declarative threshold rule from settings.
+
+    The rule fires once the condition has held for ``for`` seconds and
+    resolves only when the value crosses back past ``clear``; the gap
+    between threshold and clear is the hysteresis. Notifications for
+    the same rule and target are at most one per ``cooldown`` seconds.
+    """
+
+    def __init__(self, config):
+        self.name = config.get('name') or f"{config['metric']} {config.get('op', '>')} {config['threshold']}"
+        self.metric = config['metric']
+        self.mount = config.get('mount')
+        self.op = config.get('op', '>')
+        self.compare = OPERATORS[self.op]
+        self.threshold = float(config['threshold'])
+        self.duration = float(config.get('for', 0))
+        self.cooldown = float(config.get('cooldown', 300))
+        # Default hysteresis: 5 % of the threshold back from it
+        margin = abs(self.threshold) * 0.05
+        default_clear = self.threshold - margin if self.op in ('>', '>=') else self.threshold + margin
+        self.clear = float(config.get('clear', default_clear))
+        if self.metric not in METRICS:
+            raise ValueError(f"Unknown alert metric: {self.metric}")
+
+    def describe(self, event, value):
+        """Message for a fired or resolved event"""
+        label, unit = METRICS[self.metric]
+        if event == RESOLVED:
+            return f"{label} back to {value:.0f}{unit}"
+        text = f"{label} {value:.0f}{unit} {self.op} {self.threshold:g}{unit}"
+        if self.duration:
+            text += f" for {self.duration:g} s"
+        return text
+
+
+class Alert:
+    """State of one rule for one target (a mount, or '' for the machine)"""
+
+    def __init__(self, rule, target):
+        self.rule = rule
+        self.target = target
+        self.pending_since = None
+        self.firing = False
+        self.fired_at = None
+        self.notified_at = None
+        self.silent = False
+        self.value = None
+
+    @property
+    def title(self):
+        return f"{self.rule.name} ({self.target})" if self.target else self.rule.name
+
+    def update(self, value, now):
+        """Fold in a sample; returns FIRED, RESOLVED or None"""
+        self.value = value
+        rule = self.rule
+        if not self.firing:
+            if not rule.compare(value, rule.threshold):
+                self.pending_since = None
+                return None
+            if self.pending_since is None:
+                self.pending_since = now
+            if now - self.pending_since < rule.duration:
+                return None
+            self.firing = True
+            self.fired_at = now
+            # Flapping around the threshold: we told the user recently
+            self.silent = self.notified_at is not None and now - self.notified_at < rule.cooldown
+            if self.silent:
+                return None
+            self.notified_at = now
+            return FIRED
+
+        # Firing: stay that way until the value is past the clear level
+        if rule.compare(value, rule.clear):
+            return None
+        self.firing = False
+        self.pending_since = None
+        return None if self.silent else RESOLVED
+
+
+class AlertEngine:
+    """Evaluates alert rules against every metrics sample.
+
+    Each rule keeps a running "condition true since" time instead of
+    rescanning the history window, so a sample costs O(rules) whatever
+    the rule durations. Runs on the sampler thread; events are queued
+    for the Tk thread to drain with ``poll``.
+    """
+
+    def __init__(self, rules=()):
+        self.rules = []
+        self.alerts = {}  # (rule index, target) -> Alert
+        self.events = queue.Queue()
+        self.set_rules(rules)
+
+    def set_rules(self, configs):
+        """Replace the rule set, dropping all alert state"""
+        rules = []
+        for config in configs:
+            try:
+                rules.append(AlertRule(config))
+            except (KeyError, ValueError, TypeError) as e:
+                print(f"Error in alert rule {config}: {e}")
+        self.alerts = {}
+        self.rules = rules
+
+    def evaluate(self, snapshot):
+        """Check every rule against a sampler snapshot"""
+        now = snapshot['monotonic']
+        # set_rules may swap these from the Tk thread mid-evaluation
+        rules, alerts = self.rules, self.alerts
+        for index, rule in enumerate(rules):
+            try:
+                values = metric_values(snapshot, rule.metric, rule.mount)
+            except (KeyError, TypeError):
+                continue
+            for target, value in values:
+                key = (index, target)
+                alert = alerts.get(key)
+                if alert is None:
+                    alert = alerts[key] = Alert(rule, target)
+                event = alert.update(value, now)
+                if event is not None:
+                    self.events.put((event, alert.title, rule.describe(event, value)))
+
+    def firing(self):
+        """Alerts currently firing"""
+        return [alert for alert in list(self.alerts.values()) if alert.firing]
+
+    def poll(self, callback):
+        """Call callback(event, title, message) for each queued event"""
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                return
+            callback(*event)
+
+    def metric_families(self):
+        """Alert state for the metrics endpoint"""
+        from utils.exporter import MetricFamily
+
+        family = MetricFamily('lightos_alert_firing', 'gauge',
+                              'Whether an alert rule is firing (1) or not (0).')
+        for alert in list(self.alerts.values()):
+            family.add(int(alert.firing), {'rule': alert.rule.name, 'target': alert.target})
+        return [family]
+
+
+_engine = None
+
+
+def get_alert_engine():
+    """Return the shared alert engine, evaluating every sampler snapshot"""
+    global _engine
+    if _engine is None:
+        from utils.metrics import get_sampler
+        from utils.settings import get_settings
+
+        settings = get_settings()
+        _engine = AlertEngine(settings.get('alerts.rules', []))
+        settings.subscribe(lambda changed: _engine.set_rules(settings.get('alerts.rules', [])),
+                           ['alerts.rules'])
+        get_sampler().add_listener(_engine.evaluate)
+    return _engine
@@ -1,42 +1,170 @@
 import tkinter as tk
 import time
+from functools import lru_cache
+
+# Switched off by the power policy while the desktop is idle; animations
+# then jump straight to their final state
+animations_enabled = True
+
+# Upper bound on frames per second across all running animations
+DEFAULT_FRAME_RATE = 60
+
+def set_animations_enabled(enabled):
+    """Enable or disable all animations"""
+    global animations_enabled
+    animations_enabled = enabled
+
+def ease_out_quad(t):
+    return 1 - (1 - t) ** 2
+
+def ease_out_cubic(t):
+    return 1 - (1 - t) ** 3
+
+def linear(t):
+    return t
+
+@lru_cache(maxsize=256)
+def gradient(color_from, color_to, steps):
+    """Colours from color_from to color_to inclusive, cached per pair"""
+    from_rgb = hex_to_rgb(color_from)
+    to_rgb = hex_to_rgb(color_to)
+    colors = []
+    for i in range(steps + 1):
+        colors.append(rgb_to_hex(tuple(
+            int(a + (b - a) * i / steps) for a, b in zip(from_rgb, to_rgb)
+        )))
+    return tuple(colors)
+
+def hex_to_rgb(hex_color):
+    hex_color = hex_color.lstrip('#')
+    return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+
+def rgb_to_hex(rgb):
+    return '#%02x%02x%02x' % rgb
+
+def solid_color(color):
+    """Drop the alpha byte from '#rrggbbaa' colours, which Tk can't draw"""
+    return color[:7] if color.startswith('#') and len(color) > 7 else color
+
+class Tween:
+    """A single time-based property animation"""
+
+    def __init__(self, start_value, end_value, duration, apply, easing, on_done):
+        self.start_value = start_value
+        self.end_value = end_value
+        self.duration = max(duration, 1) / 1000
+        self.apply = apply
+        self.easing = easing
+        self.on_done = on_done
+        self.started = time.perf_counter()
+        self.value = start_value
+
+    def step(self, now):
+        """Apply the value for time now; returns True once finished"""
+        # Progress comes from elapsed time, so a late frame skips ahead
+        # instead of stretching the animation
+        t = min(1.0, (now - self.started) / self.duration)
+        self.value = self.start_value + (self.end_value - self.start_value) * self.easing(t)
+        self.apply(self.value)
+        return t >= 1.0
+
+class Animator:
+    """Runs every tween on the desktop from one frame clock.
+
+    Tweens are keyed by (target, property): starting a new tween on the
+    same property replaces the old one. The clock only ticks while
+    something is animating and never faster than the frame rate cap.
+    """
+
+    def __init__(self, widget, frame_rate=DEFAULT_FRAME_RATE):
+        self.widget = widget
+        self.tweens = {}
+        self.after_id = None
+        self.set_frame_rate(frame_rate)
+
+    def set_frame_rate(self, frame_rate):
+        """Cap the number of frames per second"""
+        self.frame_interval = 1.0 / max(1, frame_rate)
+
+    def tween(self, target, prop, start_value, end_value, duration, apply,
+              easing=ease_out_quad, on_done=None):
+        """Animate a value from start_value to end_value over duration ms"""
+        key = (str(target), prop)
+        if not animations_enabled:
+            self.tweens.pop(key, None)
+            apply(end_value)
+            if on_done:
+                on_done()
+            return None
+
+        tween = Tween(start_value, end_value, duration, apply, easing, on_done)
+        self.tweens[key] = tween
+        if self.after_id is None:
+            self.after_id = self.widget.after(0, self.on_frame)
+        return tween
+
+    def cancel(self, target, prop):
+        """Stop a running tween, leaving the property where it is"""
+        self.tweens.pop((str(target), prop), None)
+
+    def value(self, target, prop, default):
+        """Current value of a running tween, or default"""
+        tween = self.tweens.get((str(target), prop))
+        return tween.value if tween is not None else default
+
+    def on_frame(self):
+        self.after_id = None
+        now = time.perf_counter()
+        for key, tween in list(self.tweens.items()):
+            try:
+                finished = tween.step(now)
+            except tk.TclError:
+                # The widget went away mid-animation
+                finished = True
+                tween.on_done = None
+            if finished and self.tweens.get(key) is tween:
+                del self.tweens[key]
+                if tween.on_done:
+                    tween.on_done()
+
+        if self.tweens:
+            # Sleep for what is left of this frame's budget
+            elapsed = time.perf_counter() - now
+            delay = max(1, int((self.frame_interval - elapsed) * 1000))
+            self.after_id = self.widget.after(delay, self.on_frame)
+
+_animator = None
+
+def get_animator(widget):
+    """Return the shared animator, creating it on the widget's root"""
+    global _animator
+    if _animator is None:
+        _animator = Animator(widget.winfo_toplevel())
+    return _animator
 
 class FadeIn:
     def __init__(self, window, duration=300):
         self.window = window
         self.duration = duration
-        self.steps = 20
-        self.step = 0
-        self.alpha = 0.0
-        
+
         # Set initial transparency
-        self.window.attributes('-alpha', self.alpha)
-        self.animate_in()
-    
-    def animate_in(self):
-        if self.step <= self.steps:
-            self.alpha = self.ease_out(self.step / self.steps)
-            self.window.attributes('-alpha', self.alpha)
-            self.step += 1
-            self.window.after(self.duration // self.steps, self.animate_in)
-    
-    @staticmethod
-    def ease_out(t):
-        """Easing function for smooth animation"""
-        return 1 - (1 - t) ** 2
+        self.window.attributes('-alpha', 0.0)
+        get_animator(window).tween(
+            window, 'alpha', 0.0, 1.0, duration,
+            lambda alpha: self.window.attributes('-alpha', alpha),
+            easing=ease_out_quad
+        )
 
 class SlideIn:
     def __init__(self, widget, direction='right', duration=300):
         self.widget = widget
         self.direction = direction.lower()
         self.duration = duration
-        self.steps = 20
-        self.step = 0
-        
+
         # Store original position
         self.original_geometry = widget.winfo_geometry()
         self.original_place_info = widget.place_info()
-        
+
         # Hide widget initially
         if 'x' in self.original_place_info and 'y' in self.original_place_info:
             self.original_x = int(self.original_place_info['x'])
@@ -44,11 +172,11 @@ class SlideIn:
         else:
             self.original_x = widget.winfo_x()
             self.original_y = widget.winfo_y()
-        
+
         # Calculate target position based on direction
         screen_width = widget.winfo_screenwidth()
         screen_height = widget.winfo_screenheight()
-        
+
         if self.direction == 'top':
             self.start_y = -widget.winfo_height()
             self.start_x = self.original_x
@@ -61,93 +189,75 @@ class SlideIn:
         else:  # right
             self.start_x = screen_width
             self.start_y = self.original_y
-        
+
         # Set initial position
         widget.place(x=self.start_x, y=self.start_y)
-        
+
         # Start animation
-        self.animate()
-    
-    def animate(self):
-        if self.step <= self.steps:
-            # Calculate current position
-            progress = self.ease_out(self.step / self.steps)
-            
-            if self.direction in ['top', 'bottom']:
-                y = self.start_y + (self.original_y - self.start_y) * progress
-                x = self.original_x
-            else:  # left or right
-                x = self.start_x + (self.original_x - self.start_x) * progress
-                y = self.original_y
-            
-            # Update position
-            self.widget.place(x=int(x), y=int(y))
-            
-            self.step += 1
-            self.widget.after(self.duration // self.steps, self.animate)
-    
-    @staticmethod
-    def ease_out(t):
-        """Easing function for smooth animation"""
-        return 1 - (1 - t) ** 3
+        get_animator(widget).tween(
+            widget, 'place', 0.0, 1.0, duration, self.apply,
+            easing=ease_out_cubic
+        )
+
+    def apply(self, progress):
+        # Calculate current position
+        if self.direction in ['top', 'bottom']:
+            y = self.start_y + (self.original_y - self.start_y) * progress
+            x = self.original_x
+        else:  # left or right
+            x = self.start_x + (self.original_x - self.start_x) * progress
+            y = self.original_y
+
+        # Update position
+        self.widget.place(x=int(x), y=int(y))
 
 class HoverEffect:
     def __init__(self, widget, color_from, color_to, duration=200):
         self.widget = widget
         # Convert to solid colors by removing alpha channel
-        self.color_from = color_from[:7] if len(color_from) > 7 else color_from
-        self.color_to = color_to[:7] if len(color_to) > 7 else color_to
+        self.color_from = solid_color(color_from)
+        self.color_to = solid_color(color_to)
         self.duration = duration
         self.steps = 10
-        
+        self.colors = gradient(self.color_from, self.color_to, self.steps)
+        self.progress = 0.0
+        self.current_color = None
+
         # Set initial color
         self.widget.config(bg=self.color_from)
-        
+
         # Bind events
-        self.widget.bind("<Enter>", self.on_enter)
-        self.widget.bind("<Leave>", self.on_leave)
-        
-        # Current animation ID
-        self.anim_id = None
-    
+        # Added to, not replacing, bindings such as tooltips
+        self.widget.bind("<Enter>", self.on_enter, add='+')
+        self.widget.bind("<Leave>", self.on_leave, add='+')
+
     def on_enter(self, event):
-        self.animate(self.color_from, self.color_to)
-    
+        self.animate(1.0)
+
     def on_leave(self, event):
-        self.animate(self.color_to, self.color_from)
-    
-    def animate(self, from_color, to_color):
-        if self.anim_id is not None:
-            self.widget.after_cancel(self.anim_id)
-        
-        # Convert colors to RGB
-        from_rgb = self.hex_to_rgb(from_color)
-        to_rgb = self.hex_to_rgb(to_color)
-        
-        # Calculate color steps
-        steps = []
-        for i in range(self.steps + 1):
-            r = from_rgb[0] + (to_rgb[0] - from_rgb[0]) * i / self.steps
-            g = from_rgb[1] + (to_rgb[1] - from_rgb[1]) * i / self.steps
-            b = from_rgb[2] + (to_rgb[2] - from_rgb[2]) * i / self.steps
-            steps.append(self.rgb_to_hex((int(r), int(g), int(b))))
-        
-        # Start animation
-        self.animate_step(0, steps)
-    
-    def animate_step(self, step, colors):
-        if step < len(colors):
-            self.widget.config(bg=colors[step])
-            self.anim_id = self.widget.after(
-                self.duration // len(colors),
-                lambda: self.animate_step(step + 1, colors)
-            )
-    
+        self.animate(0.0)
+
+    def animate(self, target):
+        # Reversing mid-way continues from the current colour, and only
+        # takes as long as the remaining distance
+        distance = abs(target - self.progress)
+        get_animator(self.widget).tween(
+            self.widget, 'bg', self.progress, target,
+            int(self.duration * distance), self.apply, easing=linear
+        )
+
+    def apply(self, progress):
+        self.progress = progress
+        color = self.colors[int(round(progress * self.steps))]
+        # Skip the Tk call when the colour band hasn't changed
+        if color != self.current_color:
+            self.current_color = color
+            self.widget.config(bg=color)
+
     @staticmethod
     def hex_to_rgb(hex_color):
-        hex_color = hex_color.lstrip('#')
-        return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
-    
+        return hex_to_rgb(hex_color)
+
     @staticmethod
     def rgb_to_hex(rgb):
-        return '#%02x%02x%02x' % rgb
+        return rgb_to_hex(rgb)
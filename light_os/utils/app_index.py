@@ -0,0 +1,316 @@
+import json
+import os
+import queue
+import re
+import threading
+
+from utils.settings import JsonWriter
+
+INDEX_FILE = "cache/apps_index.json"
+INDEX_VERSION = 3
+
+# Exec field codes (%f, %U, ...) the launcher has nothing to substitute
+# for, and %% for a literal percent sign
+FIELD_CODE = re.compile(r'%([%fFuUdDnNickvm])')
+
+# String escapes every value may use; Exec values also have their own
+STRING_ESCAPES = {'s': ' ', 'n': '\n', 't': '\t', 'r': '\r', '\\': '\\'}
+
+# Emoji shown in the dock for an app, by its first matching category
+CATEGORY_ICONS = (
+    ('WebBrowser', '🌐'),
+    ('TerminalEmulator', '💻'),
+    ('FileManager', '📁'),
+    ('TextEditor', '📝'),
+    ('Calculator', '🧮'),
+    ('Settings', '⚙️'),
+    ('Office', '📄'),
+    ('Graphics', '🎨'),
+    ('AudioVideo', '🎵'),
+    ('Game', '🎮'),
+    ('Development', '🛠️'),
+    ('Network', '🌐'),
+    ('System', '🖥️'),
+    ('Utility', '🧰'),
+)
+DEFAULT_ICON = '📦'
+
+# freedesktop.org main categories -> menu label
+MAIN_CATEGORIES = {
+    'AudioVideo': "Multimedia",
+    'Development': "Development",
+    'Education': "Education",
+    'Game': "Games",
+    'Graphics': "Graphics",
+    'Network': "Internet",
+    'Office': "Office",
+    'Science': "Science",
+    'Settings': "Settings",
+    'System': "System",
+    'Utility': "Accessories",
+}
+
+
+def application_dirs():
+    """XDG applications directories, highest precedence first"""
+    data_home = os.environ.get('XDG_DATA_HOME') or os.path.expanduser('~/.local/share')
+    data_dirs = os.environ.get('XDG_DATA_DIRS') or '/usr/local/share:/usr/share'
+    dirs = []
+    for base in [data_home] + data_dirs.split(':'):
+        if base:
+            path = os.path.join(base, 'applications')
+            if path not in dirs:
+                dirs.append(path)
+    return dirs
+
+
+def unescape(value):
+    """Undo the \\s, \\n, \\t, \\r and \\\\ escapes of a string value"""
+    if '\\' not in value:
+        return value
+    return re.sub(r'\\(.)', lambda m: STRING_ESCAPES.get(m.group(1), m.group(1)), value)
+
+
+def unescape_exec(value):
+    """Decode an Exec value into a command line shlex splits as intended.
+
+    String escapes are decoded first, so the file's \\\\" becomes \\".
+    Inside quotes, \\$ and \\` then drop their backslash, while \\" and
+    \\\\ are left for shlex, which reads them the same way.
+    """
+    value = re.sub(r'\\(.)', lambda m: STRING_ESCAPES.get(m.group(1), m.group(0)), value)
+    return re.sub(r'\\([\\"`$])', lambda m: m.group(1) if m.group(1) in '`$' else m.group(0), value)
+
+
+def split_list(value):
+    return [item for item in value.split(';') if item]
+
+
+def parse_desktop_file(path):
+    """The [Desktop Entry] group of a .desktop file as a dict of strings"""
+    fields = {}
+    in_entry = False
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line[0] == '#':
+                continue
+            if line[0] == '[':
+                if in_entry:
+                    break
+                in_entry = line == '[Desktop Entry]'
+                continue
+            if in_entry:
+                key, sep, value = line.partition('=')
+                if sep:
+                    fields[key.strip()] = value.strip()
+    return fields
+
+
+def make_entry(fields):
+    """Launcher entry for a parsed .desktop file, or None if not shown.
+
+    Hidden and NoDisplay entries still return None rather than being
+    skipped, because they mask entries with the same ID further down
+    the XDG directory list.
+    """
+    if fields.get('Type') != 'Application' or not fields.get('Exec'):
+        return None
+    if fields.get('NoDisplay') == 'true' or fields.get('Hidden') == 'true':
+        return None
+    command = FIELD_CODE.sub(lambda m: '%' if m.group(1) == '%' else '', unescape_exec(fields['Exec']))
+    return {
+        'name': unescape(fields.get('Name', '')),
+        'generic_name': unescape(fields.get('GenericName', '')),
+        'comment': unescape(fields.get('Comment', '')),
+        'command': command.strip(),
+        'terminal': fields.get('Terminal') == 'true',
+        'icon_name': fields.get('Icon', ''),
+        'categories': split_list(fields.get('Categories', '')),
+        'keywords': split_list(unescape(fields.get('Keywords', ''))),
+    }
+
+
+def category_icon(categories):
+    """Dock emoji for an app's categories"""
+    for category, icon in CATEGORY_ICONS:
+        if category in categories:
+            return icon
+    return DEFAULT_ICON
+
+
+def main_category(categories):
+    """Menu label for an app's first main category"""
+    for category in categories:
+        if category in MAIN_CATEGORIES:
+            return MAIN_CATEGORIES[category]
+    return "Other"
+
+
+class AppIndex:
+    """Persisted index of the applications in the XDG directories.
+
+    For every directory under each applications root the index keeps
+    its mtime, its subdirectories and its .desktop files with their
+    mtimes and parsed entries. A rescan stats each known directory and
+    lists only those whose mtime changed; within those, files whose
+    mtime is unchanged keep their parsed entry. Package managers install
+    by renaming into place, which bumps the directory's mtime.
+
+    Loading and scanning run on a background thread; ``poll`` hands the
+    merged app list to the Tk thread once a scan finishes.
+    """
+
+    def __init__(self, path=INDEX_FILE, roots=None):
+        self.path = path
+        self.roots = roots if roots is not None else application_dirs()
+        self.writer = JsonWriter(path)
+        self.tree = None  # root -> {relative dir -> {'mtime', 'subdirs', 'files'}}
+        self.apps = []
+        self.results = queue.Queue()
+        self.thread = None
+
+    def load(self):
+        """Read the persisted index, if it is there and current"""
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            if data.get('version') == INDEX_VERSION:
+                return data['roots']
+        except (OSError, ValueError, KeyError) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"Error loading app index: {e}")
+        return {}
+
+    def start_scan(self):
+        """Rescan in the background unless a scan is already running"""
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._run, daemon=True, name="app-index")
+            self.thread.start()
+
+    def scanning(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def poll(self):
+        """The new app list if a scan finished since the last poll, else None"""
+        apps = None
+        while True:
+            try:
+                apps = self.results.get_nowait()
+            except queue.Empty:
+                return apps
+
+    def _run(self):
+        try:
+            if self.tree is None:
+                # Show the persisted apps first; the rescan follows
+                self.tree = self.load()
+                if self.tree:
+                    self.apps = self.merge(self.tree)
+                    self.results.put(self.apps)
+            tree, changed = self.scan(self.tree)
+        except Exception as e:
+            print(f"Error scanning applications: {e}")
+            return
+        if changed:
+            self.tree = tree
+            self.apps = self.merge(tree)
+            self.results.put(self.apps)
+            self.writer.schedule({'version': INDEX_VERSION, 'roots': tree})
+
+    def scan(self, previous):
+        """Bring a tree up to date; returns (tree, whether anything changed)"""
+        tree = {}
+        changed = False
+        for root in self.roots:
+            dirs = {}
+            if self.scan_dir(root, '', previous.get(root, {}), dirs):
+                changed = True
+            if dirs:
+                tree[root] = dirs
+        return tree, changed or set(tree) != set(previous)
+
+    def scan_dir(self, root, relative, previous, dirs):
+        """Add a directory and those below it to dirs; True if any changed"""
+        path = os.path.join(root, relative)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return relative in previous
+        cached = previous.get(relative)
+        changed = False
+        if cached is not None and cached['mtime'] == mtime:
+            record = cached
+        else:
+            changed = True
+            try:
+                record = self.list_dir(path, mtime, cached)
+            except OSError as e:
+                # Removed or made unreadable since the stat, e.g. mid
+                # upgrade: treat it as gone and keep scanning the rest
+                print(f"Error reading {path}: {e}")
+                return relative in previous
+        dirs[relative] = record
+        for name in record['subdirs']:
+            if self.scan_dir(root, os.path.join(relative, name), previous, dirs):
+                changed = True
+        return changed
+
+    def list_dir(self, path, mtime, cached):
+        """Read one directory, parsing only new or modified files"""
+        old_files = cached['files'] if cached is not None else {}
+        subdirs = []
+        files = {}
+        with os.scandir(path) as entries:
+            for item in entries:
+                try:
+                    # Symlinked directories are skipped: a link back up
+                    # the tree would otherwise recurse without end
+                    if item.is_dir(follow_symlinks=False):
+                        subdirs.append(item.name)
+                        continue
+                    if not item.name.endswith('.desktop'):
+                        continue
+                    file_mtime = item.stat().st_mtime_ns
+                    old = old_files.get(item.name)
+                    if old is not None and old[0] == file_mtime:
+                        files[item.name] = old
+                    else:
+                        files[item.name] = [file_mtime, make_entry(parse_desktop_file(item.path))]
+                except OSError as e:
+                    print(f"Error reading {item.path}: {e}")
+        return {'mtime': mtime, 'subdirs': sorted(subdirs), 'files': files}
+
+    def merge(self, tree):
+        """Visible apps, sorted by name, with desktop file IDs resolved.
+
+        The ID is the path below the applications root with '/' turned
+        into '-'; the first root that has an ID wins, even if its entry
+        is hidden.
+        """
+        seen = {}
+        for root in self.roots:
+            for relative, record in tree.get(root, {}).items():
+                prefix = relative.replace(os.sep, '-') + '-' if relative else ''
+                for name, (_, entry) in record['files'].items():
+                    app_id = prefix + name
+                    if app_id not in seen:
+                        seen[app_id] = entry
+        apps = []
+        for app_id, entry in seen.items():
+            if entry is not None and entry['name']:
+                app = dict(entry, id=app_id, icon=category_icon(entry['categories']))
+                apps.append(app)
+        apps.sort(key=lambda app: app['name'].casefold())
+        return apps
+
+
+_index = None
+
+
+def get_app_index():
+    """Return the shared application index"""
+    global _index
+    if _index is None:
+        _index = AppIndex()
+    return _index
@@ -0,0 +1,291 @@
+import queue
+import threading
+import tkinter as tk
+from collections import OrderedDict
+
+from utils.animations import hex_to_rgb, rgb_to_hex
+
+
+def parse_color(color):
+    """Split '#rrggbb' or '#rrggbbaa' into an RGB tuple and an alpha in 0..1"""
+    rgb = hex_to_rgb(color[:7])
+    alpha = int(color[7:9], 16) / 255 if len(color) >= 9 else 1.0
+    return rgb, alpha
+
+
+def box_blur(pixels, radius, passes=3):
+    """Separable box blur of an HxWx3 float array.
+
+    Three passes approximate a Gaussian. Each pass is two cumulative sums,
+    so the cost is independent of the radius.
+    """
+    import numpy as np
+
+    size = 2 * radius + 1
+    for _ in range(passes):
+        for axis in (0, 1):
+            # Pad by repeating edge pixels so borders don't darken
+            pad = [(0, 0)] * pixels.ndim
+            pad[axis] = (radius + 1, radius)
+            padded = np.pad(pixels, pad, mode='edge')
+            summed = np.cumsum(padded, axis=axis, dtype=np.float32)
+            upper = np.take(summed, range(size, summed.shape[axis]), axis=axis)
+            lower = np.take(summed, range(0, summed.shape[axis] - size), axis=axis)
+            pixels = (upper - lower) / size
+    return pixels
+
+
+class BackdropCompositor:
+    """Renders frosted-glass backdrops from the scaled wallpaper.
+
+    Each backdrop is the widget's rectangle cut from the wallpaper,
+    blurred and tinted with the widget's translucent colour. Results are
+    cached per (wallpaper, rect, colour, theme), so work is only redone
+    when a widget moves or the wallpaper changes.
+
+    Decoding the wallpaper and blurring run on a background thread; a
+    scheduler job hands finished images to the Tk thread, which only
+    wraps them in a PhotoImage.
+    """
+
+    def __init__(self, radius=12, max_entries=32):
+        self.radius = radius
+        self.max_entries = max_entries
+        self.canvas = None
+        self.source_path = None
+        self.source = None  # (path, pixels); only touched by the worker
+        self.cache = OrderedDict()
+        self.subscribers = []
+        self.available = True
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+        self.pending = {}  # key -> callbacks waiting for it
+        self.thread = None
+        self.results_job = None
+
+    def set_wallpaper(self, canvas, cached_path):
+        """Use a screen-sized wallpaper file as the backdrop source"""
+        self.canvas = canvas
+        if self.results_job is None:
+            from utils.scheduler import get_scheduler
+
+            self.results_job = get_scheduler(canvas).every(1, self.poll_results, name="backdrop-results",
+                                                           stretch=False)
+            self.results_job.suspend()
+        if cached_path == self.source_path:
+            return
+        self.source_path = cached_path
+        # Decoded by the worker, the first time a backdrop is rendered
+        self.cache.clear()
+        for callback in list(self.subscribers):
+            callback()
+
+    def subscribe(self, callback):
+        """Call callback() whenever the wallpaper changes"""
+        self.subscribers.append(callback)
+        return lambda: self.subscribers.remove(callback)
+
+    def load_source(self, path):
+        """Decoded wallpaper pixels, kept for the most recent path"""
+        if self.source is None or self.source[0] != path:
+            import numpy as np
+            from PIL import Image
+
+            with Image.open(path) as img:
+                self.source = (path, np.asarray(img.convert('RGB')))
+        return self.source[1]
+
+    def render(self, rect, color, theme, callback):
+        """Return (PhotoImage, mean colour) for rect if it is cached.
+
+        Otherwise return None and render it in the background, calling
+        callback(result) on the Tk thread once it is ready. Nothing is
+        rendered without a wallpaper.
+        """
+        key = (self.source_path, rect, color, theme)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self.cache[key]
+
+        if not self.available or self.source_path is None:
+            return None
+        if key not in self.pending:
+            self.pending[key] = []
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._worker, daemon=True, name="backdrop")
+                self.thread.start()
+            self.requests.put(key)
+            self.results_job.resume()
+        self.pending[key].append(callback)
+        return None
+
+    def _worker(self):
+        while True:
+            key = self.requests.get()
+            path, rect, color, _ = key
+            if path != self.source_path:
+                # The wallpaper changed before we got to it
+                self.results.put((key, None, None))
+                continue
+            try:
+                self.results.put((key, self.composite(self.load_source(path), rect, color), None))
+            except Exception as e:
+                self.results.put((key, None, e))
+
+    def poll_results(self):
+        """Wrap finished backdrops in PhotoImages, then stop polling"""
+        while True:
+            try:
+                key, result, error = self.results.get_nowait()
+            except queue.Empty:
+                break
+            callbacks = self.pending.pop(key, [])
+            if isinstance(error, ImportError):
+                # NumPy or Pillow missing: widgets keep their solid colours
+                print(f"Backdrops disabled: {error}")
+                self.available = False
+                continue
+            if error is not None:
+                print(f"Error rendering backdrop: {error}")
+                continue
+            if result is None or key[0] != self.source_path:
+                continue
+            try:
+                from PIL import ImageTk
+
+                pixels, mean = result
+                result = (ImageTk.PhotoImage(pixels), mean)
+            except ImportError as e:
+                print(f"Backdrops disabled: {e}")
+                self.available = False
+                continue
+
+            self.cache[key] = result
+            while len(self.cache) > self.max_entries:
+                self.cache.popitem(last=False)
+            for callback in callbacks:
+                callback(result)
+        if not self.pending:
+            self.results_job.suspend()
+
+    def composite(self, source, rect, color):
+        """Blurred, tinted PIL image of rect and its mean colour; runs on the worker"""
+        import numpy as np
+        from PIL import Image
+
+        x, y, width, height = rect
+        screen_height, screen_width = source.shape[:2]
+        # Take a margin around the widget so the blur has real neighbours
+        margin = self.radius * 3
+        left, top = max(0, x - margin), max(0, y - margin)
+        right = min(screen_width, x + width + margin)
+        bottom = min(screen_height, y + height + margin)
+        if right - left <= 0 or bottom - top <= 0 or width <= 0 or height <= 0:
+            return None
+
+        pixels = box_blur(source[top:bottom, left:right].astype(np.float32), self.radius)
+        inner = pixels[y - top:y - top + height, x - left:x - left + width]
+
+        tint, alpha = parse_color(color)
+        inner = inner * (1 - alpha) + np.array(tint, dtype=np.float32) * alpha
+        inner = np.clip(inner, 0, 255).astype(np.uint8)
+
+        mean = tuple(int(c) for c in inner.reshape(-1, 3).mean(axis=0))
+        return Image.fromarray(inner, 'RGB'), rgb_to_hex(mean)
+
+
+class FrostedBackdrop:
+    """Puts a frosted-glass backdrop behind a widget frame.
+
+    The backdrop is a label filling the frame, kept below the frame's
+    other children, and the children take the backdrop's average colour
+    so they blend in. It re-renders when the frame moves or resizes and
+    when the wallpaper changes.
+    """
+
+    SETTLE_DELAY = 150
+
+    def __init__(self, frame, color):
+        self.frame = frame
+        self.color = color
+        self.compositor = get_compositor()
+        self.rect = None
+        self.requested = None
+        self.render_id = None
+
+        self.label = tk.Label(frame, bd=0, highlightthickness=0)
+        self.label.place(x=0, y=0, relwidth=1, relheight=1)
+        self.label.lower()
+
+        self.frame.bind("<Configure>", lambda e: self.schedule_render(), add='+')
+        self.unsubscribe = self.compositor.subscribe(self.refresh)
+        self.label.bind("<Destroy>", lambda e: self.unsubscribe(), add='+')
+        self.schedule_render()
+
+    def refresh(self):
+        """Re-render even if the widget did not move"""
+        self.rect = None
+        self.schedule_render()
+
+    def schedule_render(self):
+        # Wait for the widget to settle, so slide-ins and drags render once
+        # at their final position rather than on every frame
+        if self.render_id is not None:
+            self.frame.after_cancel(self.render_id)
+        self.render_id = self.frame.after(self.SETTLE_DELAY, self.render)
+
+    def render(self):
+        self.render_id = None
+        canvas = self.compositor.canvas
+        if canvas is None or not self.frame.winfo_ismapped():
+            return
+        rect = (
+            self.frame.winfo_rootx() - canvas.winfo_rootx(),
+            self.frame.winfo_rooty() - canvas.winfo_rooty(),
+            self.frame.winfo_width(),
+            self.frame.winfo_height()
+        )
+        if rect == self.rect:
+            return
+
+        from utils.theme import current_theme
+
+        self.requested = rect
+        result = self.compositor.render(rect, self.color, current_theme,
+                                        lambda result: self.show(rect, result))
+        if result is not None:
+            self.show(rect, result)
+
+    def show(self, rect, result):
+        """Put a rendered backdrop up, unless the widget has moved on"""
+        if rect != self.requested or not self.label.winfo_exists():
+            return
+        self.rect = rect
+        image, mean = result
+        self.label.config(image=image)
+        self.label.image = image  # Keep a reference
+        self.blend_children(self.frame, mean)
+
+    def blend_children(self, widget, color):
+        for child in widget.winfo_children():
+            # Canvases draw their own content (e.g. progress bar troughs)
+            if child is self.label or isinstance(child, (tk.Toplevel, tk.Canvas)):
+                continue
+            try:
+                child.config(bg=color)
+            except tk.TclError:
+                pass
+            self.blend_children(child, color)
+
+
+_compositor = None
+
+
+def get_compositor():
+    """Return the shared backdrop compositor"""
+    global _compositor
+    if _compositor is None:
+        from utils.settings import get_settings
+
+        _compositor = BackdropCompositor(radius=get_settings().get('backdrop.blur_radius', 12))
+    return _compositor
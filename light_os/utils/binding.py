@@ -0,0 +1,111 @@
+# Dirty-checked bindings from values to Tk widgets. Each binding remembers
+# what it last sent to Tk and only makes a Tcl call when the visible result
+# changes: the formatted text, a bar's pixel length or colour band, or a
+# line's coordinates. Widgets set values every tick and let the binding
+# decide whether anything happens.
+
+# (upper bound in percent, colour) for usage bars
+USAGE_BANDS = ((70, '#4CAF50'), (90, '#ff9800'), (None, '#f44336'))
+
+
+def usage_color(percent, bands=USAGE_BANDS):
+    """Colour band for a percentage"""
+    for limit, color in bands:
+        if limit is None or percent <= limit:
+            return color
+    return bands[-1][1]
+
+
+class TextBinding:
+    """Binds a string to a widget option, 'text' by default"""
+
+    def __init__(self, widget, option='text', value=None):
+        self.widget = widget
+        self.option = option
+        # The widget's current value, if the caller knows it; saves a cget
+        self.value = value
+
+    def set(self, value):
+        """Update the widget if value differs from what it shows"""
+        if value != self.value:
+            self.value = value
+            self.widget.config(**{self.option: value})
+            return True
+        return False
+
+
+class CanvasWidthMixin:
+    """Tracks a canvas's width from <Configure> instead of asking Tk"""
+
+    DEFAULT_WIDTH = 200
+
+    def track_width(self, canvas):
+        self.canvas = canvas
+        self.width = self.DEFAULT_WIDTH
+        canvas.bind('<Configure>', self.on_configure, add='+')
+
+    def on_configure(self, event):
+        if event.width > 1 and event.width != self.width:
+            self.width = event.width
+            self.redraw()
+
+    def redraw(self):
+        """Called after the width changes; nothing to draw by default"""
+
+
+class BarBinding(CanvasWidthMixin):
+    """Binds a percentage to a rectangle on a canvas, coloured by band"""
+
+    def __init__(self, canvas, item, height=4, bands=USAGE_BANDS):
+        self.item = item
+        self.height = height
+        self.bands = bands
+        self.percent = 0
+        self.pixels = 0
+        self.color = None
+        self.track_width(canvas)
+
+    def set(self, percent):
+        self.percent = percent
+        self.redraw()
+
+    def redraw(self):
+        pixels = int((self.percent / 100) * self.width)
+        if pixels != self.pixels:
+            self.pixels = pixels
+            self.canvas.coords(self.item, 0, 0, pixels, self.height)
+        color = usage_color(self.percent, self.bands)
+        if color != self.color:
+            self.color = color
+            self.canvas.itemconfig(self.item, fill=color)
+
+
+class LineBinding(CanvasWidthMixin):
+    """Binds a sequence of values to a line item, scaled to the canvas"""
+
+    def __init__(self, canvas, item, height, maximum=100):
+        self.item = item
+        self.height = height
+        self.maximum = maximum
+        self.values = ()
+        self.coords = None
+        self.track_width(canvas)
+
+    def set(self, values):
+        self.values = values
+        self.redraw()
+
+    def redraw(self):
+        values = self.values
+        if len(values) < 2:
+            return
+        step = self.width / (len(values) - 1)
+        scale = (self.height - 2) / self.maximum
+        # Round to whole pixels so sub-pixel changes don't cost a redraw
+        coords = []
+        for i, value in enumerate(values):
+            coords.append(round(i * step))
+            coords.append(round(self.height - 1 - min(value, self.maximum) * scale))
+        if coords != self.coords:
+            self.coords = coords
+            self.canvas.coords(self.item, *coords)
@@ -0,0 +1,168 @@
+import os
+import select
+import time
+
+MOUNTS_FILE = "/proc/self/mounts"
+
+# Virtual and image-backed filesystems that don't belong in a disk panel
+PSEUDO_FILESYSTEMS = {
+    'autofs', 'binfmt_misc', 'bpf', 'cgroup', 'cgroup2', 'configfs', 'debugfs',
+    'devpts', 'devtmpfs', 'efivarfs', 'fusectl', 'hugetlbfs', 'mqueue', 'nsfs',
+    'proc', 'pstore', 'ramfs', 'rpc_pipefs', 'securityfs', 'squashfs', 'sysfs',
+    'tmpfs', 'tracefs', 'fuse.gvfsd-fuse', 'fuse.portal'
+}
+
+# Without /proc/self/mounts to watch, rescan this often (seconds)
+RESCAN_INTERVAL = 60
+
+
+class MountWatcher:
+    """Tells whether the mount table changed since the last check.
+
+    On Linux the kernel flags /proc/self/mounts with POLLPRI whenever
+    something is mounted or unmounted, so a zero-timeout poll is all a
+    check costs. Elsewhere it falls back to a periodic rescan.
+    """
+
+    def __init__(self, path=MOUNTS_FILE):
+        self.file = None
+        self.poller = None
+        self.last_scan = None
+        try:
+            self.file = open(path)
+            self.file.read()
+            self.poller = select.poll()
+            self.poller.register(self.file, select.POLLPRI | select.POLLERR)
+        except (OSError, AttributeError):
+            # No procfs, or no poll() (Windows)
+            self.close()
+
+    def changed(self):
+        """True on the first call and after any mount or unmount"""
+        now = time.monotonic()
+        if self.last_scan is None:
+            self.last_scan = now
+            return True
+        if self.poller is None:
+            if now - self.last_scan >= RESCAN_INTERVAL:
+                self.last_scan = now
+                return True
+            return False
+        if not self.poller.poll(0):
+            return False
+        # Reading the file to the end clears the event
+        self.file.seek(0)
+        self.file.read()
+        self.last_scan = now
+        return True
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+        self.file = None
+        self.poller = None
+
+
+def io_name(device):
+    """Key of a partition's device in disk_io_counters(perdisk=True)"""
+    # /dev/mapper/* and /dev/disk/by-* are symlinks to the kernel name
+    return os.path.basename(os.path.realpath(device))
+
+
+class DiskMonitor:
+    """Usage and I/O rates for every real mounted filesystem.
+
+    The mount list is cached and only re-read when MountWatcher reports
+    a change. Rates come from the difference between two readings of
+    the per-device I/O counters.
+    """
+
+    def __init__(self, mountpoints=None, rows=3):
+        self.mountpoints = list(mountpoints or [])
+        self.rows = rows
+        self.watcher = MountWatcher()
+        self.partitions = []
+        self.prev_io = {}
+        self.prev_time = None
+
+    def partitions_changed(self):
+        """Re-read the mount list if it changed; returns True if it did"""
+        if not self.watcher.changed():
+            return False
+        import psutil
+
+        partitions = []
+        seen = set()
+        for part in psutil.disk_partitions(all=False):
+            if part.fstype in PSEUDO_FILESYSTEMS or part.device.startswith('/dev/loop'):
+                continue
+            # Bind mounts show the same device more than once
+            if part.device in seen:
+                continue
+            if self.mountpoints and part.mountpoint not in self.mountpoints:
+                continue
+            seen.add(part.device)
+            partitions.append(part)
+
+        if self.mountpoints:
+            order = {path: i for i, path in enumerate(self.mountpoints)}
+            partitions.sort(key=lambda part: order[part.mountpoint])
+        else:
+            # Root or the system drive first, then by mount point
+            root = os.path.abspath(os.sep)
+            partitions.sort(key=lambda part: (part.mountpoint != root, part.mountpoint))
+        self.partitions = partitions[:self.rows]
+        return True
+
+    def sample(self):
+        """Return one dict per mount with usage and I/O rates"""
+        import psutil
+
+        self.partitions_changed()
+        now = time.monotonic()
+        try:
+            io = psutil.disk_io_counters(perdisk=True) or {}
+        except Exception:
+            io = {}
+        elapsed = now - self.prev_time if self.prev_time is not None else None
+
+        disks = []
+        for part in self.partitions:
+            try:
+                usage = psutil.disk_usage(part.mountpoint)
+            except OSError:
+                continue
+            disk = {
+                'mountpoint': part.mountpoint,
+                'device': part.device,
+                'fstype': part.fstype,
+                'percent': usage.percent,
+                'used': usage.used,
+                'total': usage.total,
+                'read_rate': None,
+                'write_rate': None,
+                'read_iops': None,
+                'write_iops': None,
+                'counters': None
+            }
+            name = io_name(part.device)
+            counters = io.get(name)
+            if counters is not None:
+                disk['counters'] = {
+                    'read_bytes': counters.read_bytes,
+                    'write_bytes': counters.write_bytes,
+                    'reads': counters.read_count,
+                    'writes': counters.write_count
+                }
+            previous = self.prev_io.get(name)
+            if counters is not None and previous is not None and elapsed:
+                # Counters go backwards if the device was replaced
+                disk['read_rate'] = max(0, counters.read_bytes - previous.read_bytes) / elapsed
+                disk['write_rate'] = max(0, counters.write_bytes - previous.write_bytes) / elapsed
+                disk['read_iops'] = max(0, counters.read_count - previous.read_count) / elapsed
+                disk['write_iops'] = max(0, counters.write_count - previous.write_count) / elapsed
+            disks.append(disk)
+
+        self.prev_io = io
+        self.prev_time = now
+        return tuple(disks)
@@ -0,0 +1,245 @@
+import atexit
+import os
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+EMPTY_PAYLOAD = b"# EOF\n"
+
+
+def escape_label(value):
+    """Escape a label value for the text exposition format"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class MetricFamily:
+    """Lines for one metric family, with its TYPE and HELP headers"""
+
+    def __init__(self, name, kind, help_text, unit=None):
+        self.name = name
+        self.kind = kind
+        self.lines = [f"# TYPE {name} {kind}"]
+        if unit:
+            self.lines.append(f"# UNIT {name} {unit}")
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.samples = 0
+
+    def add(self, value, labels=None, suffix=''):
+        if value is None:
+            return
+        if labels:
+            label_text = ','.join(f'{key}="{escape_label(val)}"' for key, val in labels.items())
+            self.lines.append(f"{self.name}{suffix}{{{label_text}}} {value}")
+        else:
+            self.lines.append(f"{self.name}{suffix} {value}")
+        self.samples += 1
+
+    def counter(self, value, labels=None):
+        self.add(value, labels, '_total')
+
+
+def render_openmetrics(snapshot, extra=()):
+    """Render a sampler snapshot as an OpenMetrics text payload.
+
+    ``extra`` is a sequence of callables returning further MetricFamily
+    objects, so other modules can publish through the same endpoint.
+    """
+    families = []
+
+    def family(*args, **kwargs):
+        metric = MetricFamily(*args, **kwargs)
+        families.append(metric)
+        return metric
+
+    family('lightos_cpu_usage_percent', 'gauge',
+           'Whole-machine CPU usage.', 'percent').add(snapshot['cpu'])
+
+    memory = snapshot['memory']
+    family('lightos_memory_used_bytes', 'gauge',
+           'Memory in use.', 'bytes').add(memory['used'])
+    family('lightos_memory_total_bytes', 'gauge',
+           'Installed memory.', 'bytes').add(memory['total'])
+
+    fs_used = family('lightos_filesystem_used_bytes', 'gauge',
+                     'Space used per mounted filesystem.', 'bytes')
+    fs_size = family('lightos_filesystem_size_bytes', 'gauge',
+                     'Size of each mounted filesystem.', 'bytes')
+    disk_read = family('lightos_disk_read_bytes', 'counter',
+                       'Bytes read from the device behind each mount.', 'bytes')
+    disk_written = family('lightos_disk_written_bytes', 'counter',
+                          'Bytes written to the device behind each mount.', 'bytes')
+    disk_reads = family('lightos_disk_reads', 'counter',
+                        'Read operations completed.')
+    disk_writes = family('lightos_disk_writes', 'counter',
+                         'Write operations completed.')
+    for disk in snapshot.get('disks', ()):
+        labels = {'mountpoint': disk['mountpoint'], 'device': disk['device'],
+                  'fstype': disk['fstype']}
+        fs_used.add(disk['used'], labels)
+        fs_size.add(disk['total'], labels)
+        counters = disk['counters']
+        if counters is not None:
+            disk_read.counter(counters['read_bytes'], labels)
+            disk_written.counter(counters['write_bytes'], labels)
+            disk_reads.counter(counters['reads'], labels)
+            disk_writes.counter(counters['writes'], labels)
+
+    net_sent = family('lightos_network_transmit_bytes', 'counter',
+                      'Bytes sent per interface.', 'bytes')
+    net_recv = family('lightos_network_receive_bytes', 'counter',
+                      'Bytes received per interface.', 'bytes')
+    for nic in snapshot['net']['interfaces']:
+        labels = {'interface': nic['name']}
+        net_sent.counter(nic['bytes_sent'], labels)
+        net_recv.counter(nic['bytes_recv'], labels)
+
+    top = family('lightos_top_process_cpu_percent', 'gauge',
+                 'CPU usage of the busiest processes.', 'percent')
+    for pid, name, cpu, rss in snapshot.get('processes', ()):
+        top.add(round(cpu, 2), {'pid': pid, 'name': name})
+
+    family('lightos_sampler_samples', 'counter',
+           'Samples taken since the desktop started.').counter(snapshot['sequence'])
+    family('lightos_sampler_timestamp_seconds', 'gauge',
+           'Wall-clock time of the latest sample.', 'seconds').add(snapshot['time'])
+
+    for source in extra:
+        try:
+            families.extend(source())
+        except Exception as e:
+            print(f"Error rendering exported metrics: {e}")
+
+    lines = []
+    for metric in families:
+        if metric.samples:
+            lines.extend(metric.lines)
+    lines.append("# EOF")
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Serves the exporter's cached payload on /metrics"""
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        # One reference read; the payload itself is never modified
+        payload = self.server.exporter.payload
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def address_string(self):
+        # Unix socket clients have no address
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would flood stdout
+        pass
+
+
+class UnixMetricsServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class MetricsExporter:
+    """Serves the latest metrics sample in OpenMetrics format.
+
+    The payload is rendered once per sample, on the sampler thread, and
+    swapped in as a single bytes object; a scrape only writes it out.
+    ``address`` is 'host:port' for TCP or 'unix:/path' for a Unix socket.
+    """
+
+    def __init__(self, sampler, address='127.0.0.1:9101'):
+        self.sampler = sampler
+        self.address = address
+        self.payload = EMPTY_PAYLOAD
+        self.sources = []
+        self.server = None
+        self.thread = None
+        self.socket_path = None
+        self.unsubscribe = None
+
+    def add_source(self, source):
+        """Add a callable returning extra MetricFamily objects per sample"""
+        self.sources.append(source)
+
+    def start(self):
+        """Bind the endpoint and start serving"""
+        if self.server is not None:
+            return True
+        try:
+            self.server = self.create_server()
+        except OSError as e:
+            print(f"Error starting metrics exporter on {self.address}: {e}")
+            return False
+        self.server.exporter = self
+
+        if self.sampler.latest is not None:
+            self.on_sample(self.sampler.latest)
+        self.unsubscribe = self.sampler.add_listener(self.on_sample)
+
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True,
+                                       name="metrics-exporter")
+        self.thread.start()
+        # Remove the Unix socket file on exit
+        atexit.register(self.stop)
+        print(f"Serving metrics on {self.address}")
+        return True
+
+    def create_server(self):
+        if self.address.startswith('unix:'):
+            path = self.address[len('unix:'):]
+            # Clear a socket left behind by a previous run
+            if os.path.exists(path):
+                os.unlink(path)
+            server = UnixMetricsServer(path, MetricsHandler)
+            self.socket_path = path
+            return server
+        host, _, port = self.address.rpartition(':')
+        server = ThreadingHTTPServer((host or '127.0.0.1', int(port)), MetricsHandler)
+        server.daemon_threads = True
+        return server
+
+    def stop(self):
+        """Stop serving and release the socket"""
+        if self.unsubscribe is not None:
+            self.unsubscribe()
+            self.unsubscribe = None
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        if self.socket_path is not None:
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+            self.socket_path = None
+
+    def on_sample(self, snapshot):
+        try:
+            self.payload = render_openmetrics(snapshot, self.sources)
+        except Exception as e:
+            print(f"Error rendering metrics: {e}")
+
+
+_exporter = None
+
+
+def get_exporter():
+    """Return the shared exporter, bound to the configured address"""
+    global _exporter
+    if _exporter is None:
+        from utils.metrics import get_sampler
+        from utils.settings import get_settings
+
+        _exporter = MetricsExporter(
+            get_sampler(), get_settings().get('exporter.address', '127.0.0.1:9101')
+        )
+    return _exporter
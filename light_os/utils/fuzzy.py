@@ -0,0 +1,276 @@
+import bisect
+import heapq
+import json
+import math
+import time
+
+from utils.settings import JsonWriter
+
+FRECENCY_FILE = "cache/frecency.json"
+
+# Characters that start a new word after them
+WORD_BREAKS = frozenset(' -_.')
+
+# Ranking tiers; a frecency bonus never exceeds MAX_BONUS, so it reorders
+# apps within a tier but never lifts one into the tier above
+PREFIX = 300
+WORD = 200
+KEYWORD = 100
+FUZZY = 0
+MAX_BONUS = 90
+GAP_PENALTY = 2
+POSITION_PENALTY = 0.5
+
+# (age limit in days, weight) for frecency, after Firefox's buckets
+RECENCY_BUCKETS = ((4, 100), (14, 70), (31, 50), (90, 30), (None, 10))
+
+
+def word_starts(text):
+    """Positions in text where a word starts"""
+    return [i for i, char in enumerate(text)
+            if char not in WORD_BREAKS and (i == 0 or text[i - 1] in WORD_BREAKS)]
+
+
+def word_prefix(name, query):
+    """True if a word after the first in name starts with query"""
+    position = name.find(query, 1)
+    while position != -1:
+        if name[position - 1] in WORD_BREAKS:
+            return True
+        position = name.find(query, position + 1)
+    return False
+
+
+def fuzzy_match(name, query):
+    """(start, end) of the first match of query's characters in order,
+    starting at a word, or None.
+
+    Each later character is taken at its first occurrence, which gives
+    the tightest match from that start. Plain str.find calls, so a new
+    query costs no regex compile.
+    """
+    first = query[0]
+    start = name.find(first)
+    while start != -1:
+        if start == 0 or name[start - 1] in WORD_BREAKS:
+            end = start + 1
+            for char in query[1:]:
+                end = name.find(char, end) + 1
+                if not end:
+                    # A later start would only search less of the name
+                    return None
+            return start, end
+        start = name.find(first, start + 1)
+    return None
+
+
+def prefix_range(keys, prefix):
+    """Slice bounds of the sorted keys that start with prefix"""
+    return bisect.bisect_left(keys, prefix), bisect.bisect_left(keys, prefix + '\uffff')
+
+
+class FrecencyStore:
+    """How often and how recently each app was launched, by app ID"""
+
+    def __init__(self, path=FRECENCY_FILE):
+        self.path = path
+        self.writer = JsonWriter(path)
+        try:
+            with open(path) as f:
+                self.launches = json.load(f)  # app id -> [count, last launch]
+        except (OSError, ValueError):
+            self.launches = {}
+
+    def record(self, app_id):
+        count, _ = self.launches.get(app_id, (0, 0))
+        self.launches[app_id] = [count + 1, time.time()]
+        self.writer.schedule(self.launches)
+
+    def scores(self, now=None):
+        """Frecency of every launched app: launch count times recency weight"""
+        now = time.time() if now is None else now
+        scores = {}
+        for app_id, (count, last) in self.launches.items():
+            age = (now - last) / 86400
+            for limit, weight in RECENCY_BUCKETS:
+                if limit is None or age < limit:
+                    scores[app_id] = count * weight
+                    break
+        return scores
+
+
+class FuzzyIndex:
+    """Fuzzy search over the app index, ranked by match tier and frecency.
+
+    A query matches an app whose name starts with it, has a later word
+    starting with it, or has a keyword or generic name word starting with
+    it; or, fuzzily, whose name contains its characters in order starting
+    at a word, like "vsc" for Visual Studio Code. Those are the ranking
+    tiers, best first. Within a tier, apps launched often and recently
+    come first, then the rest by the matched text alphabetically (fuzzy
+    matches by how tight and early the match is).
+
+    The prefix tiers are ranges of sorted name, word and keyword lists,
+    found by bisection and walked only until the result list is full.
+    Fuzzy matching is only needed when they leave room, and is
+    incremental: the scored matches for every prefix of the query are
+    kept, so a longer query re-checks only the matches of the longest
+    prefix already searched, narrowed by per-character set intersections
+    first. Matching uses str.find rather than regexes, whose compile for
+    every new query cost more than the search itself.
+    """
+
+    def __init__(self, apps, frecency=None, limit=8):
+        self.apps = apps
+        self.limit = limit
+        self.names = [app['name'].casefold() for app in apps]
+        self.keywords = []
+
+        names = []
+        words = []
+        keywords = []
+        char_sets = {}
+        initial_sets = {}
+        for index, (name, app) in enumerate(zip(self.names, apps)):
+            names.append((name, index))
+            for position in word_starts(name):
+                if position:
+                    words.append((name[position:], index))
+                initial_sets.setdefault(name[position], set()).add(index)
+            for char in set(name):
+                char_sets.setdefault(char, set()).add(index)
+            extra = ' '.join([app.get('generic_name', '')] + app.get('keywords', [])).casefold()
+            app_keywords = tuple(set(extra.split()))
+            self.keywords.append(app_keywords)
+            keywords.extend((word, index) for word in app_keywords)
+
+        # Each tier as sorted keys with the app index of each key
+        self.tiers = []
+        for tier, entries in ((PREFIX, names), (WORD, words), (KEYWORD, keywords)):
+            entries.sort()
+            self.tiers.append((tier, [key for key, _ in entries], [index for _, index in entries]))
+        self.char_sets = {char: frozenset(indices) for char, indices in char_sets.items()}
+        self.initial_sets = {char: frozenset(indices) for char, indices in initial_sets.items()}
+
+        self.bonus = {}
+        self.set_frecency(frecency or {})
+        self.stack = [('', None)]  # (query, fuzzy matches) per prefix searched
+
+    def set_frecency(self, scores):
+        """Update frecency bonuses from {app id: frecency}"""
+        bonus = {}
+        for index, app in enumerate(self.apps):
+            frecency = scores.get(app.get('id'))
+            if frecency:
+                bonus[index] = min(MAX_BONUS, 10 * math.log2(1 + frecency))
+        self.bonus = bonus
+
+    def fuzzy_matches(self, query):
+        """{index: fuzzy score} of apps fuzzily matching a folded query"""
+        stack = self.stack
+        while not query.startswith(stack[-1][0]):
+            stack.pop()
+        previous, matches = stack[-1]
+        if query == previous:
+            return matches
+
+        # Only apps containing every new character can still match
+        new = query[len(previous):]
+        if matches is None:
+            candidates = self.initial_sets.get(query[0], frozenset())
+            new = new[1:]
+        else:
+            candidates = matches.keys()
+        for char in set(new):
+            candidates = candidates & self.char_sets.get(char, frozenset())
+        names = self.names
+        length = len(query)
+        matches = {}
+        for index in candidates:
+            match = fuzzy_match(names[index], query)
+            if match is not None:
+                matches[index] = self.fuzzy_score(match, length)
+        stack.append((query, matches))
+        return matches
+
+    @staticmethod
+    def fuzzy_score(match, length):
+        """Fuzzy tier score: tight matches near the start rank higher"""
+        start, end = match
+        return FUZZY - (end - start - length) * GAP_PENALTY - start * POSITION_PENALTY
+
+    def tier_of(self, index, query):
+        """Best prefix tier an app matches a query in, or None"""
+        name = self.names[index]
+        if name.startswith(query):
+            return PREFIX
+        if word_prefix(name, query):
+            return WORD
+        for word in self.keywords[index]:
+            if word.startswith(query):
+                return KEYWORD
+        return None
+
+    def search(self, query):
+        """The best apps for a query, at most limit of them"""
+        query = query.casefold().strip()
+        bonus = self.bonus
+        limit = self.limit
+        if not query:
+            # Most frecent first, then alphabetical
+            best = heapq.nlargest(limit, bonus, key=bonus.get)
+            for index in range(len(self.apps)):
+                if len(best) >= limit:
+                    break
+                if index not in best:
+                    best.append(index)
+            return [self.apps[index] for index in best]
+
+        # Frecent apps are scored individually; there are few of them
+        scored = []  # (score, walk order, index)
+        for index, extra in bonus.items():
+            score = self.tier_of(index, query)
+            if score is None:
+                match = fuzzy_match(self.names[index], query)
+                if match is None:
+                    continue
+                score = self.fuzzy_score(match, len(query))
+            scored.append((score + extra, 0, index))
+
+        # The rest, tier by tier in key order, until the list is full
+        seen = set(bonus)
+        order = 0
+        for tier, keys, owners in self.tiers:
+            low, high = prefix_range(keys, query)
+            # Indexing rather than a slice: a one-letter query's range can
+            # hold thousands of keys, of which a handful are used
+            for position in range(low, high):
+                index = owners[position]
+                if index in seen:
+                    continue
+                seen.add(index)
+                order -= 1
+                scored.append((tier, order, index))
+                if len(seen) - len(bonus) >= limit:
+                    break
+            else:
+                continue
+            break
+        else:
+            # Room left for fuzzy matches; every prefix match is in seen
+            for index, score in self.fuzzy_matches(query).items():
+                if index not in seen:
+                    scored.append((score, -index, index))
+
+        return [self.apps[index] for _, _, index in heapq.nlargest(limit, scored)]
+
+
+_frecency = None
+
+
+def get_frecency():
+    """Return the shared launch history"""
+    global _frecency
+    if _frecency is None:
+        _frecency = FrecencyStore()
+    return _frecency
@@ -0,0 +1,197 @@
+import math
+import threading
+import time
+from array import array
+
+# (name, bucket length in seconds, number of buckets kept)
+TIERS = (
+    ('1s', 1, 600),      # 10 minutes
+    ('10s', 10, 360),    # 1 hour
+    ('1m', 60, 720),     # 12 hours
+    ('10m', 600, 1008),  # 7 days
+)
+
+SERIES = ('cpu', 'memory', 'disk', 'net_sent', 'net_recv')
+
+# Hard cap so dynamically added series (e.g. per interface) stay bounded:
+# the standard five plus sent/received for two interfaces, about 490 KB
+MAX_SERIES = 9
+
+
+class RingTier:
+    """Fixed-size ring of min/max/avg buckets for one resolution.
+
+    Storage is preallocated ``array`` buffers, so adding a sample never
+    allocates. Samples accumulate into the open bucket, which is written
+    to the ring (and handed to the next tier) once a sample lands in a
+    later bucket.
+    """
+
+    def __init__(self, seconds, slots):
+        self.seconds = seconds
+        self.slots = slots
+        self.times = array('d', bytes(8 * slots))
+        self.mins = array('f', bytes(4 * slots))
+        self.maxs = array('f', bytes(4 * slots))
+        self.avgs = array('f', bytes(4 * slots))
+        self.head = 0
+        self.count = 0
+
+        # Open bucket
+        self.bucket = None
+        self.open_min = math.inf
+        self.open_max = -math.inf
+        self.open_sum = 0.0
+        self.open_n = 0
+
+    def add(self, timestamp, low, high, total, n):
+        """Fold a sample (or a closed finer bucket) into this tier.
+
+        Returns the bucket that was closed as (start, min, max, sum, n),
+        or None if the open bucket is still accumulating.
+        """
+        bucket = timestamp - timestamp % self.seconds
+        closed = None
+        if self.bucket is not None and bucket != self.bucket:
+            closed = self.close()
+        if self.bucket is None:
+            self.bucket = bucket
+        self.open_min = min(self.open_min, low)
+        self.open_max = max(self.open_max, high)
+        self.open_sum += total
+        self.open_n += n
+        return closed
+
+    def close(self):
+        closed = (self.bucket, self.open_min, self.open_max, self.open_sum, self.open_n)
+        i = self.head
+        self.times[i] = self.bucket
+        self.mins[i] = self.open_min
+        self.maxs[i] = self.open_max
+        self.avgs[i] = self.open_sum / self.open_n
+        self.head = (i + 1) % self.slots
+        self.count = min(self.count + 1, self.slots)
+
+        self.bucket = None
+        self.open_min = math.inf
+        self.open_max = -math.inf
+        self.open_sum = 0.0
+        self.open_n = 0
+        return closed
+
+    def window(self, count=None, since=None):
+        """The newest closed buckets, oldest first, as four arrays.
+
+        Limit by number of buckets and/or a start timestamp. Cost is
+        proportional to the window, not to the ring size.
+        """
+        n = self.count if count is None else min(count, self.count)
+        start = (self.head - n) % self.slots
+        if since is not None:
+            # Buckets are in time order, so bisect the ring for the start
+            lo, hi = 0, n
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if self.times[(start + mid) % self.slots] < since:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            start = (start + lo) % self.slots
+            n -= lo
+        return tuple(self._slice(buf, start, n)
+                     for buf in (self.times, self.mins, self.maxs, self.avgs))
+
+    def _slice(self, buf, start, n):
+        end = start + n
+        if end <= self.slots:
+            return buf[start:end]
+        return buf[start:] + buf[:end - self.slots]
+
+
+class MetricsHistory:
+    """Multi-resolution history for every metric series.
+
+    Each series has one RingTier per entry in TIERS; closed buckets roll
+    up into the next coarser tier, keeping min, max and average. Memory
+    is fixed at construction (about 54 KB per series with the default
+    tiers), however long the desktop runs.
+    """
+
+    def __init__(self, series=SERIES, tiers=TIERS):
+        self.tiers = tiers
+        self.tier_index = {name: i for i, (name, _, _) in enumerate(tiers)}
+        self.series = {}
+        self.lock = threading.Lock()
+        for name in series:
+            self.add_series(name)
+
+    def add_series(self, name):
+        """Start tracking a series; returns False once MAX_SERIES is reached"""
+        if name in self.series:
+            return True
+        if len(self.series) >= MAX_SERIES:
+            return False
+        self.series[name] = [RingTier(seconds, slots) for _, seconds, slots in self.tiers]
+        return True
+
+    def add(self, name, timestamp, value):
+        """Record one sample"""
+        tiers = self.series.get(name)
+        if tiers is None:
+            if not self.add_series(name):
+                return
+            tiers = self.series[name]
+        with self.lock:
+            closed = tiers[0].add(timestamp, value, value, value, 1)
+            for tier in tiers[1:]:
+                if closed is None:
+                    break
+                start, low, high, total, n = closed
+                closed = tier.add(start, low, high, total, n)
+
+    def record(self, snapshot):
+        """Record the standard series from a sampler snapshot"""
+        timestamp = snapshot['time']
+        self.add('cpu', timestamp, snapshot['cpu'])
+        self.add('memory', timestamp, snapshot['memory']['percent'])
+        if snapshot.get('disk'):
+            self.add('disk', timestamp, snapshot['disk']['percent'])
+        # Unsmoothed rates, so each bucket's max is the real peak
+        net = snapshot['net']
+        self.add('net_sent', timestamp, net['sent_instant'])
+        self.add('net_recv', timestamp, net['recv_instant'])
+        for nic in net['interfaces']:
+            self.add(f"net_sent:{nic['name']}", timestamp, nic['sent_instant'])
+            self.add(f"net_recv:{nic['name']}", timestamp, nic['recv_instant'])
+
+    def query(self, name, tier='1s', count=None, seconds=None, now=None):
+        """Return (times, mins, maxs, avgs) for a series at a resolution.
+
+        ``seconds`` limits the window to the last N seconds before now.
+        """
+        tiers = self.series.get(name)
+        if tiers is None:
+            empty = array('f')
+            return array('d'), empty, empty, empty
+        ring = tiers[self.tier_index[tier]]
+        since = None
+        if seconds is not None:
+            if now is None:
+                now = time.time()
+            since = now - seconds
+        with self.lock:
+            return ring.window(count, since)
+
+
+_history = None
+
+
+def get_history():
+    """Return the shared history, fed from the shared metrics sampler"""
+    global _history
+    if _history is None:
+        from utils.metrics import get_sampler
+
+        _history = MetricsHistory()
+        get_sampler().add_listener(_history.record)
+    return _history
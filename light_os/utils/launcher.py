@@ -0,0 +1,198 @@
+import os
+import re
+import shlex
+import shutil
+import subprocess
+import sys
+import time
+
+# Variables pointing at the desktop's own Python that would break Python
+# applications started from it
+PRIVATE_ENVIRONMENT = ('PYTHONPATH', 'PYTHONHOME', 'PYTHONSTARTUP')
+
+# A URI like ms-settings: or https://...; the scheme is at least two
+# characters, so drive letters (C:\...) are not mistaken for one
+URI = re.compile(r'[A-Za-z][A-Za-z0-9+.-]+:\S*$')
+
+# Terminal emulators tried, in order, for Terminal=true applications
+TERMINALS = ('x-terminal-emulator', 'gnome-terminal', 'konsole', 'xfce4-terminal', 'xterm')
+
+# Arguments that come before the command, for terminals where it is not
+# '-e' followed by argv (gnome-terminal's -e takes one string and is
+# deprecated; xfce4-terminal's -e takes a string too)
+TERMINAL_EXEC = {
+    'gnome-terminal': ['--'],
+    'xfce4-terminal': ['-x'],
+    'kitty': [],
+}
+
+
+def parse_command(command):
+    """Split a command line into argv"""
+    return shlex.split(command, posix=sys.platform != 'win32')
+
+
+def terminal_argv(argv):
+    """Wrap argv to run inside a terminal emulator"""
+    terminal = parse_command(os.environ.get('TERMINAL', ''))
+    if not terminal:
+        name = next((name for name in TERMINALS if shutil.which(name)), None)
+        if name is None:
+            return argv
+        terminal = [name]
+    return terminal + TERMINAL_EXEC.get(os.path.basename(terminal[0]), ['-e']) + argv
+
+
+def child_environment():
+    """Environment for launched applications"""
+    env = dict(os.environ)
+    for name in PRIVATE_ENVIRONMENT:
+        env.pop(name, None)
+    return env
+
+
+class LaunchedProcess:
+    """One application started by the supervisor"""
+
+    def __init__(self, name, command, popen):
+        self.name = name
+        self.command = command
+        self.popen = popen
+        self.pid = popen.pid
+        self.started = time.time()
+        self.ended = None
+        self.returncode = None
+
+    @property
+    def running(self):
+        return self.ended is None
+
+    def row(self):
+        """(pid, name, start time, exit status or None while running)"""
+        return (self.pid, self.name, self.started, self.returncode)
+
+
+class ProcessSupervisor:
+    """Starts applications and reaps them when they exit.
+
+    Children run in their own session with no terminal attached, so they
+    outlive the desktop and a launch never waits on them. While any are
+    running, a 1 s scheduler job polls them with a non-blocking wait,
+    which collects their exit status before they can linger as zombies.
+    The table of launched processes, running and recently exited, is
+    read with ``table``; ``subscribe`` announces starts and exits.
+    """
+
+    HISTORY = 20
+
+    def __init__(self, scheduler):
+        self.processes = []  # oldest first
+        self.listeners = []
+        self.reap_job = scheduler.every(1, self.reap, name="launcher-reap", stretch=False)
+        self.reap_job.suspend()
+
+    def launch(self, command, name=None, terminal=False):
+        """Start a command line; returns its LaunchedProcess, or None if there is none to track"""
+        if not command:
+            return None
+        try:
+            if sys.platform == 'win32':
+                popen = self.popen_windows(command)
+                if popen is None:
+                    return None
+            else:
+                argv = parse_command(command)
+                if terminal:
+                    argv = terminal_argv(argv)
+                popen = subprocess.Popen(
+                    argv, cwd=os.path.expanduser('~'), env=child_environment(),
+                    stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                    start_new_session=True
+                )
+        except (OSError, ValueError) as e:
+            print(f"Error launching app: {e}")
+            return None
+
+        process = LaunchedProcess(name or command, command, popen)
+        self.processes.append(process)
+        self.trim()
+        self.reap_job.resume()
+        self.notify()
+        return process
+
+    def popen_windows(self, command):
+        """Start a Windows command line; None if there is no process to track"""
+        if URI.match(command):
+            # cmd.exe cannot run a bare URI; the shell hands it to its handler
+            os.startfile(command)
+            return None
+        if command.split(None, 1)[0].lower() == 'start':
+            # A cmd.exe built-in; the cmd.exe running it exits at once
+            return subprocess.Popen(
+                command, shell=True, cwd=os.path.expanduser('~'), env=child_environment(),
+                creationflags=subprocess.CREATE_NO_WINDOW
+            )
+        # Console programs such as cmd get a window of their own; their
+        # standard handles must be that console, not DEVNULL
+        return subprocess.Popen(
+            command, cwd=os.path.expanduser('~'), env=child_environment(),
+            creationflags=subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.CREATE_NEW_CONSOLE
+        )
+
+    def reap(self):
+        """Collect the exit status of children that have finished"""
+        changed = False
+        for process in self.running():
+            returncode = process.popen.poll()
+            if returncode is not None:
+                process.returncode = returncode
+                process.ended = time.time()
+                changed = True
+        if changed:
+            self.trim()
+            self.notify()
+        if not self.running():
+            self.reap_job.suspend()
+
+    def trim(self):
+        """Forget the oldest exited processes beyond HISTORY"""
+        exited = [process for process in self.processes if not process.running]
+        for process in exited[:max(0, len(exited) - self.HISTORY)]:
+            self.processes.remove(process)
+
+    def running(self):
+        return [process for process in self.processes if process.running]
+
+    def table(self):
+        """Rows for every process in the table, oldest first"""
+        return [process.row() for process in self.processes]
+
+    def subscribe(self, callback):
+        """Call callback() when a process starts or exits; returns an unsubscribe"""
+        self.listeners.append(callback)
+        return lambda: self.listeners.remove(callback)
+
+    def notify(self):
+        for callback in list(self.listeners):
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error in launcher listener: {e}")
+
+
+_supervisor = None
+
+
+def get_supervisor(widget=None):
+    """Return the shared process supervisor"""
+    global _supervisor
+    if _supervisor is None:
+        from utils.scheduler import get_scheduler
+
+        _supervisor = ProcessSupervisor(get_scheduler(widget))
+    return _supervisor
+
+
+def launch(command, name=None, terminal=False):
+    """Start an application through the shared supervisor"""
+    return get_supervisor().launch(command, name, terminal)
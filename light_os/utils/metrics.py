@@ -0,0 +1,208 @@
+import platform
+import threading
+import time
+
+from utils.disks import DiskMonitor
+from utils.network import NetworkMonitor
+from utils.processes import ProcessTracker
+
+
+class MetricsSampler:
+    """Samples system metrics on a background thread.
+
+    Each sample is a new dict that is never modified after it is
+    published, and publishing is a single reference swap. Readers on the
+    Tk thread therefore take ``latest`` without locking, and a slow
+    ``/proc`` read only ever delays the sampler, never event handling.
+
+    The thread sleeps while nobody listens, and its interval follows the
+    power policy's stretch like the scheduler's jobs do.
+    """
+
+    def __init__(self, interval=2.0, info_interval=5.0, mountpoints=None, disk_rows=3,
+                 interfaces=None, include_virtual=False, process_count=5):
+        self.interval = interval
+        self.info_interval = info_interval
+        self.disks = DiskMonitor(mountpoints, disk_rows)
+        self.network = NetworkMonitor(interfaces, include_virtual)
+        # Top processes by CPU; 0 turns the scan off
+        self.processes = ProcessTracker(process_count) if process_count else None
+        self.latest = None
+        self.sequence = 0
+        self.listeners = []
+        self.stretch = 1
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.wake = threading.Event()
+        self.unsubscribe_power = None
+
+        self.info = "System information not available"
+        self.info_time = 0
+
+    def start(self):
+        """Start sampling if not already running"""
+        if self.thread is None or not self.thread.is_alive():
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self._run, daemon=True,
+                                           name="metrics-sampler")
+            self.thread.start()
+
+    def stop(self):
+        """Stop sampling after the current sample"""
+        self.stop_event.set()
+        self.wake.set()
+        if self.unsubscribe_power is not None:
+            self.unsubscribe_power()
+            self.unsubscribe_power = None
+
+    def add_listener(self, callback):
+        """Call callback(snapshot) on the sampler thread after each sample"""
+        self.listeners.append(callback)
+        self.wake.set()
+        return lambda: self.listeners.remove(callback)
+
+    def follow_power(self, policy):
+        """Stretch the interval with the power policy's state"""
+        self.set_stretch(policy.stretch)
+        self.unsubscribe_power = policy.subscribe(lambda state: self.set_stretch(policy.stretch))
+
+    def set_stretch(self, factor):
+        self.stretch = max(1, factor)
+        # Let a sleeping sampler re-check its deadline
+        self.wake.set()
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            if not self.listeners:
+                # Nothing to feed; sleep until a listener arrives
+                self.wake.wait()
+                self.wake.clear()
+                continue
+            started = time.monotonic()
+            try:
+                snapshot = self.sample()
+            except Exception as e:
+                print(f"Error sampling system metrics: {e}")
+            else:
+                self.sequence += 1
+                snapshot['sequence'] = self.sequence
+                self.latest = snapshot
+                for callback in list(self.listeners):
+                    try:
+                        callback(snapshot)
+                    except Exception as e:
+                        print(f"Error in metrics listener: {e}")
+            self.sleep(started, time.monotonic() + 0.1)
+
+    def sleep(self, started, earliest):
+        """Wait out the stretched interval, re-checking when the stretch changes"""
+        while not self.stop_event.is_set():
+            remaining = max(started + self.interval * self.stretch, earliest) - time.monotonic()
+            if remaining <= 0:
+                return
+            self.wake.wait(remaining)
+            self.wake.clear()
+
+    def sample(self):
+        """Take one snapshot of every metric"""
+        import psutil
+
+        now = time.monotonic()
+        snapshot = {'time': time.time(), 'monotonic': now}
+
+        snapshot['cpu'] = psutil.cpu_percent(interval=None)
+
+        memory = psutil.virtual_memory()
+        snapshot['memory'] = {
+            'percent': memory.percent,
+            'used': memory.used,
+            'total': memory.total
+        }
+
+        try:
+            snapshot['disks'] = self.disks.sample()
+        except Exception as e:
+            print(f"Error getting disk usage: {e}")
+            snapshot['disks'] = ()
+        # The first mount (root or the system drive) stands for "disk"
+        snapshot['disk'] = snapshot['disks'][0] if snapshot['disks'] else None
+
+        try:
+            snapshot['net'] = self.network.sample()
+        except Exception as e:
+            print(f"Error getting network usage: {e}")
+            snapshot['net'] = {'sent_rate': 0.0, 'recv_rate': 0.0, 'sent_instant': 0.0,
+                               'recv_instant': 0.0, 'interfaces': ()}
+
+        # CPU frequency and boot time change slowly and cost extra reads
+        if now - self.info_time >= self.info_interval:
+            self.info = self.system_info()
+            self.info_time = now
+        snapshot['info'] = self.info
+
+        if self.processes is not None:
+            try:
+                snapshot['processes'] = self.processes.scan()
+            except Exception as e:
+                print(f"Error scanning processes: {e}")
+                snapshot['processes'] = ()
+        else:
+            snapshot['processes'] = ()
+
+        return snapshot
+
+    def system_info(self):
+        """Get basic system information"""
+        import psutil
+
+        try:
+            # CPU Info
+            freq = psutil.cpu_freq()
+            freq_text = f" {freq.current/1000:.1f}GHz" if freq else ""
+            cpu_info = f"CPU: {psutil.cpu_count(logical=False)}C/{psutil.cpu_count()}T{freq_text}"
+
+            # OS Info
+            os_info = f"{platform.system()} {platform.release()}"
+
+            # Boot Time
+            boot = psutil.boot_time()
+            boot_time = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(boot))
+
+            # Uptime
+            uptime_seconds = time.time() - boot
+            days = int(uptime_seconds // (24 * 3600))
+            hours = int((uptime_seconds % (24 * 3600)) // 3600)
+            uptime = f"{days}d {hours}h"
+
+            return f"{cpu_info} | {os_info} | Boot: {boot_time} | Uptime: {uptime}"
+
+        except Exception as e:
+            print(f"Error getting system info: {e}")
+            return "System information not available"
+
+
+_sampler = None
+
+
+def get_sampler():
+    """Return the shared metrics sampler, starting it on first use"""
+    global _sampler
+    if _sampler is None:
+        from utils.power import get_power_policy
+        from utils.settings import get_settings
+
+        settings = get_settings()
+        _sampler = MetricsSampler(
+            mountpoints=settings.get('monitor.disks', []),
+            disk_rows=settings.get('monitor.disk_rows', 3),
+            interfaces=settings.get('monitor.interfaces', []),
+            include_virtual=settings.get('monitor.include_virtual', False),
+            process_count=settings.get('monitor.top_processes', 5)
+        )
+        try:
+            _sampler.follow_power(get_power_policy())
+        except RuntimeError:
+            # No desktop (e.g. the exporter on its own): sample at full rate
+            pass
+        _sampler.start()
+    return _sampler
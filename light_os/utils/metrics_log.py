@@ -0,0 +1,316 @@
+import atexit
+import math
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+
+LOG_DIR = "cache/metrics"
+
+MAGIC = b"LOSM"
+VERSION = 1
+HEADER = struct.Struct('<4sHH')  # magic, version, record size
+
+# time, cpu %, memory %, disk %, bytes sent/s, bytes received/s
+RECORD = struct.Struct('<dfffff')
+FIELDS = ('cpu', 'memory', 'disk', 'net_sent', 'net_recv')
+
+# Records waiting for the writer; more than this and new ones are dropped
+QUEUE_SIZE = 512
+
+# Seconds between fsyncs of the current segment
+FSYNC_INTERVAL = 10
+
+# Records read per point when drawing a long window
+SAMPLES_PER_POINT = 32
+
+
+def segment_name(timestamp):
+    """Segment file name for the local day containing timestamp"""
+    return time.strftime('%Y-%m-%d', time.localtime(timestamp)) + '.bin'
+
+
+def pack_snapshot(snapshot):
+    """One fixed-width record from a sampler snapshot"""
+    disk = snapshot.get('disk')
+    net = snapshot['net']
+    return RECORD.pack(
+        snapshot['time'],
+        snapshot['cpu'],
+        snapshot['memory']['percent'],
+        disk['percent'] if disk else math.nan,
+        net['sent_instant'],
+        net['recv_instant']
+    )
+
+
+class Segment:
+    """Read-only, memory-mapped view of one day's records"""
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.map = None
+        self.buffer = None
+        self.view = memoryview(b'')
+        self.count = 0
+        size = os.fstat(self.file.fileno()).st_size
+        if size <= HEADER.size:
+            return
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            raise ValueError(f"{path} is not a version {VERSION} metrics log")
+        # A trailing partial record (crash mid-write) is ignored
+        self.count = (size - HEADER.size) // RECORD.size
+        self.buffer = memoryview(self.map)
+        self.view = self.buffer[HEADER.size:HEADER.size + self.count * RECORD.size]
+
+    def time_at(self, index):
+        return RECORD.unpack_from(self.view, index * RECORD.size)[0]
+
+    def bisect(self, timestamp):
+        """Index of the first record at or after timestamp"""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.time_at(mid) < timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def records(self, start, end):
+        """Iterate records with start <= time < end, unpacked in place"""
+        lo = self.bisect(start)
+        hi = self.bisect(end)
+        return RECORD.iter_unpack(self.view[lo * RECORD.size:hi * RECORD.size])
+
+    def close(self):
+        self.view.release()
+        if self.buffer is not None:
+            self.buffer.release()
+        if self.map is not None:
+            self.map.close()
+        self.file.close()
+
+
+class MetricsLog:
+    """Append-only log of metrics samples in daily segment files.
+
+    Each sample is one fixed-width struct record, so a segment can be
+    bisected by time and read through mmap without parsing. Samples are
+    queued to a writer thread that batches writes and fsyncs every
+    FSYNC_INTERVAL seconds. The queue is bounded, so a stalled disk drops
+    samples instead of growing memory or blocking the sampler. Old
+    segments are deleted once the log exceeds max_days or max_bytes.
+    """
+
+    def __init__(self, directory=LOG_DIR, max_days=30, max_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.max_days = max_days
+        self.max_bytes = max_bytes
+        self.queue = queue.Queue(QUEUE_SIZE)
+        self.dropped = 0
+        self.thread = None
+        self.file = None
+        self.file_name = None
+
+    def start(self):
+        """Start the writer thread"""
+        if self.thread is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self.thread = threading.Thread(target=self._run, daemon=True, name="metrics-log")
+            self.thread.start()
+            atexit.register(self.close)
+
+    def record(self, snapshot):
+        """Queue a sampler snapshot for writing; never blocks"""
+        try:
+            self.queue.put_nowait((snapshot['time'], pack_snapshot(snapshot)))
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, timeout=2.0):
+        """Write out queued samples and stop the writer"""
+        if self.thread is not None and self.thread.is_alive():
+            try:
+                self.queue.put(None, timeout=timeout)
+            except queue.Full:
+                return
+            self.thread.join(timeout)
+
+    def _run(self):
+        self.prune()
+        last_sync = time.monotonic()
+        while True:
+            try:
+                item = self.queue.get(timeout=FSYNC_INTERVAL)
+            except queue.Empty:
+                item = False
+            batch = [item] if item else []
+            # Drain whatever else is waiting into the same write
+            while item is not None:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None:
+                    batch.append(item)
+
+            try:
+                self.write(batch)
+                if item is None or time.monotonic() - last_sync >= FSYNC_INTERVAL:
+                    self.sync()
+                    last_sync = time.monotonic()
+            except OSError as e:
+                print(f"Error writing metrics log: {e}")
+
+            if item is None:
+                if self.file is not None:
+                    self.file.close()
+                    self.file = None
+                return
+
+    def write(self, batch):
+        for timestamp, record in batch:
+            name = segment_name(timestamp)
+            if name != self.file_name:
+                self.open_segment(name)
+            self.file.write(record)
+        if batch:
+            self.file.flush()
+
+    def sync(self):
+        if self.file is not None:
+            os.fsync(self.file.fileno())
+
+    def open_segment(self, name):
+        """Switch to the segment for a new day"""
+        if self.file is not None:
+            self.sync()
+            self.file.close()
+        path = os.path.join(self.directory, name)
+        self.file = open(path, 'ab')
+        size = self.file.tell()
+        if size < HEADER.size:
+            self.file.truncate(0)
+            self.file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+        else:
+            # Drop a partial record left by a crash so records stay aligned
+            extra = (size - HEADER.size) % RECORD.size
+            if extra:
+                self.file.truncate(size - extra)
+        self.file_name = name
+        self.prune()
+
+    def segments(self):
+        """Segment file names, oldest first"""
+        try:
+            return sorted(name for name in os.listdir(self.directory) if name.endswith('.bin'))
+        except OSError:
+            return []
+
+    def prune(self):
+        """Delete old segments beyond the age and size limits"""
+        names = self.segments()
+        cutoff = segment_name(time.time() - self.max_days * 86400)
+        sizes = {}
+        for name in names:
+            try:
+                sizes[name] = os.path.getsize(os.path.join(self.directory, name))
+            except OSError:
+                sizes[name] = 0
+        total = sum(sizes.values())
+        for name in names:
+            if name == self.file_name:
+                break
+            if name >= cutoff and total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError as e:
+                print(f"Error pruning metrics log: {e}")
+            total -= sizes[name]
+
+    def open_segments(self, start, end):
+        """Yield the segments that may hold records between start and end"""
+        first, last = segment_name(start), segment_name(end)
+        for name in self.segments():
+            if name < first or name > last:
+                continue
+            try:
+                segment = Segment(os.path.join(self.directory, name))
+            except (OSError, ValueError) as e:
+                print(f"Error reading metrics log: {e}")
+                continue
+            try:
+                yield segment
+            finally:
+                segment.close()
+
+    def query(self, start, end=None):
+        """Return the records with start <= time < end as tuples.
+
+        Each tuple is (time, cpu, memory, disk, net_sent, net_recv).
+        """
+        if end is None:
+            end = time.time()
+        results = []
+        for segment in self.open_segments(start, end):
+            results.extend(segment.records(start, end))
+        return results
+
+    def query_series(self, name, start, end=None, points=60):
+        """Average one field into `points` equal buckets between start and end.
+
+        Each bucket is found by bisection and averaged over at most
+        SAMPLES_PER_POINT evenly spaced records, so drawing a week costs
+        about the same as drawing an hour. Returns (times, values);
+        buckets without samples are left out.
+        """
+        if end is None:
+            end = time.time()
+        field = FIELDS.index(name) + 1
+        width = (end - start) / points
+        sums = [0.0] * points
+        counts = [0] * points
+        for segment in self.open_segments(start, end):
+            for i in range(points):
+                lo = segment.bisect(start + i * width)
+                hi = segment.bisect(start + (i + 1) * width)
+                step = max(1, (hi - lo) // SAMPLES_PER_POINT)
+                for index in range(lo, hi, step):
+                    value = RECORD.unpack_from(segment.view, index * RECORD.size)[field]
+                    if not math.isnan(value):
+                        sums[i] += value
+                        counts[i] += 1
+        times, values = [], []
+        for i in range(points):
+            if counts[i]:
+                times.append(start + (i + 0.5) * width)
+                values.append(sums[i] / counts[i])
+        return times, values
+
+
+_metrics_log = None
+
+
+def get_metrics_log():
+    """Return the shared metrics log, recording every sampler snapshot"""
+    global _metrics_log
+    if _metrics_log is None:
+        from utils.metrics import get_sampler
+        from utils.settings import get_settings
+
+        settings = get_settings()
+        _metrics_log = MetricsLog(
+            settings.get('metrics_log.directory', LOG_DIR),
+            settings.get('metrics_log.max_days', 30),
+            settings.get('metrics_log.max_mb', 64) * 1024 * 1024
+        )
+        if settings.get('metrics_log.enabled', True):
+            _metrics_log.start()
+            get_sampler().add_listener(_metrics_log.record)
+    return _metrics_log
@@ -0,0 +1,150 @@
+import math
+import os
+import time
+
+SYS_NET = "/sys/class/net"
+
+# Fallback for platforms without sysfs
+VIRTUAL_PREFIXES = (
+    'lo', 'docker', 'veth', 'br-', 'virbr', 'vmnet', 'vboxnet', 'tun', 'tap',
+    'utun', 'awdl', 'llw', 'bridge', 'Loopback', 'vEthernet'
+)
+
+# Rates are smoothed over roughly this many seconds
+SMOOTHING_SECONDS = 4.0
+
+COUNTER_WRAP = 2 ** 32
+
+
+def is_virtual(name):
+    """Loopback, bridges, tunnels, container and VM interfaces"""
+    if os.path.isdir(SYS_NET):
+        # Physical NICs (wired or wireless) have a backing device
+        return not os.path.exists(os.path.join(SYS_NET, name, 'device'))
+    return name.startswith(VIRTUAL_PREFIXES)
+
+
+def counter_delta(current, previous):
+    """Bytes since the last reading, or None if the counter was reset.
+
+    Some drivers and platforms keep 32-bit counters that wrap; a small
+    apparent jump backwards from near the top is treated as a wrap. Any
+    other decrease means the interface was reset or replaced.
+    """
+    if current >= previous:
+        return current - previous
+    if COUNTER_WRAP // 2 <= previous < COUNTER_WRAP:
+        wrapped = COUNTER_WRAP - previous + current
+        if wrapped < COUNTER_WRAP // 2:
+            return wrapped
+    return None
+
+
+class Interface:
+    """Smoothed rates and peaks for one network interface"""
+
+    def __init__(self, name, counters, now):
+        self.name = name
+        self.counters = counters
+        self.time = now
+        self.sent_rate = None
+        self.recv_rate = None
+        self.sent_instant = 0.0
+        self.recv_instant = 0.0
+        self.peak_sent = 0.0
+        self.peak_recv = 0.0
+
+    def update(self, counters, now):
+        """Fold in a new counter reading"""
+        elapsed = now - self.time
+        if elapsed <= 0:
+            return
+        sent = counter_delta(counters.bytes_sent, self.counters.bytes_sent)
+        recv = counter_delta(counters.bytes_recv, self.counters.bytes_recv)
+        self.counters = counters
+        self.time = now
+        if sent is None or recv is None:
+            # Reset: the counters restart from here, keep the old rates
+            return
+
+        self.sent_instant = sent / elapsed
+        self.recv_instant = recv / elapsed
+        self.peak_sent = max(self.peak_sent, self.sent_instant)
+        self.peak_recv = max(self.peak_recv, self.recv_instant)
+
+        # EWMA weighted by elapsed time, so a late sample counts for more
+        alpha = 1 - math.exp(-elapsed / SMOOTHING_SECONDS)
+        if self.sent_rate is None:
+            self.sent_rate, self.recv_rate = self.sent_instant, self.recv_instant
+        else:
+            self.sent_rate += alpha * (self.sent_instant - self.sent_rate)
+            self.recv_rate += alpha * (self.recv_instant - self.recv_rate)
+
+    def snapshot(self):
+        return {
+            'name': self.name,
+            'sent_rate': self.sent_rate or 0.0,
+            'recv_rate': self.recv_rate or 0.0,
+            'sent_instant': self.sent_instant,
+            'recv_instant': self.recv_instant,
+            'peak_sent': self.peak_sent,
+            'peak_recv': self.peak_recv,
+            # Raw counters, for exporters that compute rates themselves
+            'bytes_sent': self.counters.bytes_sent,
+            'bytes_recv': self.counters.bytes_recv
+        }
+
+
+class NetworkMonitor:
+    """Per-interface network rates from net_io_counters(pernic=True).
+
+    Loopback and virtual interfaces are skipped unless listed in
+    ``interfaces`` or ``include_virtual`` is set. Times come from the
+    monotonic clock, so wall-clock changes can't produce bogus rates.
+    """
+
+    def __init__(self, interfaces=None, include_virtual=False):
+        self.interfaces = list(interfaces or [])
+        self.include_virtual = include_virtual
+        self.tracked = {}
+        self.virtual = {}  # name -> bool, checked once per interface
+
+    def wanted(self, name):
+        if self.interfaces:
+            return name in self.interfaces
+        if self.include_virtual:
+            return True
+        if name not in self.virtual:
+            self.virtual[name] = is_virtual(name)
+        return not self.virtual[name]
+
+    def sample(self):
+        """Return aggregate and per-interface rates"""
+        import psutil
+
+        now = time.monotonic()
+        # nowrap=False: counter_delta handles wraps and resets itself
+        counters = psutil.net_io_counters(pernic=True, nowrap=False)
+
+        for name, nic in counters.items():
+            if not self.wanted(name):
+                continue
+            interface = self.tracked.get(name)
+            if interface is None:
+                self.tracked[name] = Interface(name, nic, now)
+            else:
+                interface.update(nic, now)
+
+        # Interfaces that disappeared (unplugged adapters, stopped VPNs)
+        for name in self.tracked.keys() - counters.keys():
+            del self.tracked[name]
+            self.virtual.pop(name, None)
+
+        interfaces = tuple(self.tracked[name].snapshot() for name in sorted(self.tracked))
+        return {
+            'sent_rate': sum(nic['sent_rate'] for nic in interfaces),
+            'recv_rate': sum(nic['recv_rate'] for nic in interfaces),
+            'sent_instant': sum(nic['sent_instant'] for nic in interfaces),
+            'recv_instant': sum(nic['recv_instant'] for nic in interfaces),
+            'interfaces': interfaces
+        }
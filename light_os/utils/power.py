@@ -0,0 +1,158 @@
+import os
+import time
+
+POWER_SUPPLY_DIR = "/sys/class/power_supply"
+
+# Power states, from full rate to slowest
+ACTIVE = 'active'
+BATTERY = 'battery'
+IDLE = 'idle'
+
+INPUT_EVENTS = ('<KeyPress>', '<ButtonPress>', '<Motion>', '<MouseWheel>')
+
+
+def on_battery(supply_dir=POWER_SUPPLY_DIR):
+    """True if the machine is running from a discharging battery.
+
+    Machines without any power supply entries (most desktops and VMs)
+    count as mains powered.
+    """
+    try:
+        names = os.listdir(supply_dir)
+    except OSError:
+        return False
+
+    discharging = False
+    for name in names:
+        path = os.path.join(supply_dir, name)
+        supply_type = _read(os.path.join(path, 'type'))
+        if supply_type == 'Mains' and _read(os.path.join(path, 'online')) == '1':
+            return False
+        if supply_type == 'Battery' and _read(os.path.join(path, 'status')) == 'Discharging':
+            discharging = True
+    return discharging
+
+
+def _read(path):
+    try:
+        with open(path, 'r') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+class PowerPolicy:
+    """Slows the desktop down when nobody is using it or it is on battery.
+
+    Idle time comes from Tk's ``tk inactive`` (the X screensaver idle
+    counter) where available, and from our own input bindings otherwise.
+    The policy stretches every scheduler job and tells subscribers about
+    state changes so they can pause animations or drop the seconds from
+    clocks. Any input restores full rate straight away.
+    """
+
+    POLL_INTERVAL = 5
+
+    def __init__(self, root, scheduler, settings):
+        self.root = root
+        self.scheduler = scheduler
+        self.settings = settings
+        self.state = ACTIVE
+        self.stretch = 1
+        self.subscribers = []
+        self.last_input = time.monotonic()
+        self.input_bound = False
+        self.poll_job = None
+        self.native_idle = self.read_native_idle() is not None
+
+    def start(self):
+        """Begin polling idle time and the power supply"""
+        if self.poll_job is None:
+            # Not stretched: the policy must notice when to speed back up
+            self.poll_job = self.scheduler.every(self.POLL_INTERVAL, self.poll,
+                                                 name="power-policy", stretch=False)
+        if not self.input_bound:
+            # Bound once and never removed: unbind_all would also drop
+            # other modules' bindings on the same sequences
+            for sequence in INPUT_EVENTS:
+                self.root.bind_all(sequence, self.on_input, add='+')
+            self.input_bound = True
+        self.poll()
+
+    def subscribe(self, callback):
+        """Call callback(state) whenever the power state changes"""
+        self.subscribers.append(callback)
+        return lambda: self.subscribers.remove(callback)
+
+    def read_native_idle(self):
+        """Seconds since the last user input according to Tk, or None"""
+        try:
+            idle_ms = int(self.root.tk.call('tk', 'inactive'))
+        except Exception:
+            return None
+        return idle_ms / 1000 if idle_ms >= 0 else None
+
+    def idle_seconds(self):
+        if self.native_idle:
+            idle = self.read_native_idle()
+            if idle is not None:
+                return idle
+        return time.monotonic() - self.last_input
+
+    def poll(self):
+        """Work out the current state and apply it if it changed"""
+        if self.idle_seconds() >= self.settings.get('power.idle_timeout', 300):
+            self.apply(IDLE)
+        else:
+            self.apply(self.active_state())
+
+    def active_state(self):
+        """State to use while someone is at the machine"""
+        if self.settings.get('power.battery_saver', True) and on_battery():
+            return BATTERY
+        return ACTIVE
+
+    def apply(self, state):
+        if state == self.state:
+            return
+        self.state = state
+        config = self.settings.get('power', {})
+        self.stretch = {
+            ACTIVE: 1,
+            BATTERY: config.get('battery_stretch', 2),
+            IDLE: config.get('idle_stretch', 6)
+        }[state]
+        self.scheduler.set_stretch(self.stretch)
+
+        for callback in list(self.subscribers):
+            try:
+                callback(state)
+            except Exception as e:
+                print(f"Error in power subscriber: {e}")
+
+    def on_input(self, event=None):
+        if self.native_idle and self.state != IDLE:
+            # Tk keeps the idle time; input only matters for waking up
+            return
+        self.last_input = time.monotonic()
+        if self.state == IDLE:
+            # Restore full rate without waiting for the next poll
+            self.poll_job.defer(self.POLL_INTERVAL)
+            self.apply(self.active_state())
+
+
+_policy = None
+
+
+def get_power_policy(widget=None):
+    """Return the shared power policy, creating it on the widget's root"""
+    global _policy
+    if _policy is None:
+        if widget is None:
+            raise RuntimeError("The power policy needs a widget the first time it is used")
+        from utils.scheduler import get_scheduler
+        from utils.settings import get_settings
+
+        root = widget.winfo_toplevel()
+        _policy = PowerPolicy(root, get_scheduler(root), get_settings())
+    return _policy
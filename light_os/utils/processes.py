@@ -0,0 +1,73 @@
+import heapq
+import time
+
+# Read for every process on every scan; the name is only read once per PID
+SCAN_ATTRS = ['cpu_times', 'memory_info']
+
+
+class ProcessTracker:
+    """Finds the processes using the most CPU.
+
+    A ``psutil.Process`` handle is kept for each PID along with its last
+    CPU time, so a process's CPU usage is the delta between two scans
+    rather than a second blocking read. Each scan reads only the
+    attributes in SCAN_ATTRS, and a heap keeps the top N without sorting
+    every process. Handles are added and dropped as PIDs come and go.
+    """
+
+    def __init__(self, count=5):
+        self.count = count
+        self.handles = {}  # pid -> [Process, name, create time, cpu time]
+        self.last_scan = None
+
+    def scan(self):
+        """Return the top processes as (pid, name, cpu percent, rss) tuples"""
+        import psutil
+
+        now = time.monotonic()
+        elapsed = now - self.last_scan if self.last_scan is not None else None
+        self.last_scan = now
+
+        seen = set()
+        rows = []
+        for proc in psutil.process_iter(attrs=SCAN_ATTRS, ad_value=None):
+            info = proc.info
+            cpu_times = info['cpu_times']
+            if cpu_times is None:
+                # Access denied; not worth a handle
+                continue
+            pid = proc.pid
+            seen.add(pid)
+            cpu_time = cpu_times.user + cpu_times.system
+
+            handle = self.handles.get(pid)
+            if handle is not None and handle[0] is not proc:
+                # Same PID, different process: psutil noticed the reuse
+                handle = None
+            if handle is None:
+                try:
+                    name = proc.name()
+                    created = proc.create_time()
+                except psutil.Error:
+                    # Exited or hidden since process_iter listed it
+                    continue
+                self.handles[pid] = [proc, name, created, cpu_time]
+                # No previous reading to compare against until next scan
+                continue
+
+            previous = handle[3]
+            handle[3] = cpu_time
+            if not elapsed:
+                continue
+            cpu_percent = max(0.0, (cpu_time - previous) / elapsed * 100)
+            memory = info['memory_info']
+            rss = memory.rss if memory is not None else 0
+            rows.append((cpu_percent, rss, pid, handle[1]))
+
+        # Forget processes that have exited
+        if len(seen) != len(self.handles):
+            for pid in self.handles.keys() - seen:
+                del self.handles[pid]
+
+        top = heapq.nlargest(self.count, rows)
+        return tuple((pid, name, cpu, rss) for cpu, rss, pid, name in top)
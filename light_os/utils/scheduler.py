@@ -0,0 +1,218 @@
+import time
+
+
+class Job:
+    """Handle for a job registered with the TickScheduler"""
+
+    def __init__(self, scheduler, interval, callback, name=None, once=False, stretch=True):
+        self.scheduler = scheduler
+        self.interval = interval
+        self.callback = callback
+        self.name = name or getattr(callback, '__qualname__', repr(callback))
+        self.once = once
+        self.stretch = stretch
+        self.due = None
+        self.suspended = False
+        self.cancelled = False
+
+    def cancel(self):
+        """Stop the job for good"""
+        self.cancelled = True
+        self.scheduler.discard(self)
+
+    def suspend(self):
+        """Stop running the job until resume() is called"""
+        if not self.suspended and not self.cancelled:
+            self.suspended = True
+            self.scheduler.discard(self)
+
+    def resume(self, run_now=False):
+        """Start running a suspended job again"""
+        if self.suspended and not self.cancelled:
+            self.suspended = False
+            self.scheduler.place(self, 0 if run_now else self.scheduler.effective_interval(self))
+
+    def defer(self, delay):
+        """Run next in delay seconds, then continue at the normal interval"""
+        if not self.suspended and not self.cancelled:
+            self.scheduler.discard(self)
+            self.scheduler.place(self, delay)
+
+    def set_interval(self, interval, align=False):
+        """Change the interval, taking effect from the next run.
+
+        With align=True the next run is moved onto a multiple of the new
+        interval instead.
+        """
+        self.interval = max(1, int(round(interval)))
+        if align:
+            now = int(time.time())
+            self.defer(self.interval - now % self.interval)
+
+
+class TickScheduler:
+    """Timer wheel behind every periodic refresh on the desktop.
+
+    Time is divided into one-second ticks aligned to wall-clock second
+    boundaries, and jobs hash into wheel slots by the tick they are due
+    on. All jobs due on a tick run from a single Tk ``after`` wakeup, and
+    the scheduler sleeps straight through ticks with nothing due.
+    """
+
+    WHEEL_SIZE = 64
+
+    def __init__(self, widget):
+        self.widget = widget
+        self.wheel = [[] for _ in range(self.WHEEL_SIZE)]
+        self.tick = int(time.time())
+        self.jobs = set()
+        self.after_id = None
+        self.wake_tick = None
+        self.stretch = 1
+
+    def every(self, interval, callback, name=None, align=False, run_now=False, stretch=True):
+        """Run callback every interval seconds and return its Job.
+
+        With align=True the first run lands on a multiple of the interval
+        (e.g. on the minute for interval=60). Jobs with stretch=False keep
+        their interval when the power policy slows the desktop down.
+        """
+        job = Job(self, max(1, int(round(interval))), callback, name, stretch=stretch)
+        if run_now:
+            delay = 0
+        elif align:
+            now = int(time.time())
+            delay = job.interval - now % job.interval
+        else:
+            delay = job.interval
+        self.place(job, delay)
+        return job
+
+    def once(self, delay, callback, name=None):
+        """Run callback once after delay seconds and return its Job"""
+        job = Job(self, max(1, int(round(delay))), callback, name, once=True)
+        self.place(job, job.interval)
+        return job
+
+    def effective_interval(self, job):
+        """A job's interval after applying the current stretch factor"""
+        if job.stretch:
+            return max(1, int(round(job.interval * self.stretch)))
+        return job.interval
+
+    def set_stretch(self, factor):
+        """Scale the interval of every stretchable job by factor.
+
+        Shrinking the factor pulls already-scheduled runs forward so a
+        return to full rate takes effect immediately.
+        """
+        factor = max(1, factor)
+        if factor == self.stretch:
+            return
+        shrinking = factor < self.stretch
+        self.stretch = factor
+        if shrinking:
+            now = max(self.tick, int(time.time()))
+            for job in list(self.jobs):
+                if job.stretch and not job.once and job.due > now + self.effective_interval(job):
+                    self.discard(job)
+                    self.place(job, self.effective_interval(job))
+
+    def place(self, job, delay):
+        """Put a job on the wheel delay ticks from now (0 means next tick)"""
+        job.due = max(self.tick, int(time.time())) + max(1, int(round(delay)))
+        self.wheel[job.due % self.WHEEL_SIZE].append(job)
+        self.jobs.add(job)
+        if self.wake_tick is None or job.due < self.wake_tick:
+            self.schedule_wakeup()
+
+    def discard(self, job):
+        """Take a job off the wheel"""
+        if job in self.jobs:
+            self.jobs.discard(job)
+            slot = self.wheel[job.due % self.WHEEL_SIZE]
+            if job in slot:
+                slot.remove(job)
+
+    def schedule_wakeup(self):
+        """Arrange one Tk wakeup at the start of the next tick with work"""
+        if self.after_id is not None:
+            self.widget.after_cancel(self.after_id)
+            self.after_id = None
+        self.wake_tick = None
+        if not self.jobs:
+            return
+
+        next_due = self.next_due()
+        now = time.time()
+        # Wake a couple of ms past the boundary so the tick has started
+        delay = max(0, int((next_due - now) * 1000) + 2)
+        self.wake_tick = next_due
+        self.after_id = self.widget.after(delay, self.on_tick)
+
+    def next_due(self):
+        """Earliest due tick, scanning at most one turn of the wheel.
+
+        The scan starts after the last tick run, not at the current time,
+        so jobs left overdue by a blocked main loop are found at once.
+        """
+        start = self.tick + 1
+        for offset in range(self.WHEEL_SIZE):
+            tick = start + offset
+            for job in self.wheel[tick % self.WHEEL_SIZE]:
+                if job.due == tick:
+                    return tick
+        # Everything is more than one turn away
+        return min(job.due for job in self.jobs)
+
+    def on_tick(self):
+        self.after_id = None
+        self.wake_tick = None
+        now_tick = int(time.time())
+
+        # Catch up on ticks missed while the main loop was busy, but never
+        # visit a slot more than once
+        first = self.tick + 1
+        last = max(first, now_tick)
+        first = max(first, last - self.WHEEL_SIZE + 1)
+        due_jobs = []
+        for tick in range(first, last + 1):
+            slot = self.wheel[tick % self.WHEEL_SIZE]
+            ready = [job for job in slot if job.due <= last]
+            if ready:
+                self.wheel[tick % self.WHEEL_SIZE] = [job for job in slot if job.due > last]
+                due_jobs.extend(ready)
+        self.tick = last
+
+        for job in due_jobs:
+            self.jobs.discard(job)
+            if not job.once:
+                self.place_quietly(job)
+        for job in due_jobs:
+            if job.cancelled or job.suspended:
+                continue
+            try:
+                job.callback()
+            except Exception as e:
+                print(f"Error in scheduled job {job.name}: {e}")
+
+        self.schedule_wakeup()
+
+    def place_quietly(self, job):
+        """Reschedule a job without touching the pending wakeup"""
+        job.due = self.tick + self.effective_interval(job)
+        self.wheel[job.due % self.WHEEL_SIZE].append(job)
+        self.jobs.add(job)
+
+
+_scheduler = None
+
+
+def get_scheduler(widget=None):
+    """Return the shared scheduler, creating it on the widget's root"""
+    global _scheduler
+    if _scheduler is None:
+        if widget is None:
+            raise RuntimeError("The scheduler needs a widget the first time it is used")
+        _scheduler = TickScheduler(widget.winfo_toplevel())
+    return _scheduler
@@ -0,0 +1,261 @@
+import atexit
+import copy
+import json
+import os
+import tempfile
+import threading
+import time
+
+SETTINGS_FILE = "config/settings.json"
+
+DEFAULT_SETTINGS = {
+    "wallpaper": "assets/wallpapers/default.jpg",
+    "wallpaper_mode": "stretch",
+    "slideshow": {
+        "enabled": False,
+        "directory": "assets/wallpapers",
+        "interval": 300,
+        "prefetch": 2
+    },
+    "theme": "dark",
+    "widgets": {"clock": True, "weather": True, "system": True, "launcher": True},
+    "positions": {},
+    "animations": {"frame_rate": 60},
+    "backdrop": {"enabled": True, "blur_radius": 12},
+    "monitor": {
+        "top_processes": 5,
+        "disks": [],
+        "disk_rows": 3,
+        "interfaces": [],
+        "include_virtual": False
+    },
+    "exporter": {"enabled": False, "address": "127.0.0.1:9101"},
+    "launcher": {"rescan_interval": 300},
+    "weather": {
+        "city": "New York",
+        "units": "metric",
+        "api_key": "",
+        "base_url": "https://api.openweathermap.org",
+        "cities": [],
+        "refresh": 1800,
+        "requests_per_minute": 30,
+        "cache_ttl": 600,
+        "prefetch_icons": False
+    },
+    "alerts": {
+        "enabled": True,
+        "rules": [
+            {"name": "High CPU", "metric": "cpu", "op": ">", "threshold": 90,
+             "for": 30, "clear": 80, "cooldown": 300},
+            {"name": "High memory", "metric": "memory", "op": ">", "threshold": 90,
+             "for": 60, "clear": 85, "cooldown": 600},
+            {"name": "Low disk space", "metric": "disk_free", "op": "<", "threshold": 5,
+             "clear": 7, "cooldown": 3600}
+        ]
+    },
+    "metrics_log": {
+        "enabled": True,
+        "directory": "cache/metrics",
+        "max_days": 30,
+        "max_mb": 64
+    },
+    "power": {
+        "idle_timeout": 300,
+        "battery_saver": True,
+        "battery_stretch": 2,
+        "idle_stretch": 6
+    }
+}
+
+_MISSING = object()
+
+
+def deep_merge(base, overrides):
+    """Return a copy of base with overrides merged in, recursing into dicts"""
+    merged = copy.deepcopy(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = deep_merge(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+def write_json_atomic(path, data):
+    """Write JSON to a temp file in the same directory and rename it over path"""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.",
+                                    suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class JsonWriter:
+    """Debounced, atomic JSON writer running on a background thread.
+
+    ``schedule`` snapshots the data and returns immediately; bursts of
+    changes within ``delay`` seconds are written once. Pending data is
+    flushed at interpreter exit.
+    """
+
+    def __init__(self, path, delay=1.0):
+        self.path = path
+        self.delay = delay
+        self.condition = threading.Condition()
+        self.write_lock = threading.Lock()
+        self.pending = None
+        self.deadline = 0
+        self.thread = None
+        atexit.register(self.flush)
+
+    def schedule(self, data):
+        """Queue data to be written after the debounce delay"""
+        snapshot = copy.deepcopy(data)
+        with self.condition:
+            self.pending = snapshot
+            self.deadline = time.monotonic() + self.delay
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, daemon=True,
+                                               name=f"json-writer:{self.path}")
+                self.thread.start()
+            self.condition.notify()
+
+    def flush(self):
+        """Write any pending data now, on the calling thread"""
+        # Holding write_lock while taking the data keeps writes in order
+        with self.write_lock:
+            with self.condition:
+                data, self.pending = self.pending, None
+            if data is not None:
+                self._write(data)
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while self.pending is None:
+                    self.condition.wait()
+                # Keep pushing the deadline back while changes keep arriving
+                remaining = self.deadline - time.monotonic()
+                if remaining > 0:
+                    self.condition.wait(remaining)
+                    continue
+            self.flush()
+
+    def _write(self, data):
+        try:
+            write_json_atomic(self.path, data)
+        except Exception as e:
+            print(f"Error saving {self.path}: {e}")
+
+
+class SettingsStore:
+    """In-memory settings with debounced persistence and change notifications.
+
+    Keys are dotted paths into the nested settings dict, e.g.
+    ``widgets.clock``. Subscribers are called on the thread that made the
+    change, with the set of keys that actually changed.
+    """
+
+    def __init__(self, path=SETTINGS_FILE, defaults=DEFAULT_SETTINGS, delay=1.0):
+        self.path = path
+        self.defaults = defaults
+        self.writer = JsonWriter(path, delay)
+        self.subscribers = []
+        self.data = self.load()
+
+    def load(self):
+        """Read settings from disk merged over the defaults"""
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r') as f:
+                    return deep_merge(self.defaults, json.load(f))
+            data = copy.deepcopy(self.defaults)
+            self.writer.schedule(data)
+            return data
+        except Exception as e:
+            print(f"Error loading settings: {e}")
+            return copy.deepcopy(self.defaults)
+
+    def get(self, key, default=None):
+        """Return the value at a dotted key"""
+        node = self.data
+        for part in key.split('.'):
+            if not isinstance(node, dict) or part not in node:
+                return default
+            node = node[part]
+        # Hand out copies so callers cannot change settings behind our back
+        return copy.deepcopy(node) if isinstance(node, (dict, list)) else node
+
+    def set(self, key, value):
+        """Set the value at a dotted key"""
+        self.update({key: value})
+
+    def update(self, changes):
+        """Apply several dotted-key changes as one batch"""
+        changed = set()
+        for key, value in changes.items():
+            parts = key.split('.')
+            node = self.data
+            for part in parts[:-1]:
+                if not isinstance(node.get(part), dict):
+                    node[part] = {}
+                node = node[part]
+            if node.get(parts[-1], _MISSING) != value:
+                node[parts[-1]] = copy.deepcopy(value)
+                changed.add(key)
+
+        if changed:
+            self.writer.schedule(self.data)
+            self.notify(changed)
+        return changed
+
+    def subscribe(self, callback, keys=None):
+        """Call callback(changed_keys) when any of keys (or a child) changes"""
+        entry = (callback, tuple(keys) if keys else None)
+        self.subscribers.append(entry)
+        return lambda: self.subscribers.remove(entry)
+
+    def notify(self, changed):
+        for callback, keys in list(self.subscribers):
+            if keys is None:
+                matched = changed
+            else:
+                matched = {c for c in changed if any(_related(c, k) for k in keys)}
+            if matched:
+                try:
+                    callback(matched)
+                except Exception as e:
+                    print(f"Error in settings subscriber: {e}")
+
+    def flush(self):
+        """Write pending changes to disk now"""
+        self.writer.flush()
+
+
+def _related(changed_key, watched_key):
+    """True if one key is the other or nested under it"""
+    return (changed_key == watched_key
+            or changed_key.startswith(watched_key + '.')
+            or watched_key.startswith(changed_key + '.'))
+
+
+_settings = None
+
+
+def get_settings():
+    """Return the shared settings store, loading it on first use"""
+    global _settings
+    if _settings is None:
+        _settings = SettingsStore()
+    return _settings
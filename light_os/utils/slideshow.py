@@ -0,0 +1,152 @@
+import multiprocessing
+import os
+import tkinter as tk
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.wallpaper import CACHE_DIR, render_wallpaper
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.gif', '.webp')
+
+
+def list_wallpapers(directory):
+    """Return the image files in a directory, sorted by name"""
+    try:
+        return sorted(
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+    except OSError as e:
+        print(f"Error listing wallpapers: {e}")
+        return []
+
+
+class WallpaperSlideshow:
+    """Rotates wallpapers from a directory on a fixed interval.
+
+    The next ``prefetch`` images are decoded and scaled in a worker process
+    and loaded into PhotoImages as soon as they are ready, so a transition
+    only swaps the image on the canvas. Frames are dropped once shown,
+    which caps memory at the current frame plus the prefetch queue.
+    """
+
+    POLL_INTERVAL = 250
+
+    def __init__(self, widget, directory, size, on_frame, mode='stretch',
+                 interval=300, prefetch=2, cache_dir=CACHE_DIR):
+        self.widget = widget
+        self.directory = directory
+        self.size = size
+        self.on_frame = on_frame
+        self.mode = mode
+        self.interval = max(1, int(interval)) * 1000
+        self.prefetch = max(1, int(prefetch))
+        self.cache_dir = cache_dir
+
+        self.paths = []
+        self.index = 0
+        self.queue = deque()  # [path, future, PhotoImage or None, cached path]
+        self.executor = None
+        self.running = False
+        self.advance_id = None
+        self.poll_id = None
+        self.due = False
+
+    def start(self):
+        """Scan the directory and start rotating"""
+        self.paths = list_wallpapers(self.directory)
+        if not self.paths:
+            print(f"No wallpapers found in {self.directory}")
+            return False
+
+        if self.executor is None:
+            # Spawn rather than fork: the parent process owns a Tk interpreter
+            self.executor = ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context('spawn')
+            )
+        self.running = True
+        self.fill_queue()
+        self.schedule_advance()
+        return True
+
+    def stop(self):
+        """Stop rotating and release prefetched frames"""
+        self.running = False
+        for after_id in (self.advance_id, self.poll_id):
+            if after_id is not None:
+                self.widget.after_cancel(after_id)
+        self.advance_id = None
+        self.poll_id = None
+
+        for entry in self.queue:
+            entry[1].cancel()
+        self.queue.clear()
+
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+    def next(self):
+        """Show the next wallpaper now instead of waiting for the interval"""
+        if not self.running:
+            return
+        if self.advance_id is not None:
+            self.widget.after_cancel(self.advance_id)
+            self.advance_id = None
+        self.advance()
+
+    def fill_queue(self):
+        """Submit renders until the prefetch queue is full"""
+        while len(self.queue) < self.prefetch and self.paths:
+            path = self.paths[self.index % len(self.paths)]
+            self.index += 1
+            future = self.executor.submit(
+                render_wallpaper, path, self.size, self.mode, self.cache_dir
+            )
+            self.queue.append([path, future, None, None])
+        self.schedule_poll()
+
+    def schedule_advance(self):
+        self.advance_id = self.widget.after(self.interval, self.advance)
+
+    def schedule_poll(self):
+        pending = any(entry[2] is None for entry in self.queue)
+        if self.running and pending and self.poll_id is None:
+            self.poll_id = self.widget.after(self.POLL_INTERVAL, self.poll)
+
+    def poll(self):
+        """Load finished renders into PhotoImages ahead of their transition"""
+        self.poll_id = None
+        for entry in list(self.queue):
+            path, future, frame, _ = entry
+            if frame is not None or not future.done():
+                continue
+            try:
+                entry[3] = future.result()
+                entry[2] = tk.PhotoImage(file=entry[3])
+            except Exception as e:
+                print(f"Error loading wallpaper {path}: {e}")
+                self.queue.remove(entry)
+
+        if self.due:
+            self.advance()
+        else:
+            self.fill_queue()
+
+    def advance(self):
+        """Swap in the next prefetched frame"""
+        self.advance_id = None
+        if not self.running:
+            return
+
+        if self.queue and self.queue[0][2] is not None:
+            _, _, frame, cached_path = self.queue.popleft()
+            self.due = False
+            # The previous frame is released by the receiver when it swaps
+            self.on_frame(frame, cached_path)
+            self.schedule_advance()
+        else:
+            # Next frame is still rendering; show it as soon as it lands
+            self.due = True
+
+        self.fill_queue()
@@ -54,7 +54,11 @@ def get_theme():
     return THEMES.get(current_theme, THEMES['dark'])
 
 def apply_theme():
-    """Apply the current theme to ttk styles"""
+    """Apply the current theme to ttk styles.
+    
+    Needs a Tk root, so call set_theme() after creating one rather than
+    at import time.
+    """
     theme = get_theme()
     
     # Create style object
@@ -157,5 +161,3 @@ def apply_theme():
              background=[('active', theme['hover']), 
                         ('pressed', theme['active'])])
 
-# Initialize with default theme
-set_theme('dark')
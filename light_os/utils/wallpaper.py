@@ -0,0 +1,169 @@
+import hashlib
+import os
+import queue
+import threading
+
+# Scaled wallpapers are cached as PPM so Tk can load them without PIL
+CACHE_DIR = "cache/wallpapers"
+CACHE_MAX_ENTRIES = 16
+
+SCALING_MODES = ('stretch', 'fill', 'fit')
+
+
+def cache_path_for(image_path, size, mode='stretch', cache_dir=CACHE_DIR):
+    """Return the cache file for a scaled wallpaper.
+
+    The key covers the source path and mtime, the target size and the
+    scaling mode, so editing the image or changing resolution misses.
+    """
+    stat = os.stat(image_path)
+    key = "{}|{}|{}x{}|{}".format(
+        os.path.abspath(image_path), stat.st_mtime_ns, size[0], size[1], mode
+    )
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    return os.path.join(cache_dir, f"{digest}.ppm")
+
+
+def scale_image(img, size, mode='stretch'):
+    """Scale a PIL image to the screen size using the given mode"""
+    from PIL import Image
+
+    width, height = size
+    if mode == 'fill':
+        # Scale to cover the screen, then crop the overflow evenly
+        scale = max(width / img.width, height / img.height)
+        scaled = img.resize(
+            (max(width, round(img.width * scale)), max(height, round(img.height * scale))),
+            Image.Resampling.LANCZOS
+        )
+        left = (scaled.width - width) // 2
+        top = (scaled.height - height) // 2
+        return scaled.crop((left, top, left + width, top + height))
+    if mode == 'fit':
+        # Scale to fit inside the screen and letterbox on black
+        scale = min(width / img.width, height / img.height)
+        scaled = img.resize(
+            (max(1, round(img.width * scale)), max(1, round(img.height * scale))),
+            Image.Resampling.LANCZOS
+        )
+        result = Image.new('RGB', (width, height), '#000000')
+        result.paste(scaled, ((width - scaled.width) // 2, (height - scaled.height) // 2))
+        return result
+    return img.resize((width, height), Image.Resampling.LANCZOS)
+
+
+def render_wallpaper(image_path, size, mode='stretch', cache_dir=CACHE_DIR):
+    """Decode, scale and cache a wallpaper, returning the cached file path.
+
+    Safe to call from worker threads and processes: nothing here touches Tk.
+    """
+    cached = cache_path_for(image_path, size, mode, cache_dir)
+    if os.path.exists(cached):
+        # Touch the entry so pruning keeps recently used wallpapers
+        os.utime(cached)
+        return cached
+
+    from PIL import Image
+
+    with Image.open(image_path) as img:
+        if img.format == 'JPEG':
+            # Let the JPEG decoder downscale by 1/2, 1/4 or 1/8 while
+            # decoding; it never goes below the requested size
+            img.draft('RGB', size)
+        scaled = scale_image(img.convert('RGB'), size, mode)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    # Write under a unique name and rename so readers never see partial files
+    tmp_path = f"{cached}.{os.getpid()}.{threading.get_ident()}.tmp"
+    scaled.save(tmp_path, format='PPM')
+    os.replace(tmp_path, cached)
+    prune_cache(cache_dir)
+    return cached
+
+
+def prune_cache(cache_dir=CACHE_DIR, max_entries=CACHE_MAX_ENTRIES):
+    """Remove the least recently used cached wallpapers beyond max_entries"""
+    try:
+        entries = [
+            os.path.join(cache_dir, name)
+            for name in os.listdir(cache_dir) if name.endswith('.ppm')
+        ]
+        if len(entries) <= max_entries:
+            return
+        entries.sort(key=os.path.getmtime, reverse=True)
+        for path in entries[max_entries:]:
+            os.remove(path)
+    except OSError as e:
+        print(f"Error pruning wallpaper cache: {e}")
+
+
+class WallpaperLoader:
+    """Decodes and scales wallpapers on a background thread.
+
+    Results are handed back to the Tk thread by polling a queue with
+    ``after``, since Tk objects must only be touched from the main thread.
+    Only the most recent request is delivered; stale ones are dropped.
+    """
+
+    POLL_INTERVAL = 50
+
+    def __init__(self, widget, cache_dir=CACHE_DIR):
+        self.widget = widget
+        self.cache_dir = cache_dir
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+        self.generation = 0
+        self.pending = 0
+        self.thread = None
+        self.poll_id = None
+
+    def load(self, image_path, size, mode, callback):
+        """Load a wallpaper and call callback(cached_path, error) on the Tk thread"""
+        self.generation += 1
+
+        # A cache hit is ready to blit, so skip the round trip to the worker
+        try:
+            cached = cache_path_for(image_path, size, mode, self.cache_dir)
+            if os.path.exists(cached):
+                callback(cached, None)
+                return
+        except OSError as e:
+            callback(None, e)
+            return
+
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._worker, daemon=True,
+                                           name="wallpaper-loader")
+            self.thread.start()
+
+        self.pending += 1
+        self.requests.put((self.generation, image_path, size, mode, callback))
+        if self.poll_id is None:
+            self.poll_id = self.widget.after(self.POLL_INTERVAL, self._poll)
+
+    def _worker(self):
+        while True:
+            generation, image_path, size, mode, callback = self.requests.get()
+            if generation != self.generation:
+                # Superseded before we got to it
+                self.results.put((generation, None, None, callback))
+                continue
+            try:
+                path = render_wallpaper(image_path, size, mode, self.cache_dir)
+                self.results.put((generation, path, None, callback))
+            except Exception as e:
+                self.results.put((generation, None, e, callback))
+
+    def _poll(self):
+        self.poll_id = None
+        while True:
+            try:
+                generation, path, error, callback = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending -= 1
+            if generation == self.generation:
+                callback(path, error)
+
+        if self.pending > 0:
+            self.poll_id = self.widget.after(self.POLL_INTERVAL, self._poll)
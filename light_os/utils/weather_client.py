@@ -0,0 +1,400 @@
+import json
+import os
+import queue
+import random
+import threading
+import time
+
+from utils.settings import JsonWriter
+from utils.weather_icons import ICON_CODES, SOURCE_DIR, resize_icon, resized_path, source_path
+
+DEFAULT_BASE_URL = "https://api.openweathermap.org"
+ICON_URL = "https://openweathermap.org/img/wn/{code}@2x.png"
+CACHE_FILE = "cache/weather.json"
+
+# (connect, read) timeouts in seconds
+TIMEOUT = (3.05, 10)
+
+# Most city IDs the group endpoint accepts in one request
+GROUP_SIZE = 20
+
+
+class WeatherError(Exception):
+    """The weather service answered with an error"""
+
+
+class Backoff:
+    """Exponential backoff with jitter for retrying failed requests.
+
+    Each failure doubles the ceiling up to ``cap``; the delay is half the
+    ceiling plus a random share of the other half, so clients that failed
+    together don't retry together.
+    """
+
+    def __init__(self, base=30, cap=1800):
+        self.base = base
+        self.cap = cap
+        self.failures = 0
+
+    def next_delay(self):
+        """Seconds to wait before the next attempt"""
+        ceiling = min(self.cap, self.base * 2 ** self.failures)
+        self.failures += 1
+        return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+    def reset(self):
+        self.failures = 0
+
+
+class TokenBucket:
+    """Rate limiter for API calls.
+
+    Tokens refill at ``rate`` per second up to ``capacity``; each call
+    takes one and waits for the next if the bucket is empty. Only the
+    client's worker takes tokens, so waiting never blocks the Tk thread.
+    """
+
+    def __init__(self, rate, capacity):
+        # At least one request a minute, so a rate of 0 from settings
+        # slows requests down instead of dividing by zero in take()
+        self.rate = max(rate, 1 / 60)
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self):
+        """Wait until a token is available, then use it"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def parse_weather(data):
+    """Reduce an API weather object to what the widget shows"""
+    return {
+        'id': data['id'],
+        'temp': data['main']['temp'],
+        'description': data['weather'][0]['description'].title(),
+        'name': data['name'],
+        'icon': data['weather'][0]['icon']
+    }
+
+
+def raise_for_error(response):
+    """Turn an API error response into a WeatherError"""
+    if response.status_code != 200:
+        try:
+            message = response.json().get('message', '')
+        except ValueError:
+            message = response.reason
+        raise WeatherError(f"HTTP {response.status_code}: {message}")
+
+
+class ResponseCache:
+    """On-disk cache of weather responses keyed by (city, units).
+
+    Entries keep the server's ETag and Last-Modified so a stale entry
+    can be revalidated with a conditional request. The file is loaded
+    once and rewritten in the background after each change.
+    """
+
+    def __init__(self, path=CACHE_FILE, ttl=600):
+        self.path = path
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.writer = JsonWriter(path)
+        try:
+            with open(path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    @staticmethod
+    def key(city, units):
+        return f"{city.strip().lower()}|{units}"
+
+    def get(self, city, units):
+        """The cached entry for a city, however old, or None"""
+        with self.lock:
+            return self.entries.get(self.key(city, units))
+
+    def is_fresh(self, entry):
+        return time.time() - entry['fetched'] < self.ttl
+
+    def put(self, city, units, data, etag=None, last_modified=None):
+        entry = {'data': data, 'fetched': time.time(), 'etag': etag,
+                 'last_modified': last_modified}
+        with self.lock:
+            self.entries[self.key(city, units)] = entry
+            # The canonical name the server returned is cached too
+            self.entries[self.key(data['name'], units)] = entry
+            self.writer.schedule(self.entries)
+        return entry
+
+    def touch(self, city, units, entry):
+        """Mark an entry as revalidated (HTTP 304)"""
+        with self.lock:
+            entry['fetched'] = time.time()
+            self.entries[self.key(city, units)] = entry
+            self.writer.schedule(self.entries)
+        return entry
+
+
+class WeatherClient:
+    """Fetches weather data on a worker thread.
+
+    Requests are queued to one worker that owns a keep-alive
+    ``requests.Session``, so repeated fetches reuse the connection and a
+    dead network only ever blocks the worker, for at most the timeouts.
+    Results wait in a queue until the Tk thread drains them with
+    ``poll``. ``base_url`` and ``icon_url`` can point at a local server.
+
+    Responses are cached; within the cache TTL a request is answered
+    without touching the network, and after it the cached ETag or
+    Last-Modified turns the fetch into a conditional request. Every API
+    call takes a token from ``limiter`` first.
+    """
+
+    def __init__(self, api_key, base_url=DEFAULT_BASE_URL, icon_url=ICON_URL,
+                 icon_dir=SOURCE_DIR, timeout=TIMEOUT, cache=None, limiter=None):
+        self.api_key = api_key
+        self.cache = cache if cache is not None else ResponseCache()
+        self.limiter = limiter if limiter is not None else TokenBucket(1, 10)
+        self.base_url = base_url.rstrip('/')
+        self.icon_url = icon_url
+        self.icon_dir = icon_dir
+        self.timeout = timeout
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()
+        self.pending = 0
+        self.session = None
+        self.thread = None
+
+    def request_weather(self, city, units='metric', force=False):
+        """Queue a current-weather fetch; force skips the cache TTL"""
+        self.submit('weather', city, units, force)
+
+    def request_batch(self, cities, units='metric', force=False):
+        """Queue one fetch of several cities in as few API calls as possible"""
+        self.submit('batch', tuple(cities), units, force)
+
+    def cached_weather(self, city, units='metric'):
+        """Cached weather for a city, however old, or None"""
+        entry = self.cache.get(city, units)
+        return entry['data'] if entry is not None else None
+
+    def request_icon(self, code, size=64):
+        """Queue a download and resize of a weather icon unless it is on disk"""
+        self.submit('icon', code, size)
+
+    def prefetch_icons(self, size=64):
+        """Queue one batch that downloads and resizes every icon"""
+        self.submit('icons', size)
+
+    def submit(self, kind, *args):
+        self.pending += 1
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._run, daemon=True, name="weather-client")
+            self.thread.start()
+        self.jobs.put((kind, args))
+
+    def poll(self, callback):
+        """Call callback(kind, args, value, error) for each finished request"""
+        while True:
+            try:
+                result = self.results.get_nowait()
+            except queue.Empty:
+                return
+            self.pending -= 1
+            callback(*result)
+
+    def _run(self):
+        while True:
+            kind, args = self.jobs.get()
+            try:
+                value = getattr(self, f'fetch_{kind}')(*args)
+                error = None
+            except Exception as e:
+                value = None
+                error = e
+            self.results.put((kind, args, value, error))
+
+    def get_session(self):
+        if self.session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            self.session = requests.Session()
+            # One worker, so one pooled connection per host is enough;
+            # retries are ours, with backoff, not urllib3's
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=1, max_retries=0)
+            self.session.mount('http://', adapter)
+            self.session.mount('https://', adapter)
+        return self.session
+
+    def fetch_weather(self, city, units, force=False):
+        """Current weather for a city, reduced to what the widget shows"""
+        entry = self.cache.get(city, units)
+        if entry is not None and not force and self.cache.is_fresh(entry):
+            return entry['data']
+
+        headers = {}
+        if entry is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        self.limiter.take()
+        response = self.get_session().get(
+            f"{self.base_url}/data/2.5/weather",
+            params={'q': city, 'appid': self.api_key, 'units': units},
+            headers=headers,
+            timeout=self.timeout
+        )
+        if response.status_code == 304 and entry is not None:
+            return self.cache.touch(city, units, entry)['data']
+        raise_for_error(response)
+        weather = parse_weather(response.json())
+        self.cache.put(city, units, weather, response.headers.get('ETag'),
+                       response.headers.get('Last-Modified'))
+        return weather
+
+    def fetch_batch(self, cities, units, force=False):
+        """Current weather for several cities as (results, errors) dicts.
+
+        Fresh cache entries cost nothing. Cities whose ID is known from an
+        earlier response are fetched together through the group endpoint,
+        up to GROUP_SIZE per call; the rest, and lone leftovers, are
+        fetched one by one, which also learns their IDs for next time.
+        """
+        results = {}
+        errors = {}
+        by_id = {}
+        single = []
+        for city in cities:
+            entry = self.cache.get(city, units)
+            if entry is not None and not force and self.cache.is_fresh(entry):
+                results[city] = entry['data']
+            elif entry is not None and 'id' in entry['data']:
+                by_id.setdefault(entry['data']['id'], []).append(city)
+            else:
+                single.append(city)
+
+        ids = list(by_id)
+        for start in range(0, len(ids), GROUP_SIZE):
+            chunk = ids[start:start + GROUP_SIZE]
+            if len(chunk) == 1:
+                single.extend(by_id[chunk[0]])
+                continue
+            try:
+                found = self.fetch_group(chunk, units)
+            except Exception as e:
+                for city_id in chunk:
+                    for city in by_id[city_id]:
+                        errors[city] = e
+                continue
+            for city_id in chunk:
+                for city in by_id[city_id]:
+                    if city_id in found:
+                        results[city] = self.cache.put(city, units, found[city_id])['data']
+                    else:
+                        errors[city] = WeatherError(f"City {city_id} missing from group response")
+
+        for city in single:
+            try:
+                results[city] = self.fetch_weather(city, units, force)
+            except Exception as e:
+                errors[city] = e
+        return results, errors
+
+    def fetch_group(self, city_ids, units):
+        """Weather for several city IDs in one call, keyed by ID"""
+        self.limiter.take()
+        response = self.get_session().get(
+            f"{self.base_url}/data/2.5/group",
+            params={'id': ','.join(str(city_id) for city_id in city_ids),
+                    'appid': self.api_key, 'units': units},
+            timeout=self.timeout
+        )
+        raise_for_error(response)
+        return {data['id']: parse_weather(data) for data in response.json()['list']}
+
+    def fetch_icon(self, code, size=None):
+        """Path of an icon, downloaded and resized to size if needed"""
+        if size is not None:
+            target = resized_path(code, size)
+            if os.path.exists(target):
+                return target
+
+        path = source_path(code, self.icon_dir)
+        if not os.path.exists(path):
+            response = self.get_session().get(self.icon_url.format(code=code),
+                                              timeout=self.timeout)
+            response.raise_for_status()
+            os.makedirs(self.icon_dir, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(response.content)
+            os.replace(tmp_path, path)
+
+        if size is None:
+            return path
+        return resize_icon(path, target, size)
+
+    def fetch_icons(self, size):
+        """Download and resize the whole icon set over one connection.
+
+        Returns the codes that failed; the rest are on disk.
+        """
+        failed = []
+        for code in ICON_CODES:
+            try:
+                self.fetch_icon(code, size)
+            except Exception as e:
+                print(f"Error prefetching weather icon {code}: {e}")
+                failed.append(code)
+        if len(failed) == len(ICON_CODES):
+            raise WeatherError("Could not download any weather icons")
+        return failed
+
+
+def load_api_key(settings):
+    """API key from settings, the environment or a .env file"""
+    api_key = settings.get('weather.api_key')
+    if api_key:
+        return api_key
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        pass
+    return os.environ.get('OPENWEATHER_API_KEY', '')
+
+
+_client = None
+
+
+def get_weather_client():
+    """Return the shared weather client"""
+    global _client
+    if _client is None:
+        from utils.settings import get_settings
+
+        settings = get_settings()
+        per_minute = settings.get('weather.requests_per_minute', 30)
+        _client = WeatherClient(
+            load_api_key(settings),
+            base_url=settings.get('weather.base_url', DEFAULT_BASE_URL),
+            icon_url=settings.get('weather.icon_url', ICON_URL),
+            cache=ResponseCache(ttl=settings.get('weather.cache_ttl', 600)),
+            limiter=TokenBucket(per_minute / 60, max(1, per_minute // 6))
+        )
+    return _client
@@ -0,0 +1,84 @@
+import os
+from collections import OrderedDict
+
+# Every icon OpenWeatherMap uses, day and night variants
+ICON_CODES = tuple(
+    f"{number}{time_of_day}"
+    for number in ('01', '02', '03', '04', '09', '10', '11', '13', '50')
+    for time_of_day in ('d', 'n')
+)
+
+SOURCE_DIR = "assets/weather_icons"
+RESIZED_DIR = "cache/weather_icons"
+
+
+def source_path(code, directory=SOURCE_DIR):
+    """Where the icon as downloaded is kept"""
+    return os.path.join(directory, f"{code}.png")
+
+
+def resized_path(code, size, directory=RESIZED_DIR):
+    """Where the icon scaled to size x size is kept"""
+    return os.path.join(directory, f"{code}@{size}.png")
+
+
+def resize_icon(source, target, size):
+    """Scale an icon once and save it as PNG, which Tk loads natively"""
+    from PIL import Image
+
+    with Image.open(source) as img:
+        img = img.convert('RGBA').resize((size, size), Image.Resampling.LANCZOS)
+    os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+    tmp_path = f"{target}.tmp"
+    img.save(tmp_path, 'PNG')
+    os.replace(tmp_path, target)
+    return target
+
+
+class IconCache:
+    """Ready-to-show PhotoImages keyed by (icon code, size).
+
+    The first level is an LRU of PhotoImages in memory. The second is the
+    pre-resized PNGs on disk, which Tk decodes itself, so showing an icon
+    never needs Pillow on the Tk thread. Anything missing from both is
+    fetched and resized by the weather client's worker.
+    """
+
+    def __init__(self, max_entries=24, directory=RESIZED_DIR):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.images = OrderedDict()
+
+    def get(self, code, size):
+        """PhotoImage for an icon, or None if it hasn't been resized yet"""
+        key = (code, size)
+        image = self.images.get(key)
+        if image is not None:
+            self.images.move_to_end(key)
+            return image
+        path = resized_path(code, size, self.directory)
+        if os.path.exists(path):
+            return self.load(code, size, path)
+        return None
+
+    def load(self, code, size, path):
+        """Load a resized icon from disk into the LRU"""
+        import tkinter as tk
+
+        image = tk.PhotoImage(file=path)
+        self.images[(code, size)] = image
+        self.images.move_to_end((code, size))
+        while len(self.images) > self.max_entries:
+            self.images.popitem(last=False)
+        return image
+
+
+_icon_cache = None
+
+
+def get_icon_cache():
+    """Return the shared icon cache"""
+    global _icon_cache
+    if _icon_cache is None:
+        _icon_cache = IconCache()
+    return _icon_cache
@@ -0,0 +1,151 @@
+from utils.weather_client import Backoff, get_weather_client
+
+
+class WeatherProvider:
+    """One refresh loop for every weather widget on the desktop.
+
+    Widgets ``watch`` the cities they show and ``subscribe`` to results.
+    The provider keeps a single refresh job and fetches all watched cities
+    as one batch, so API use follows the refresh rate however many widgets
+    are on screen; two widgets showing the same city share its fetch.
+    Cities watched within the same tick are coalesced into one batch.
+    """
+
+    def __init__(self, scheduler, client, units='metric', refresh=1800):
+        self.client = client
+        self.units = units
+        self.watched = {}  # city -> number of widgets watching it
+        self.subscribers = []
+        self.latest = {}  # city -> last weather shown for it
+        self.backoff = Backoff()
+        self.fetching = False
+
+        self.refresh_job = scheduler.every(refresh, self.refresh, name="weather")
+        self.refresh_job.suspend()
+
+        # Collect finished requests; only runs while a request is in flight
+        self.results_job = scheduler.every(1, self.poll_results, name="weather-results", stretch=False)
+        self.results_job.suspend()
+
+    def watch(self, city):
+        """Include a city in every refresh; returns a function that stops it"""
+        if city not in self.watched:
+            self.watched[city] = 0
+            # Widgets created together land in the same batch next tick
+            if self.refresh_job.suspended:
+                self.refresh_job.resume(run_now=True)
+            else:
+                self.refresh_job.defer(0)
+        self.watched[city] += 1
+
+        def unwatch():
+            self.watched[city] -= 1
+            if not self.watched[city]:
+                del self.watched[city]
+                if not self.watched:
+                    self.refresh_job.suspend()
+        return unwatch
+
+    def subscribe(self, callback):
+        """Call callback(kind, args, value, error) for each result.
+
+        Batches are split so each city arrives as a 'weather' result with
+        args (city, units). Returns a function that unsubscribes.
+        """
+        self.subscribers.append(callback)
+        return lambda: self.subscribers.remove(callback)
+
+    def cached_weather(self, city):
+        """Latest weather for a city, from this session or the disk cache"""
+        value = self.latest.get(city)
+        if value is None:
+            value = self.client.cached_weather(city, self.units)
+        return value
+
+    def refresh(self, force=False):
+        """Fetch every watched city; force skips the cache TTL"""
+        if not self.watched:
+            return
+        if not self.client.api_key:
+            # No API key yet; try again in 1 minute
+            self.refresh_job.defer(60)
+            return
+        if self.fetching:
+            return
+        self.fetching = True
+        self.client.request_batch(list(self.watched), self.units, force)
+        self.results_job.resume()
+
+    def request_icon(self, code, size):
+        self.client.request_icon(code, size)
+        self.results_job.resume()
+
+    def prefetch_icons(self, size):
+        self.client.prefetch_icons(size)
+        self.results_job.resume()
+
+    def poll_results(self):
+        """Hand finished requests to subscribers, then stop polling"""
+        self.client.poll(self.on_result)
+        if not self.client.pending:
+            self.results_job.suspend()
+
+    def on_result(self, kind, args, value, error):
+        if kind != 'batch':
+            if kind == 'icons' and error is not None:
+                print(f"Error prefetching weather icons: {error}")
+            self.publish(kind, args, value, error)
+            return
+
+        self.fetching = False
+        cities, units, _ = args
+        if error is not None:
+            results, errors = {}, dict.fromkeys(cities, error)
+        else:
+            results, errors = value
+        if errors:
+            message = "; ".join(f"{city}: {e}" for city, e in errors.items())
+            if results:
+                print(f"Error updating weather: {message}")
+            else:
+                # Nothing came back; the service or network is down
+                delay = self.backoff.next_delay()
+                print(f"Error updating weather: {message} (retrying in {delay:.0f}s)")
+                self.refresh_job.defer(delay)
+        if results:
+            self.backoff.reset()
+            # Cities watched while this batch was in flight
+            if any(city not in cities for city in self.watched):
+                self.refresh_job.defer(0)
+        for city, weather in results.items():
+            self.latest[city] = weather
+            self.publish('weather', (city, units), weather, None)
+        for city, e in errors.items():
+            self.publish('weather', (city, units), None, e)
+
+    def publish(self, kind, args, value, error):
+        for callback in list(self.subscribers):
+            try:
+                callback(kind, args, value, error)
+            except Exception as e:
+                print(f"Error in weather subscriber: {e}")
+
+
+_provider = None
+
+
+def get_weather_provider(widget=None):
+    """Return the shared weather provider, creating it on the widget's root"""
+    global _provider
+    if _provider is None:
+        from utils.scheduler import get_scheduler
+        from utils.settings import get_settings
+
+        settings = get_settings()
+        _provider = WeatherProvider(
+            get_scheduler(widget),
+            get_weather_client(),
+            units=settings.get('weather.units', 'metric'),
+            refresh=settings.get('weather.refresh', 1800)
+        )
+    return _provider
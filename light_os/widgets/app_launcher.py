@@ -1,9 +1,28 @@
 import tkinter as tk
 from tkinter import ttk
-from PIL import Image, ImageTk
 import os
+import sys
 import json
 from utils.animations import HoverEffect, SlideIn
+from utils.app_index import get_app_index, main_category
+from utils.backdrop import FrostedBackdrop
+from utils.launcher import launch
+from utils.scheduler import get_scheduler
+from utils.settings import JsonWriter, get_settings
+
+# The stock dock on Windows
+WINDOWS_APPS = [
+    {"name": "File Explorer", "icon": "📁", "command": "explorer"},
+    {"name": "Web Browser", "icon": "🌐", "command": "start msedge"},
+    {"name": "Text Editor", "icon": "📝", "command": "notepad"},
+    {"name": "Terminal", "icon": "💻", "command": "cmd"},
+    {"name": "Calculator", "icon": "🧮", "command": "calc"},
+    {"name": "Settings", "icon": "⚙️", "command": "ms-settings:"}
+]
+
+# Elsewhere the stock dock is the first discovered app in each category
+DEFAULT_CATEGORIES = ('FileManager', 'WebBrowser', 'TextEditor', 'TerminalEmulator',
+                      'Calculator', 'Settings')
 
 class AppLauncher:
     def __init__(self, parent):
@@ -11,6 +30,14 @@ class AppLauncher:
         self.apps = []
         self.icon_size = 48
         self.visible = True
+        self.config_path = "config/apps.json"
+        self.apps_writer = JsonWriter(self.config_path)
+        self.settings = get_settings()
+        
+        # Applications found in the XDG directories; Windows has none
+        self.index = get_app_index() if sys.platform != 'win32' else None
+        self.discovered = []
+        self.needs_defaults = False
         
         # Create the launcher bar
         self.create_launcher()
@@ -18,9 +45,23 @@ class AppLauncher:
         # Load apps
         self.load_apps()
         
-        # Add default apps if none found
-        if not self.apps:
+        # Add default apps if none found, or if only the Windows ones are
+        # there on another platform
+        if not self.apps or (sys.platform != 'win32' and self.apps == WINDOWS_APPS):
             self.add_default_apps()
+        
+        # Load the persisted index and rescan in the background; the dock
+        # is already showing, so a cold scan never holds it up
+        if self.index is not None:
+            scheduler = get_scheduler(parent)
+            self.index_job = scheduler.every(1, self.poll_index, name="app-index", stretch=False)
+            self.rescan_job = scheduler.every(
+                self.settings.get('launcher.rescan_interval', 300), self.rescan_apps, name="app-rescan"
+            )
+            self.index.start_scan()
+        
+        # Show or hide when the settings flag changes
+        self.unsubscribe_settings = self.settings.subscribe(self.on_settings_changed, ['widgets.launcher'])
     
     def create_launcher(self):
         """Create the app launcher/dock"""
@@ -38,15 +79,18 @@ class AppLauncher:
         # Bind right-click for context menu
         self.frame.bind("<Button-3>", self.show_context_menu)
         
+        # Translucent backdrop composited from the wallpaper behind the dock
+        if get_settings().get('backdrop.enabled', True):
+            FrostedBackdrop(self.frame, '#1a1a1acc')
+        
         # Apply slide-in animation
         SlideIn(self.frame, 'bottom')
     
     def load_apps(self):
         """Load apps from configuration"""
-        config_path = "config/apps.json"
         try:
-            if os.path.exists(config_path):
-                with open(config_path, 'r') as f:
+            if os.path.exists(self.config_path):
+                with open(self.config_path, 'r') as f:
                     self.apps = json.load(f)
                     self.update_launcher()
         except Exception as e:
@@ -54,27 +98,60 @@ class AppLauncher:
     
     def save_apps(self):
         """Save apps to configuration"""
-        config_path = "config/apps.json"
-        try:
-            os.makedirs("config", exist_ok=True)
-            with open(config_path, 'w') as f:
-                json.dump(self.apps, f, indent=4)
-        except Exception as e:
-            print(f"Error saving apps: {e}")
+        # Written atomically in the background, coalescing quick edits
+        self.apps_writer.schedule(self.apps)
     
     def add_default_apps(self):
         """Add some default apps"""
-        self.apps = [
-            {"name": "File Explorer", "icon": "📁", "command": "explorer"},
-            {"name": "Web Browser", "icon": "🌐", "command": "start msedge"},
-            {"name": "Text Editor", "icon": "📝", "command": "notepad"},
-            {"name": "Terminal", "icon": "💻", "command": "cmd"},
-            {"name": "Calculator", "icon": "🧮", "command": "calc"},
-            {"name": "Settings", "icon": "⚙️", "command": "ms-settings:"}
-        ]
+        if self.index is None:
+            self.apps = [dict(app) for app in WINDOWS_APPS]
+        elif self.discovered:
+            self.needs_defaults = False
+            self.apps = []
+            for category in DEFAULT_CATEGORIES:
+                for app in self.discovered:
+                    if category in app['categories']:
+                        self.apps.append(self.dock_entry(app))
+                        break
+        else:
+            # Nothing discovered yet; fill the dock once the scan is done
+            self.needs_defaults = True
+            self.apps = []
+            self.update_launcher()
+            return
         self.save_apps()
         self.update_launcher()
     
+    def dock_entry(self, app):
+        """The part of a discovered app the dock keeps"""
+        entry = {"name": app['name'], "icon": app['icon'], "command": app['command']}
+        if app['terminal']:
+            entry["terminal"] = True
+        return entry
+    
+    def rescan_apps(self):
+        """Pick up installed or removed applications"""
+        self.index.start_scan()
+        self.index_job.resume()
+    
+    def poll_index(self):
+        """Take the app list from a finished scan, then stop polling"""
+        apps = self.index.poll()
+        if apps is not None:
+            self.discovered = apps
+            if self.needs_defaults:
+                self.add_default_apps()
+        if not self.index.scanning():
+            self.index_job.suspend()
+    
+    def pin_app(self, app):
+        """Add a discovered application to the dock"""
+        entry = self.dock_entry(app)
+        if entry not in self.apps:
+            self.apps.append(entry)
+            self.save_apps()
+            self.update_launcher()
+    
     def update_launcher(self):
         """Update the launcher with current apps"""
         # Clear existing widgets
@@ -87,7 +164,7 @@ class AppLauncher:
     
     def add_app_button(self, app):
         """Add a single app button to the launcher"""
-        btn_frame = tk.Frame(self.apps_frame, bg='transparent')
+        btn_frame = tk.Frame(self.apps_frame, bg='#1a1a1a')
         btn_frame.pack(side='left', padx=2)
         
         # Create button with icon
@@ -95,7 +172,7 @@ class AppLauncher:
             btn_frame,
             text=app.get('icon', '📁'),
             font=('Segoe UI Emoji', 24),
-            bg='transparent',
+            bg='#1a1a1a',
             fg='white',
             cursor='hand2',
             padx=5,
@@ -107,19 +184,20 @@ class AppLauncher:
         self.add_tooltip(btn, app['name'])
         
         # Bind events
-        btn.bind("<Button-1>", lambda e, cmd=app.get('command', ''): self.launch_app(cmd))
+        btn.bind("<Button-1>", lambda e, a=app: self.launch_app(a.get('command', ''), a['name'],
+                                                              a.get('terminal', False)))
         
         # Add hover effect
-        HoverEffect(btn, 'transparent', '#3d3d3dcc')
+        HoverEffect(btn, '#1a1a1a', '#3d3d3dcc')
     
     def add_tooltip(self, widget, text):
         """Add a tooltip to a widget"""
         widget.tooltip = None
         
         def on_enter(event):
-            x, y, _, _ = widget.bbox("insert")
-            x += widget.winfo_rootx() + 25
-            y += widget.winfo_rooty() + 25
+            # Labels have no "insert" index to take a bbox of
+            x = widget.winfo_rootx() + 25
+            y = widget.winfo_rooty() + 25
             
             widget.tooltip = tk.Toplevel(widget)
             widget.tooltip.wm_overrideredirect(True)
@@ -145,19 +223,17 @@ class AppLauncher:
         widget.bind("<Enter>", on_enter)
         widget.bind("<Leave>", on_leave)
     
-    def launch_app(self, command):
-        """Launch an application"""
-        try:
-            if command:
-                os.system(f"start {command}")
-        except Exception as e:
-            print(f"Error launching app: {e}")
+    def launch_app(self, command, name=None, terminal=False):
+        """Launch an application without waiting for it"""
+        launch(command, name, terminal)
     
     def show_context_menu(self, event):
         """Show context menu for the launcher"""
         menu = tk.Menu(self.parent, tearoff=0, bg='#2d2d2d', fg='white',
                       bd=0, font=('Segoe UI', 10))
         
+        if self.discovered:
+            menu.add_cascade(label="Applications", menu=self.create_applications_menu(menu))
         menu.add_command(label="Add Application", command=self.add_application)
         menu.add_command(label="Edit Launcher", command=self.edit_launcher)
         menu.add_separator()
@@ -168,6 +244,21 @@ class AppLauncher:
         finally:
             menu.grab_release()
     
+    def create_applications_menu(self, parent_menu):
+        """Discovered applications by category; choosing one pins it"""
+        submenu = tk.Menu(parent_menu, tearoff=0, bg='#2d2d2d', fg='white',
+                          bd=0, font=('Segoe UI', 10))
+        categories = {}
+        for app in self.discovered:
+            categories.setdefault(main_category(app['categories']), []).append(app)
+        for label in sorted(categories):
+            category_menu = tk.Menu(submenu, tearoff=0, bg='#2d2d2d', fg='white',
+                                    bd=0, font=('Segoe UI', 10))
+            for app in categories[label]:
+                category_menu.add_command(label=app['name'], command=lambda a=app: self.pin_app(a))
+            submenu.add_cascade(label=label, menu=category_menu)
+        return submenu
+    
     def add_application(self):
         """Open dialog to add a new application"""
         dialog = tk.Toplevel(self.parent)
@@ -255,7 +346,17 @@ class AppLauncher:
     
     def toggle_visibility(self):
         """Toggle launcher visibility"""
-        self.visible = not self.visible
+        self.settings.set('widgets.launcher', not self.visible)
+    
+    def on_settings_changed(self, changed):
+        """Follow the visibility flag in settings"""
+        self.set_visible(self.settings.get('widgets.launcher', True))
+    
+    def set_visible(self, visible):
+        """Show or hide the launcher"""
+        if visible == self.visible:
+            return
+        self.visible = visible
         if self.visible:
             self.frame.place(relx=0.5, rely=1.0, anchor='s', y=-20)
         else:
@@ -263,5 +364,9 @@ class AppLauncher:
     
     def destroy(self):
         """Clean up the launcher"""
+        if self.index is not None:
+            self.index_job.cancel()
+            self.rescan_job.cancel()
+        self.unsubscribe_settings()
         if hasattr(self, 'frame') and self.frame.winfo_exists():
             self.frame.destroy()
@@ -2,6 +2,11 @@ import tkinter as tk
 from tkinter import font as tkfont
 import time
 from utils.animations import HoverEffect
+from utils.backdrop import FrostedBackdrop
+from utils.settings import get_settings
+from utils.scheduler import get_scheduler
+from utils.power import IDLE, get_power_policy
+from utils.binding import TextBinding
 
 class ClockWidget:
     def __init__(self, parent, x=20, y=20):
@@ -40,28 +45,50 @@ class ClockWidget:
         )
         self.date_label.pack(expand=True, fill='both')
         
+        # Labels are only reconfigured when their text changes
+        self.time_text = TextBinding(self.time_label, value="00:00:00")
+        self.date_text = TextBinding(self.date_label, value="")
+        
         # Add hover effect
         HoverEffect(self.frame, '#1a1a1a80', '#2d2d2dcc')
         
+        # Translucent backdrop composited from the wallpaper behind us
+        if get_settings().get('backdrop.enabled', True):
+            FrostedBackdrop(self.frame, '#1a1a1a80')
+        
         # Bind right-click for context menu
         self.frame.bind("<Button-3>", self.show_context_menu)
         
-        # Start clock
+        # Show or hide when the settings flag changes
+        self.settings = get_settings()
+        self.unsubscribe_settings = self.settings.subscribe(self.on_settings_changed, ['widgets.clock'])
+        
+        # Start clock, ticking on wall-clock second boundaries. The clock
+        # sets its own pace from the power state instead of being stretched
+        self.time_format = '%H:%M:%S'
+        self.clock_job = get_scheduler(parent).every(1, self.update_clock, name="clock", stretch=False)
+        self.unsubscribe_power = get_power_policy(parent).subscribe(self.on_power_state)
         self.update_clock()
     
     def update_clock(self):
         """Update the clock display"""
-        if self.visible:
-            # Get current time
-            current_time = time.strftime('%H:%M:%S')
-            current_date = time.strftime('%A, %B %d, %Y')
-            
-            # Update labels
-            self.time_label.config(text=current_time)
-            self.date_label.config(text=current_date)
-            
-            # Schedule next update
-            self.parent.after(1000, self.update_clock)
+        # Get current time
+        current_time = time.strftime(self.time_format)
+        current_date = time.strftime('%A, %B %d, %Y')
+        
+        # Update labels; the date changes once a day
+        self.time_text.set(current_time)
+        self.date_text.set(current_date)
+    
+    def on_power_state(self, state):
+        """Drop the seconds while the desktop is idle"""
+        if state == IDLE:
+            self.time_format = '%H:%M'
+            self.clock_job.set_interval(60, align=True)
+        else:
+            self.time_format = '%H:%M:%S'
+            self.clock_job.set_interval(1, align=True)
+        self.update_clock()
     
     def show_context_menu(self, event):
         """Show context menu for the clock"""
@@ -80,19 +107,36 @@ class ClockWidget:
     
     def toggle_visibility(self):
         """Toggle clock visibility"""
-        self.visible = not self.visible
+        self.settings.set('widgets.clock', not self.visible)
+    
+    def on_settings_changed(self, changed):
+        """Follow the visibility flag in settings"""
+        self.set_visible(self.settings.get('widgets.clock', True))
+    
+    def set_visible(self, visible):
+        """Show or hide the clock"""
+        if visible == self.visible:
+            return
+        self.visible = visible
         if self.visible:
             self.frame.place(x=self.x, y=self.y)
             self.update_clock()
+            self.clock_job.resume()
         else:
+            # Hidden widgets stop ticking altogether
             self.frame.place_forget()
+            self.clock_job.suspend()
     
     def set_position(self, x, y):
         """Set the position of the clock"""
         self.x = x
         self.y = y
         self.frame.place(x=x, y=y)
+        self.settings.set('positions.clock', [x, y])
     
     def destroy(self):
         """Clean up the widget"""
+        self.clock_job.cancel()
+        self.unsubscribe_power()
+        self.unsubscribe_settings()
         self.frame.destroy()
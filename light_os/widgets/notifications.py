@@ -0,0 +1,81 @@
+import tkinter as tk
+
+# Accent colour per notification level
+LEVEL_COLORS = {
+    'warning': '#ff9800',
+    'error': '#f44336',
+    'info': '#4CAF50',
+}
+
+class NotificationArea:
+    """Stack of toasts in the top-right corner of the desktop"""
+
+    MAX_TOASTS = 4
+
+    def __init__(self, parent, width=300, timeout=8000):
+        self.parent = parent
+        self.width = width
+        self.timeout = timeout
+        self.toasts = []  # [frame, after id], newest first
+
+    def show(self, title, message, level='warning'):
+        """Show a toast that hides itself after the timeout"""
+        accent = LEVEL_COLORS.get(level, LEVEL_COLORS['info'])
+        frame = tk.Frame(self.parent, bg='#2d2d2d', bd=0, width=self.width,
+                         highlightthickness=1, highlightbackground=accent)
+
+        title_label = tk.Label(
+            frame,
+            text=title,
+            font=('Segoe UI', 10, 'bold'),
+            fg=accent,
+            bg='#2d2d2d',
+            anchor='w',
+            padx=12,
+            pady=4
+        )
+        title_label.pack(fill='x')
+
+        message_label = tk.Label(
+            frame,
+            text=message,
+            font=('Segoe UI', 9),
+            fg='white',
+            bg='#2d2d2d',
+            anchor='w',
+            justify='left',
+            wraplength=self.width - 24,
+            padx=12,
+            pady=4
+        )
+        message_label.pack(fill='x')
+
+        toast = [frame, None]
+        toast[1] = frame.after(self.timeout, lambda: self.dismiss(toast))
+
+        # Click anywhere on the toast to dismiss it
+        for widget in (frame, title_label, message_label):
+            widget.bind("<Button-1>", lambda e: self.dismiss(toast))
+
+        self.toasts.insert(0, toast)
+        while len(self.toasts) > self.MAX_TOASTS:
+            self.dismiss(self.toasts[-1])
+        self.layout()
+
+    def dismiss(self, toast):
+        """Remove a toast"""
+        if toast not in self.toasts:
+            return
+        self.toasts.remove(toast)
+        frame, after_id = toast
+        frame.after_cancel(after_id)
+        frame.destroy()
+        self.layout()
+
+    def layout(self):
+        """Stack toasts downwards from the top-right corner"""
+        y = 20
+        for frame, _ in self.toasts:
+            frame.place(relx=1.0, x=-20, y=y, anchor='ne')
+            frame.update_idletasks()
+            y += frame.winfo_reqheight() + 10
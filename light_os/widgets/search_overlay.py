@@ -0,0 +1,160 @@
+import tkinter as tk
+from utils.app_index import get_app_index
+from utils.binding import TextBinding
+from utils.fuzzy import FuzzyIndex, get_frecency
+from utils.launcher import launch
+
+class SearchOverlay:
+    """Type-to-search panel over the discovered applications.
+
+    Opened from the keyboard; every keystroke re-ranks the index with
+    FuzzyIndex, Up/Down pick a result, Return launches it and Escape
+    closes the panel. Launches feed the frecency ranking.
+    """
+
+    ROWS = 8
+    INDEX_POLL = 250
+
+    def __init__(self, parent, width=480):
+        self.parent = parent
+        self.index = get_app_index()
+        self.frecency = get_frecency()
+        self.fuzzy = None
+        self.fuzzy_apps = None
+        self.results = []
+        self.selected = 0
+        self.visible = False
+        self.poll_id = None
+
+        self.frame = tk.Frame(parent, bg='#2d2d2d', bd=0, width=width,
+                              highlightthickness=1, highlightbackground='#1a73e8')
+
+        self.query = tk.StringVar()
+        self.entry = tk.Entry(
+            self.frame,
+            textvariable=self.query,
+            font=('Segoe UI', 14),
+            bg='#1a1a1a',
+            fg='white',
+            insertbackground='white',
+            relief='flat',
+            width=40
+        )
+        self.entry.pack(fill='x', padx=10, pady=10, ipady=6)
+
+        # Fixed rows, updated in place as the results change
+        self.rows = []
+        for row in range(self.ROWS):
+            label = tk.Label(
+                self.frame,
+                text="",
+                font=('Segoe UI', 11),
+                fg='white',
+                bg='#2d2d2d',
+                anchor='w',
+                padx=12,
+                pady=4
+            )
+            label.pack(fill='x')
+            label.bind("<Button-1>", lambda e, r=row: self.launch_row(r))
+            self.rows.append((TextBinding(label, 'text', ""), TextBinding(label, 'bg', '#2d2d2d')))
+        tk.Frame(self.frame, height=6, bg='#2d2d2d').pack(fill='x')
+
+        self.query.trace_add('write', lambda *args: self.update_results())
+        self.entry.bind("<Escape>", lambda e: self.hide())
+        self.entry.bind("<Return>", lambda e: self.launch_row(self.selected))
+        self.entry.bind("<Down>", lambda e: self.move(1))
+        self.entry.bind("<Up>", lambda e: self.move(-1))
+
+    def show(self):
+        """Open the panel with an empty query"""
+        if not self.index.apps and not self.index.scanning():
+            # The dock usually starts the scan; it may be switched off
+            self.index.start_scan()
+        self.visible = True
+        self.refresh_index()
+        self.query.set("")
+        self.frame.place(relx=0.5, rely=0.2, anchor='n')
+        self.frame.lift()
+        self.entry.focus_set()
+        self.poll_index()
+
+    def hide(self):
+        """Close the panel"""
+        self.visible = False
+        if self.poll_id is not None:
+            self.frame.after_cancel(self.poll_id)
+            self.poll_id = None
+        self.frame.place_forget()
+
+    def toggle(self):
+        if self.visible:
+            self.hide()
+        else:
+            self.show()
+
+    def refresh_index(self):
+        """Rebuild the search index if the app list changed"""
+        apps = self.index.apps
+        if apps is not self.fuzzy_apps:
+            self.fuzzy_apps = apps
+            self.fuzzy = FuzzyIndex(apps, self.frecency.scores(), self.ROWS)
+            return True
+        return False
+
+    def poll_index(self):
+        """Pick up a scan that finishes while the panel is open"""
+        self.poll_id = None
+        if self.refresh_index():
+            self.update_results()
+        if self.visible and self.index.scanning():
+            self.poll_id = self.frame.after(self.INDEX_POLL, self.poll_index)
+
+    def top_apps(self):
+        """Most frecent apps, then alphabetical, for the start menu"""
+        self.refresh_index()
+        return self.fuzzy.search("")
+
+    def update_results(self):
+        """Re-rank for the current query"""
+        self.results = self.fuzzy.search(self.query.get())
+        self.selected = 0
+        self.render()
+
+    def render(self):
+        for row, (text, bg) in enumerate(self.rows):
+            if row < len(self.results):
+                app = self.results[row]
+                text.set(f"{app['icon']}  {app['name']}")
+            else:
+                text.set("")
+            bg.set('#1a73e8' if row == self.selected and self.results else '#2d2d2d')
+
+    def move(self, step):
+        """Move the selection up or down"""
+        if self.results:
+            self.selected = (self.selected + step) % len(self.results)
+            self.render()
+        return 'break'
+
+    def launch_row(self, row):
+        if row < len(self.results):
+            self.launch(self.results[row])
+            self.hide()
+
+    def launch(self, app):
+        """Start an app and count the launch towards its frecency"""
+        launch(app['command'], app['name'], app.get('terminal', False))
+        self.frecency.record(app['id'])
+        self.fuzzy.set_frecency(self.frecency.scores())
+
+
+_overlay = None
+
+
+def get_search_overlay(widget):
+    """Return the shared search overlay on the widget's window"""
+    global _overlay
+    if _overlay is None:
+        _overlay = SearchOverlay(widget.winfo_toplevel())
+    return _overlay
@@ -1,10 +1,39 @@
+import time
 import tkinter as tk
 from tkinter import ttk
-import psutil
-import platform
-import os
-import time
 from utils.animations import HoverEffect
+from utils.backdrop import FrostedBackdrop
+from utils.settings import get_settings
+from utils.scheduler import get_scheduler
+from utils.metrics import get_sampler
+from utils.history import get_history
+from utils.metrics_log import get_metrics_log
+from utils.binding import BarBinding, LineBinding, TextBinding
+from utils.launcher import get_supervisor
+
+# CPU trend windows offered in the context menu; 0 is the live 1 s history
+TREND_WINDOWS = (
+    ("Last 2 Minutes", 0),
+    ("Last Hour", 3600),
+    ("Last 24 Hours", 86400),
+    ("Last 7 Days", 7 * 86400),
+)
+
+def format_speed(speed):
+    """Format a byte rate with a readable unit"""
+    for unit in ['B/s', 'KB/s', 'MB/s', 'GB/s']:
+        if speed < 1024 or unit == 'GB/s':
+            return f"{speed:.1f} {unit}"
+        speed /= 1024
+
+def format_duration(seconds):
+    """Format an uptime as 45s, 12m or 3h 05m"""
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m"
+    return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
 
 class SystemMonitor:
     def __init__(self, parent, x=20, y=300):
@@ -12,7 +41,15 @@ class SystemMonitor:
         self.x = x
         self.y = y
         self.visible = True
-        self.update_interval = 2000  # Update every 2 seconds
+        self.update_interval = 2  # Update every 2 seconds
+        
+        # Metrics are sampled on a background thread; we only render them
+        self.sampler = get_sampler()
+        self.history = get_history()
+        self.metrics_log = get_metrics_log()
+        self.trend_window = tk.IntVar(value=0)
+        self.trend_bucket = None
+        self.rendered_sequence = None
         
         # Create monitor frame
         self.frame = tk.Frame(parent, bg='#1a1a1a', bd=0)
@@ -34,23 +71,45 @@ class SystemMonitor:
         # CPU usage
         self.cpu_frame = self.create_metric_frame("CPU:", "0%")
         self.cpu_bar = self.create_progress_bar()
+        self.cpu_trend = self.create_sparkline()
         
         # Memory usage
         self.mem_frame = self.create_metric_frame("Memory:", "0%")
         self.mem_bar = self.create_progress_bar()
         
-        # Disk usage
-        self.disk_frame = self.create_metric_frame("Disk (C:):", "0%")
-        self.disk_bar = self.create_progress_bar()
+        # Disk usage, one row per mounted filesystem
+        self.disk_container = tk.Frame(self.frame, bg='#1a1a1a')
+        self.disk_container.pack(fill='x')
+        self.disk_rows = {}
+        self.disk_mounts = ()
         
         # Network usage
         self.net_frame = self.create_metric_frame("Network:", "0 KB/s")
+        self.nic_container = tk.Frame(self.frame, bg='#1a1a1a')
+        self.nic_container.pack(fill='x')
+        self.nic_rows = {}
+        self.nic_names = ()
+        
+        # Top processes by CPU
+        self.process_rows = []
+        if self.sampler.processes is not None:
+            tk.Label(
+                self.frame,
+                text="Top Processes",
+                font=('Segoe UI', 9, 'bold'),
+                fg='#cccccc',
+                bg='#1a1a1a',
+                padx=15,
+                pady=2
+            ).pack(anchor='w')
+            for _ in range(self.sampler.processes.count):
+                self.process_rows.append(self.create_process_row())
         
         # System info
         self.info_font = ('Segoe UI', 8)
         self.info_label = tk.Label(
             self.frame,
-            text=self.get_system_info(),
+            text="",
             font=self.info_font,
             fg='#999999',
             bg='#1a1a1a',
@@ -59,23 +118,30 @@ class SystemMonitor:
             pady=10
         )
         self.info_label.pack(anchor='w', fill='x')
+        self.info_text = TextBinding(self.info_label, value="")
         
         # Add hover effect
         HoverEffect(self.frame, '#1a1a1a', '#2d2d2d')
         
-        # Store previous network stats
-        self.prev_net_io = psutil.net_io_counters()
-        self.prev_time = time.time()
+        # Translucent backdrop composited from the wallpaper behind us
+        self.backdrop = None
+        if get_settings().get('backdrop.enabled', True):
+            self.backdrop = FrostedBackdrop(self.frame, '#1a1a1acc')
         
         # Bind right-click for context menu
         self.frame.bind("<Button-3>", self.show_context_menu)
         
+        # Show or hide when the settings flag changes
+        self.settings = get_settings()
+        self.unsubscribe_settings = self.settings.subscribe(self.on_settings_changed, ['widgets.system'])
+        
         # Start updates
+        self.metrics_job = get_scheduler(parent).every(self.update_interval, self.update_metrics, name="metrics")
         self.update_metrics()
     
-    def create_metric_frame(self, label_text, value_text):
+    def create_metric_frame(self, label_text, value_text, parent=None):
         """Create a frame for a metric with label and value"""
-        frame = tk.Frame(self.frame, bg='#1a1a1a')
+        frame = tk.Frame(parent or self.frame, bg='#1a1a1a')
         frame.pack(fill='x', padx=15, pady=2)
         
         # Label
@@ -102,11 +168,26 @@ class SystemMonitor:
         )
         value.pack(side='right')
         
-        return frame, value
+        return frame, TextBinding(value, value=value_text)
+    
+    def create_process_row(self):
+        """Create a row for one process with name and usage"""
+        frame = tk.Frame(self.frame, bg='#1a1a1a')
+        frame.pack(fill='x', padx=15)
+        
+        name = tk.Label(frame, text="", font=('Segoe UI', 8), fg='#cccccc',
+                        bg='#1a1a1a', width=16, anchor='w')
+        name.pack(side='left')
+        
+        usage = tk.Label(frame, text="", font=('Segoe UI', 8), fg='white',
+                         bg='#1a1a1a', anchor='e')
+        usage.pack(side='right')
+        
+        return TextBinding(name, value=""), TextBinding(usage, value="")
     
-    def create_progress_bar(self):
+    def create_progress_bar(self, parent=None):
         """Create a progress bar for metrics"""
-        frame = tk.Frame(self.frame, bg='#1a1a1a', height=4)
+        frame = tk.Frame(parent or self.frame, bg='#1a1a1a', height=4)
         frame.pack(fill='x', padx=15, pady=5)
         
         # Create a canvas for the progress bar
@@ -119,24 +200,83 @@ class SystemMonitor:
         # Draw the progress
         progress = canvas.create_rectangle(0, 0, 0, 4, fill='#4CAF50', outline='')
         
-        return canvas, progress
+        return BarBinding(canvas, progress)
+    
+    def create_disk_row(self, mountpoint):
+        """Create the usage and I/O rows for one mounted filesystem"""
+        label = mountpoint if len(mountpoint) <= 10 else "…" + mountpoint[-9:]
+        frame, value = self.create_metric_frame(f"{label}:", "0%", self.disk_container)
+        bar = self.create_progress_bar(self.disk_container)
+        io = tk.Label(
+            self.disk_container,
+            text="",
+            font=('Segoe UI', 8),
+            fg='#999999',
+            bg='#1a1a1a',
+            anchor='w',
+            padx=15
+        )
+        io.pack(fill='x')
+        return value, bar, TextBinding(io, value="")
+    
+    def rebuild_disk_rows(self, mounts):
+        """Replace the disk rows after something was mounted or unmounted"""
+        for child in self.disk_container.winfo_children():
+            child.destroy()
+        self.disk_rows = {mountpoint: self.create_disk_row(mountpoint) for mountpoint in mounts}
+        self.disk_mounts = mounts
+        if self.backdrop is not None:
+            # Blend the new rows into the backdrop
+            self.backdrop.refresh()
+    
+    def rebuild_nic_rows(self, names):
+        """Replace the per-interface rows when interfaces come or go"""
+        for child in self.nic_container.winfo_children():
+            child.destroy()
+        self.nic_rows = {}
+        for name in names:
+            label = tk.Label(
+                self.nic_container,
+                text="",
+                font=('Segoe UI', 8),
+                fg='#999999',
+                bg='#1a1a1a',
+                anchor='w',
+                padx=15
+            )
+            label.pack(fill='x')
+            self.nic_rows[name] = TextBinding(label, value="")
+        self.nic_names = names
+        if self.backdrop is not None:
+            self.backdrop.refresh()
+    
+    def create_sparkline(self, height=24):
+        """Create a small line chart for a metric's recent history"""
+        canvas = tk.Canvas(self.frame, height=height, bg='#1a1a1a', highlightthickness=0)
+        canvas.pack(fill='x', padx=15, pady=(0, 5))
+        line = canvas.create_line(0, height, 0, height, fill='#4CAF50', width=1)
+        return LineBinding(canvas, line, height)
     
     def update_metrics(self):
-        """Update all system metrics"""
-        if not self.visible:
-            self.parent.after(self.update_interval, self.update_metrics)
+        """Render the latest metrics snapshot"""
+        snapshot = self.sampler.latest
+        if snapshot is None or snapshot['sequence'] == self.rendered_sequence:
             return
+        self.rendered_sequence = snapshot['sequence']
         
         try:
             # CPU Usage
-            cpu_percent = psutil.cpu_percent(interval=None)
+            cpu_percent = snapshot['cpu']
             self.update_metric(self.cpu_frame[1], self.cpu_bar, cpu_percent, f"{cpu_percent:.1f}%")
             
+            # CPU trend
+            self.update_trend()
+            
             # Memory Usage
-            memory = psutil.virtual_memory()
-            mem_percent = memory.percent
-            mem_used = memory.used / (1024 ** 3)  # Convert to GB
-            mem_total = memory.total / (1024 ** 3)
+            memory = snapshot['memory']
+            mem_percent = memory['percent']
+            mem_used = memory['used'] / (1024 ** 3)  # Convert to GB
+            mem_total = memory['total'] / (1024 ** 3)
             self.update_metric(
                 self.mem_frame[1], 
                 self.mem_bar, 
@@ -144,109 +284,97 @@ class SystemMonitor:
                 f"{mem_percent:.1f}% ({mem_used:.1f}/{mem_total:.1f} GB)"
             )
             
-            # Disk Usage (C: drive)
-            try:
-                disk = psutil.disk_usage('C:')
-                disk_percent = disk.percent
-                disk_used = disk.used / (1024 ** 3)  # Convert to GB
-                disk_total = disk.total / (1024 ** 3)
-                self.update_metric(
-                    self.disk_frame[1],
-                    self.disk_bar,
-                    disk_percent,
-                    f"{disk_percent:.1f}% ({disk_used:.1f}/{disk_total:.1f} GB)"
-                )
-            except Exception as e:
-                print(f"Error getting disk usage: {e}")
-            
-            # Network Usage
-            current_time = time.time()
-            current_net_io = psutil.net_io_counters()
-            time_diff = current_time - self.prev_time
-            
-            bytes_sent = current_net_io.bytes_sent - self.prev_net_io.bytes_sent
-            bytes_recv = current_net_io.bytes_recv - self.prev_net_io.bytes_recv
-            
-            sent_speed = bytes_sent / time_diff
-            recv_speed = bytes_recv / time_diff
-            
-            # Convert to appropriate units
-            def format_speed(speed):
-                for unit in ['B/s', 'KB/s', 'MB/s', 'GB/s']:
-                    if speed < 1024 or unit == 'GB/s':
-                        return f"{speed:.1f} {unit}"
-                    speed /= 1024
-            
-            sent_str = format_speed(sent_speed)
-            recv_str = format_speed(recv_speed)
+            # Disk Usage per mount
+            self.update_disks(snapshot.get('disks', ()))
             
-            self.net_frame[1].config(text=f"↑{sent_str} ↓{recv_str}")
+            # Network Usage (smoothed, physical interfaces only)
+            sent_str = format_speed(snapshot['net']['sent_rate'])
+            recv_str = format_speed(snapshot['net']['recv_rate'])
+            self.net_frame[1].set(f"↑{sent_str} ↓{recv_str}")
+            self.update_interfaces(snapshot['net']['interfaces'])
             
-            # Update previous values
-            self.prev_net_io = current_net_io
-            self.prev_time = current_time
+            # Top processes
+            self.update_processes(snapshot.get('processes', ()))
             
-            # Update system info (less frequently)
-            if int(time.time()) % 5 == 0:  # Update every 5 seconds
-                self.info_label.config(text=self.get_system_info())
+            # System info only changes every few seconds
+            self.info_text.set(snapshot['info'])
             
         except Exception as e:
             print(f"Error updating system metrics: {e}")
-        
-        # Schedule next update
-        self.parent.after(self.update_interval, self.update_metrics)
     
-    def update_metric(self, value_label, progress_bar, percent, text):
-        """Update a single metric"""
-        value_label.config(text=text)
+    def update_disks(self, disks):
+        """Update usage and I/O for each mounted filesystem"""
+        mounts = tuple(disk['mountpoint'] for disk in disks)
+        if mounts != self.disk_mounts:
+            self.rebuild_disk_rows(mounts)
         
-        # Update progress bar
-        canvas, progress = progress_bar
-        width = canvas.winfo_width()
-        if width <= 1:  # If not yet rendered, use default width
-            width = 200
+        for disk in disks:
+            value, bar, io = self.disk_rows[disk['mountpoint']]
+            disk_used = disk['used'] / (1024 ** 3)  # Convert to GB
+            disk_total = disk['total'] / (1024 ** 3)
+            self.update_metric(
+                value,
+                bar,
+                disk['percent'],
+                f"{disk['percent']:.1f}% ({disk_used:.1f}/{disk_total:.1f} GB)"
+            )
+            
+            if disk['read_rate'] is None:
+                io_text = ""
+            else:
+                io_text = (f"R {format_speed(disk['read_rate'])} {disk['read_iops']:.0f} IOPS  "
+                           f"W {format_speed(disk['write_rate'])} {disk['write_iops']:.0f} IOPS")
+            io.set(io_text)
+    
+    def update_interfaces(self, interfaces):
+        """Show rates and peaks for each interface"""
+        names = tuple(nic['name'] for nic in interfaces)
+        if names != self.nic_names:
+            self.rebuild_nic_rows(names)
         
-        progress_width = int((percent / 100) * width)
-        canvas.coords(progress, 0, 0, progress_width, 4)
+        # One interface is already the Network row
+        if len(interfaces) < 2:
+            for label in self.nic_rows.values():
+                label.set("")
+            return
         
-        # Change color based on usage
-        if percent > 90:
-            canvas.itemconfig(progress, fill='#f44336')  # Red
-        elif percent > 70:
-            canvas.itemconfig(progress, fill='#ff9800')  # Orange
-        else:
-            canvas.itemconfig(progress, fill='#4CAF50')  # Green
+        for nic in interfaces:
+            text = (f"{nic['name']}: ↑{format_speed(nic['sent_rate'])} "
+                    f"↓{format_speed(nic['recv_rate'])} "
+                    f"(peak ↓{format_speed(nic['peak_recv'])})")
+            self.nic_rows[nic['name']].set(text)
     
-    def get_system_info(self):
-        """Get basic system information"""
-        try:
-            # CPU Info
-            cpu_info = f"CPU: {psutil.cpu_count(logical=False)}C/{psutil.cpu_count()}T {psutil.cpu_freq().current/1000:.1f}GHz"
-            
-            # OS Info
-            os_info = f"{platform.system()} {platform.release()}"
-            
-            # Boot Time
-            boot_time = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(psutil.boot_time()))
-            
-            # Uptime
-            uptime_seconds = time.time() - psutil.boot_time()
-            days = int(uptime_seconds // (24 * 3600))
-            hours = int((uptime_seconds % (24 * 3600)) // 3600)
-            uptime = f"{days}d {hours}h"
-            
-            return f"{cpu_info} | {os_info} | Boot: {boot_time} | Uptime: {uptime}"
-            
-        except Exception as e:
-            print(f"Error getting system info: {e}")
-            return "System information not available"
+    def update_processes(self, processes):
+        """Fill the process rows, leaving unused rows blank"""
+        for i, (name_label, usage_label) in enumerate(self.process_rows):
+            if i < len(processes):
+                pid, name, cpu, rss = processes[i]
+                name_text = name if len(name) <= 18 else name[:17] + "…"
+                usage_text = f"{cpu:.1f}%  {rss / (1024 ** 2):.0f} MB"
+            else:
+                name_text = usage_text = ""
+            name_label.set(name_text)
+            usage_label.set(usage_text)
+    
+    def update_metric(self, value_label, progress_bar, percent, text):
+        """Update a single metric; Tk is only touched for visible changes"""
+        value_label.set(text)
+        progress_bar.set(percent)
     
     def show_context_menu(self, event):
         """Show context menu for the system monitor"""
         menu = tk.Menu(self.parent, tearoff=0, bg='#2d2d2d', fg='white',
                       bd=0, font=('Segoe UI', 10))
         
-        menu.add_command(label="Refresh", command=self.update_metrics)
+        menu.add_command(label="Refresh", command=self.refresh)
+        
+        trend_menu = tk.Menu(menu, tearoff=0, bg='#2d2d2d', fg='white',
+                             bd=0, font=('Segoe UI', 10))
+        for label, window in TREND_WINDOWS:
+            trend_menu.add_radiobutton(label=label, variable=self.trend_window,
+                                       value=window, command=self.refresh_trend)
+        menu.add_cascade(label="CPU History", menu=trend_menu)
+        menu.add_cascade(label="Launched Apps", menu=self.create_launched_menu(menu))
         menu.add_separator()
         menu.add_command(label="Hide Monitor", command=self.toggle_visibility)
         menu.add_command(label="Settings")
@@ -256,21 +384,80 @@ class SystemMonitor:
         finally:
             menu.grab_release()
     
+    def create_launched_menu(self, menu):
+        """Submenu listing the supervisor's process table, newest first"""
+        launched_menu = tk.Menu(menu, tearoff=0, bg='#2d2d2d', fg='white',
+                                bd=0, font=('Segoe UI', 10))
+        rows = get_supervisor(self.parent).table()
+        now = time.time()
+        for pid, name, started, returncode in reversed(rows):
+            if returncode is None:
+                status = f"up {format_duration(now - started)}"
+            else:
+                status = f"exited {returncode}"
+            launched_menu.add_command(label=f"{name}  (PID {pid}, {status})", state='disabled')
+        if not rows:
+            launched_menu.add_command(label="Nothing launched yet", state='disabled')
+        return launched_menu
+    
+    def update_trend(self):
+        """Draw the CPU trend for the selected window"""
+        window = self.trend_window.get()
+        if not window:
+            # Live: the in-memory 1 s tier
+            _, _, _, values = self.history.query('cpu', '1s', count=60)
+        else:
+            # Past windows come from the on-disk log, re-read only when the
+            # window has moved on by one point
+            now = time.time()
+            bucket = int(now * 60 / window)
+            if bucket == self.trend_bucket:
+                return
+            self.trend_bucket = bucket
+            _, values = self.metrics_log.query_series('cpu', now - window, now, points=60)
+        self.cpu_trend.set(values)
+    
+    def refresh_trend(self):
+        """Redraw the CPU trend after the window changed"""
+        self.trend_bucket = None
+        self.update_trend()
+    
+    def refresh(self):
+        """Redraw from the latest snapshot even if it was already shown"""
+        self.rendered_sequence = None
+        self.update_metrics()
+    
     def toggle_visibility(self):
         """Toggle widget visibility"""
-        self.visible = not self.visible
+        self.settings.set('widgets.system', not self.visible)
+    
+    def on_settings_changed(self, changed):
+        """Follow the visibility flag in settings"""
+        self.set_visible(self.settings.get('widgets.system', True))
+    
+    def set_visible(self, visible):
+        """Show or hide the system monitor"""
+        if visible == self.visible:
+            return
+        self.visible = visible
         if self.visible:
             self.frame.place(x=self.x, y=self.y)
             self.update_metrics()
+            self.metrics_job.resume()
         else:
+            # Hidden widgets stop polling altogether
             self.frame.place_forget()
+            self.metrics_job.suspend()
     
     def set_position(self, x, y):
         """Set widget position"""
         self.x = x
         self.y = y
         self.frame.place(x=x, y=y)
+        self.settings.set('positions.system', [x, y])
     
     def destroy(self):
         """Clean up the widget"""
+        self.metrics_job.cancel()
+        self.unsubscribe_settings()
         self.frame.destroy()
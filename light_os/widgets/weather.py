@@ -1,19 +1,30 @@
 import tkinter as tk
 from tkinter import ttk
-import requests
-from PIL import Image, ImageTk
-import io
 from utils.animations import HoverEffect
+from utils.backdrop import FrostedBackdrop
+from utils.settings import get_settings
+from utils.weather_icons import get_icon_cache
+from utils.weather_provider import get_weather_provider
+
+ICON_SIZE = 64
 
 class WeatherWidget:
-    def __init__(self, parent, x=20, y=150):
+    def __init__(self, parent, x=20, y=150, slot=0):
         self.parent = parent
         self.x = x
         self.y = y
+        self.slot = slot  # Index into weather.cities, if that is set
         self.visible = True
-        self.api_key = ""  # You'll need to get an API key from OpenWeatherMap
-        self.city = "New York"
-        self.units = "metric"  # or "imperial"
+        self.settings = get_settings()
+        cities = self.settings.get('weather.cities') or [self.settings.get('weather.city', "New York")]
+        self.city = cities[slot]
+        self.units = self.settings.get('weather.units', "metric")  # or "imperial"
+        
+        # Every weather widget renders from one shared provider, which
+        # fetches all the cities on screen in a single batch
+        self.provider = get_weather_provider(parent)
+        self.icon_code = None
+        self.icons = get_icon_cache()
         
         # Create weather frame
         self.frame = tk.Frame(parent, bg='#1a1a1a', bd=0)
@@ -65,82 +76,91 @@ class WeatherWidget:
         # Add hover effect
         HoverEffect(self.frame, '#1a1a1a', '#2d2d2d')
         
+        # Translucent backdrop composited from the wallpaper behind us
+        if get_settings().get('backdrop.enabled', True):
+            FrostedBackdrop(self.frame, '#1a1a1acc')
+        
         # Bind right-click for context menu
         self.frame.bind("<Button-3>", self.show_context_menu)
         
-        # Initial weather update
-        self.update_weather()
+        # Show or hide when the settings flag changes
+        self.unsubscribe_settings = self.settings.subscribe(self.on_settings_changed, ['widgets.weather'])
+        
+        # Kiosks that may go offline keep the whole icon set on disk
+        if slot == 0 and self.settings.get('weather.prefetch_icons', False):
+            self.prefetch_icons()
+        
+        # Show the last known weather straight away; the provider
+        # revalidates it and refreshes every 30 minutes after that
+        self.unsubscribe_weather = self.provider.subscribe(self.on_result)
+        self.unwatch = self.provider.watch(self.city)
+        self.show_cached()
     
-    def update_weather(self):
-        """Fetch and update weather data"""
-        if self.visible and self.api_key:  # Only update if visible and API key is set
-            try:
-                # Get weather data from OpenWeatherMap API
-                url = f"http://api.openweathermap.org/data/2.5/weather?q={self.city}&appid={self.api_key}&units={self.units}"
-                response = requests.get(url)
-                data = response.json()
-                
-                if response.status_code == 200:
-                    # Update temperature
-                    temp = data['main']['temp']
-                    temp_unit = '°C' if self.units == 'metric' else '°F'
-                    self.temp_label.config(text=f"{int(round(temp))}{temp_unit}")
-                    
-                    # Update description
-                    desc = data['weather'][0]['description'].title()
-                    self.desc_label.config(text=desc)
-                    
-                    # Update location
-                    self.city = data['name']
-                    self.loc_label.config(text=self.city)
-                    
-                    # Update icon
-                    icon_code = data['weather'][0]['icon']
-                    self.set_weather_icon(icon_code)
-                
-                # Schedule next update (every 30 minutes)
-                self.parent.after(1800000, self.update_weather)
-                
-            except Exception as e:
-                print(f"Error updating weather: {e}")
-                # Retry after 5 minutes on error
-                self.parent.after(300000, self.update_weather)
-        else:
-            # If not visible or no API key, try again in 1 minute
-            self.parent.after(60000, self.update_weather)
+    def show_cached(self):
+        """Render cached weather for the current city, if there is any"""
+        cached = self.provider.cached_weather(self.city)
+        if cached is not None:
+            self.show_weather(cached)
     
-    def set_weather_icon(self, icon_code):
-        """Set the weather icon from OpenWeatherMap"""
-        try:
-            # Try to load icon from local cache first
-            icon_path = f"assets/weather_icons/{icon_code}.png"
-            img = Image.open(icon_path)
-        except:
-            try:
-                # If not found locally, download from OpenWeatherMap
-                url = f"http://openweathermap.org/img/wn/{icon_code}@2x.png"
-                response = requests.get(url, stream=True)
-                img = Image.open(io.BytesIO(response.content))
-                
-                # Save to cache for future use
-                os.makedirs("assets/weather_icons", exist_ok=True)
-                img.save(icon_path)
-            except Exception as e:
-                print(f"Error loading weather icon: {e}")
-                return
-        
-        # Resize and set icon
-        img = img.resize((64, 64), Image.Resampling.LANCZOS)
-        self.weather_icon = ImageTk.PhotoImage(img)
-        self.icon_label.config(image=self.weather_icon)
+    def update_weather(self, force=False):
+        """Refresh every city on screen; cached data within its TTL is reused"""
+        self.provider.refresh(force)
+    
+    def on_result(self, kind, args, value, error):
+        """Handle a result from the weather provider"""
+        if kind == 'icon':
+            if error is not None:
+                if args[0] == self.icon_code:
+                    print(f"Error loading weather icon: {error}")
+            elif args[0] == self.icon_code:
+                image = self.icons.get(*args)
+                if image is not None:
+                    self.set_weather_icon(image)
+            return
+        
+        # The provider reports errors once for all widgets; keep showing
+        # the last known weather until a refresh succeeds
+        if kind == 'weather' and args[0] == self.city and error is None:
+            self.show_weather(value)
+    
+    def show_weather(self, value):
+        """Render weather data"""
+        # Update temperature
+        temp_unit = '°C' if self.units == 'metric' else '°F'
+        self.temp_label.config(text=f"{int(round(value['temp']))}{temp_unit}")
+        
+        # Update description
+        self.desc_label.config(text=value['description'])
+        
+        # Update location, as the service spells it
+        self.loc_label.config(text=value['name'])
+        
+        # Update icon from the cache, or have the worker fetch and resize it
+        if value['icon'] != self.icon_code:
+            self.icon_code = value['icon']
+            image = self.icons.get(self.icon_code, ICON_SIZE)
+            if image is not None:
+                self.set_weather_icon(image)
+            else:
+                self.provider.request_icon(self.icon_code, ICON_SIZE)
+    
+    def set_weather_icon(self, image):
+        """Show a cached weather icon"""
+        self.weather_icon = image  # Keep a reference
+        self.icon_label.config(image=image)
+    
+    def prefetch_icons(self):
+        """Download every weather icon now, e.g. before going offline"""
+        self.provider.prefetch_icons(ICON_SIZE)
     
     def show_context_menu(self, event):
         """Show context menu for the weather widget"""
         menu = tk.Menu(self.parent, tearoff=0, bg='#2d2d2d', fg='white',
                       bd=0, font=('Segoe UI', 10))
         
-        menu.add_command(label="Refresh", command=self.update_weather)
+        menu.add_command(label="Refresh", command=lambda: self.update_weather(force=True))
         menu.add_command(label="Change Location", command=self.change_location)
+        menu.add_command(label="Download All Icons", command=self.prefetch_icons)
         menu.add_separator()
         menu.add_command(label="Hide Weather", command=self.toggle_visibility)
         
@@ -176,8 +196,7 @@ class WeatherWidget:
         def save_location():
             new_city = city_var.get().strip()
             if new_city:
-                self.city = new_city
-                self.update_weather()
+                self.set_city(new_city)
                 dialog.destroy()
         
         btn_frame = ttk.Frame(dialog)
@@ -186,21 +205,58 @@ class WeatherWidget:
         ttk.Button(btn_frame, text="Cancel", command=dialog.destroy).pack(side='left', padx=5)
         ttk.Button(btn_frame, text="Save", command=save_location).pack(side='left', padx=5)
     
+    def set_city(self, city):
+        """Show another city and save it to this widget's slot"""
+        if self.visible:
+            self.unwatch()
+        self.city = city
+        self.loc_label.config(text=city)
+        if self.visible:
+            self.unwatch = self.provider.watch(city)
+        
+        cities = self.settings.get('weather.cities')
+        if cities:
+            cities = list(cities)
+            cities[self.slot] = city
+            self.settings.set('weather.cities', cities)
+        else:
+            self.settings.set('weather.city', city)
+        self.show_cached()
+    
     def toggle_visibility(self):
         """Toggle widget visibility"""
-        self.visible = not self.visible
+        self.settings.set('widgets.weather', not self.visible)
+    
+    def on_settings_changed(self, changed):
+        """Follow the visibility flag in settings"""
+        self.set_visible(self.settings.get('widgets.weather', True))
+    
+    def set_visible(self, visible):
+        """Show or hide the weather widget"""
+        if visible == self.visible:
+            return
+        self.visible = visible
         if self.visible:
             self.frame.place(x=self.x, y=self.y)
-            self.update_weather()
+            self.unwatch = self.provider.watch(self.city)
         else:
+            # Hidden widgets drop out of the refresh; with none left
+            # watching, the provider stops polling altogether
             self.frame.place_forget()
+            self.unwatch()
     
     def set_position(self, x, y):
         """Set widget position"""
         self.x = x
         self.y = y
         self.frame.place(x=x, y=y)
+        key = 'weather' if self.slot == 0 else f'weather_{self.slot}'
+        self.settings.set(f'positions.{key}', [x, y])
     
     def destroy(self):
         """Clean up the widget"""
+        if self.visible:
+            self.unwatch()
+        self.unsubscribe_weather()
+        self.unsubscribe_settings()
         self.frame.destroy()